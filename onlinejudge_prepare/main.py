@@ -1,4 +1,5 @@
 import argparse
+import concurrent.futures
 import contextlib
 import os
 import pathlib
@@ -17,8 +18,10 @@ import toml
 import onlinejudge
 import onlinejudge.utils
 import onlinejudge_template.analyzer.combined as analyzer
+import onlinejudge_template.cache as cache
 import onlinejudge_template.generator._main as generator
 import onlinejudge_template.network as network
+from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
 
@@ -74,7 +77,34 @@ def get_directory(*, problem: onlinejudge.type.Problem, contest: Optional[online
     return contest_directory / problem_directory
 
 
-def prepare_problem(problem: onlinejudge.type.Problem, *, contest: Optional[onlinejudge.type.Contest] = None, config: Dict[str, Any], session: requests.Session) -> None:
+def write_sample_cases(sample_cases: List[SampleCase], *, directory: pathlib.Path) -> None:
+    """write_sample_cases writes sample cases as `sample-1.in`, `sample-1.out`, ... in the same layout as `oj download`.
+
+    :raises FileExistsError:
+    """
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for i, case in enumerate(sample_cases):
+        for ext, data in (('in', case.input), ('out', case.output)):
+            path = directory / f"""sample-{i + 1}.{ext}"""
+            if path.exists():
+                raise FileExistsError(f"""file already exists: {str(path)}""")
+            logger.info('write file: %s', str(path))
+            with open(path, 'wb') as fh:
+                fh.write(data)
+
+
+def prepare_problem(problem: onlinejudge.type.Problem, *, contest: Optional[onlinejudge.type.Contest] = None, config: Dict[str, Any], session: requests.Session, use_cache: bool = True, refresh: bool = False, oj_download: bool = False) -> None:
+    """
+    :param use_cache: specifies whether the cache of downloaded pages and analyzed results is read and written.
+    :param refresh: specifies whether the existing cache is ignored and updated.
+    :param oj_download: specifies whether sample cases are downloaded again with `oj download` command instead of writing the sample cases used for analysis.
+
+    This function doesn't change the current directory, because problems may be prepared concurrently in threads.
+    Instead, the filter commands of templates (e.g. formatters) and `oj download` run in the problem directory with their working directory set, and relative paths to templates are resolved from the problem directory.
+    Templates themselves are rendered in the directory where the command is invoked.
+    """
+
     logger.info('prepare the problem: %s', problem.get_url())
 
     table = config.get('templates')
@@ -89,71 +119,114 @@ def prepare_problem(problem: onlinejudge.type.Problem, *, contest: Optional[onli
     dir = get_directory(problem=problem, contest=contest, config=config)
     logger.info('use directory: %s', str(dir))
 
-    dir.parent.mkdir(parents=True, exist_ok=True)
-    with chdir(dir):
-        exceptions: List[Exception] = []
+    dir.mkdir(parents=True, exist_ok=True)
+    exceptions: List[Exception] = []
 
-        url = problem.get_url()
+    url = problem.get_url()
+    downloaded = None
+    if use_cache and not refresh:
+        downloaded = cache.load_downloaded(url)
+    sample_cases: Optional[List[SampleCase]]
+    if downloaded is not None:
+        html, sample_cases = downloaded
+    else:
         try:
-            html = network.download_html(url, session=session)
-            sample_cases = network.download_sample_cases(url, session=session)
+            html, sample_cases = network.download_html_and_sample_cases(url, session=session, problem=problem)
         except Exception as e:
             logger.error('failed to download sample cases')
             exceptions.append(e)
             html = b''
             sample_cases = []
-
-        # analyze
-        resources = analyzer.prepare_from_html(html, url=url, sample_cases=sample_cases)
+        else:
+            if use_cache and sample_cases is not None:
+                try:
+                    cache.store_downloaded(url, html=html, sample_cases=sample_cases)
+                except OSError as e:
+                    logger.warning('failed to write the cache: %s', e)
+
+    # analyze
+    resources = analyzer.prepare_from_html(html, url=url, sample_cases=sample_cases)
+    analyzed = None
+    if use_cache and not refresh and not exceptions:
+        analyzed = cache.load_analyzer_result(resources)
+    if analyzed is None:
         try:
             analyzed = analyzer.run(resources)
         except Exception as e:
             logger.exception('failed to analyze the problem')
             exceptions.append(e)
             analyzed = analyzer.get_empty_analyzer_result(resources)
-
-        for dest_str, template in table.items():
-            dest = pathlib.Path(dest_str)
-
-            # generate
-            try:
-                code = generator.run(analyzed, template_file=template)
-            except Exception as e:
-                logger.exception('failed to generate code: template = %s, dest = %s', template, dest_str)
-                exceptions.append(e)
-                continue
-
-            # write
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            if dest.exists():
-                logger.error('file already exists: %s', str(dest))
-            else:
-                logger.info('write file: %s', str(dest))
-                with open(dest, 'wb') as fh:
-                    fh.write(code)
-                if code.startswith(b'#!'):
-                    os.chmod(dest, os.stat(dest).st_mode | stat.S_IEXEC)
-
-        # download
+        else:
+            if use_cache and not exceptions:
+                try:
+                    cache.store_analyzer_result(analyzed)
+                except OSError as e:
+                    logger.warning('failed to write the cache: %s', e)
+
+    templates: Dict[str, str] = {}
+    for dest_str, template in table.items():
+        if pathlib.Path(template).name != template and not pathlib.Path(template).is_absolute():
+            template = str(dir / template)  # relative paths to templates are relative to the problem directory
+        templates[dest_str] = template
+
+    # generate all files at once, to run formatters in batches
+    codes = generator.run_many(analyzed, template_files=list(templates.values()), exceptions=exceptions, cwd=dir)
+
+    for dest_str, template in templates.items():
+        dest = dir / dest_str
+        if template not in codes:
+            continue  # failed to generate code
+        code = codes[template]
+
+        # write
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists():
+            logger.error('file already exists: %s', str(dest))
+        else:
+            logger.info('write file: %s', str(dest))
+            with open(dest, 'wb') as fh:
+                fh.write(code)
+            if code.startswith(b'#!'):
+                os.chmod(dest, os.stat(dest).st_mode | stat.S_IEXEC)
+
+    # write sample cases
+    if oj_download:
         try:
-            # TODO: remove this and use the result of `network.download_sample_cases` instead
-            subprocess.check_call(['oj', 'download', problem.get_url()], stdout=sys.stdout, stderr=sys.stderr)
+            subprocess.check_call(['oj', 'download', problem.get_url()], stdout=sys.stdout, stderr=sys.stderr, cwd=str(dir))
         except subprocess.CalledProcessError as e:
             logger.error('failed to download sample cases: %s', e)
             exceptions.append(e)
+    elif sample_cases is None:
+        logger.error('failed to download sample cases')
+        exceptions.append(RuntimeError(f"""failed to download sample cases: {url}"""))
+    else:
+        try:
+            write_sample_cases(sample_cases, directory=dir / 'test')
+        except OSError as e:
+            logger.error('failed to write sample cases: %s', e)
+            exceptions.append(e)
 
-        if exceptions:
-            raise exceptions[0]
+    if exceptions:
+        raise exceptions[0]
 
 
-def prepare_contest(contest: onlinejudge.type.Contest, *, config: Dict[str, Any], session: requests.Session) -> None:
+def prepare_contest(contest: onlinejudge.type.Contest, *, config: Dict[str, Any], session: requests.Session, use_cache: bool = True, refresh: bool = False, oj_download: bool = False, jobs: int = 1) -> None:
+    """
+    :param jobs: is the number of problems prepared concurrently.
+    """
+
     logger.info('prepare the contest: %s', contest.get_url())
 
     exceptions: List[Exception] = []
 
-    for problem in contest.list_problems():
+    problems = contest.list_problems()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [executor.submit(prepare_problem, problem, contest=contest, config=config, session=session, use_cache=use_cache, refresh=refresh, oj_download=oj_download) for problem in problems]
+
+    # collect errors in the order of problems, not in the order of completion
+    for problem, future in zip(problems, futures):
         try:
-            prepare_problem(problem, contest=contest, config=config, session=session)
+            future.result()
 
         except Exception as e:
             logger.exception('failed to prepare the problem: %s', problem.get_url())
@@ -181,6 +254,10 @@ def main(args: Optional[List[str]] = None) -> None:
     parser.add_argument('-v', '--verbose', action='store_true')
     parser.add_argument('-c', '--cookie', default=onlinejudge.utils.default_cookie_path)
     parser.add_argument('--config-file', type=pathlib.Path, help=f"""default: {str(default_config_path)}""")
+    parser.add_argument('--no-cache', action='store_true', help='neither read nor write the cache of downloaded pages and analyzed results')
+    parser.add_argument('--refresh', action='store_true', help='ignore the cache and update it')
+    parser.add_argument('--oj-download', action='store_true', help='download sample cases with `oj download` command instead of writing the sample cases used for analysis')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='the number of problems prepared concurrently (default: 1)')
     parsed = parser.parse_args(args=args)
 
     # configure logging
@@ -195,12 +272,13 @@ def main(args: Optional[List[str]] = None) -> None:
     logger.info('config: %s', config)
 
     with onlinejudge.utils.with_cookiejar(onlinejudge.utils.get_default_session(), path=parsed.cookie) as session:
+        network.configure_session(session, pool_maxsize=max(10, 2 * parsed.jobs))  # each job downloads the HTML and sample cases concurrently
         problem = onlinejudge.dispatch.problem_from_url(parsed.url)
         contest = onlinejudge.dispatch.contest_from_url(parsed.url)
         if problem is not None:
-            prepare_problem(problem, config=config, session=session)
+            prepare_problem(problem, config=config, session=session, use_cache=not parsed.no_cache, refresh=parsed.refresh, oj_download=parsed.oj_download)
         elif contest is not None:
-            prepare_contest(contest, config=config, session=session)
+            prepare_contest(contest, config=config, session=session, use_cache=not parsed.no_cache, refresh=parsed.refresh, oj_download=parsed.oj_download, jobs=parsed.jobs)
         else:
             raise ValueError(f"""unrecognized URL: {parsed.url}""")
 
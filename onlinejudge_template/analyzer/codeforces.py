@@ -7,8 +7,7 @@ import urllib.parse
 from logging import getLogger
 from typing import *
 
-import bs4
-
+from onlinejudge_template.analyzer.html import HTMLDocument, get_document
 from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
@@ -23,10 +22,10 @@ def is_codeforces_url(url: str) -> bool:
     return result.netloc == 'codeforces.com'
 
 
-def has_multiple_testcases(html: bytes, *, url: str) -> bool:
+def has_multiple_testcases(html: Union[bytes, HTMLDocument], *, url: str) -> bool:
     # parse HTML
-    soup = bs4.BeautifulSoup(html, 'html.parser')
-    input_specifications = soup.find_all('div', class_='input-specification')
+    document = get_document(html)
+    input_specifications = document.find_all_with_class('div', 'input-specification')
     if len(input_specifications) != 1:
         logger.error("""<div class="input-specification"> is not found or not unique.""")
         return False
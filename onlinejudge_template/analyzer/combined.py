@@ -17,9 +17,12 @@ logger = getLogger(__name__)
 
 
 def prepare_from_html(html: bytes, *, url: str, sample_cases: Optional[List[SampleCase]] = None) -> AnalyzerResources:
+    # parse the HTML only once. The document is shared with `run` too.
+    document = onlinejudge_template.analyzer.html.get_document(html)
+
     input_format_string: Optional[str] = None
     try:
-        input_format_string = onlinejudge_template.analyzer.html.parse_input_format_string(html, url=url)
+        input_format_string = onlinejudge_template.analyzer.html.parse_input_format_string(document, url=url)
         logger.debug('input format string: %s', repr(input_format_string))
     except AnalyzerError as e:
         logger.info('failed to detect the input format string: %s', e)
@@ -28,7 +31,7 @@ def prepare_from_html(html: bytes, *, url: str, sample_cases: Optional[List[Samp
 
     output_format_string: Optional[str] = None
     try:
-        output_format_string = onlinejudge_template.analyzer.html.parse_output_format_string(html, url=url)
+        output_format_string = onlinejudge_template.analyzer.html.parse_output_format_string(document, url=url)
         logger.debug('output format string: %s', repr(output_format_string))
     except AnalyzerError as e:
         logger.info('failed to detect the output format string: %s', e)
@@ -45,22 +48,29 @@ def prepare_from_html(html: bytes, *, url: str, sample_cases: Optional[List[Samp
     return resources
 
 
-def run(resources: AnalyzerResources) -> AnalyzerResult:
+def run(resources: AnalyzerResources, *, search_workers: Optional[int] = None) -> AnalyzerResult:
+    """
+    :param search_workers: is the number of worker processes for the minimum tree search. The search is serial when this is `None`. The result doesn't depend on this.
+    """
+
+    document: Optional[onlinejudge_template.analyzer.html.HTMLDocument] = None
+    if resources.html is not None:
+        document = onlinejudge_template.analyzer.html.get_document(resources.html)
 
     # It seems that topcoder_class_definition should be included in resources.
     topcoder_class_definition: Optional[TopcoderClassDefinition] = None
     try:
         if resources.url is not None and onlinejudge_template.analyzer.topcoder.is_topcoder_url(resources.url):
-            if resources.html is not None:
-                topcoder_class_definition = onlinejudge_template.analyzer.topcoder.parse_topcoder_class_definition(resources.html, url=resources.url)
+            if document is not None:
+                topcoder_class_definition = onlinejudge_template.analyzer.topcoder.parse_topcoder_class_definition(document, url=resources.url)
     except AnalyzerError as e:
         logger.exception('failed to analyze the class definition of the Topcoder problem: %s', e)
 
     multiple_test_cases = False
     try:
         if resources.url is not None and onlinejudge_template.analyzer.codeforces.is_codeforces_url(resources.url):
-            if resources.html is not None:
-                multiple_test_cases = onlinejudge_template.analyzer.codeforces.has_multiple_testcases(resources.html, url=resources.url)
+            if document is not None:
+                multiple_test_cases = onlinejudge_template.analyzer.codeforces.has_multiple_testcases(document, url=resources.url)
                 if multiple_test_cases:
                     logger.info('Each input of this problem has multiple test cases.')
     except AnalyzerError as e:
@@ -81,7 +91,7 @@ def run(resources: AnalyzerResources) -> AnalyzerResult:
             if not multiple_test_cases:
                 input_format = onlinejudge_template.analyzer.simple_patterns.guess_format_with_pattern_matching(instances=input_samples)
             if input_format is None:
-                input_format = onlinejudge_template.analyzer.minimum_tree.construct_minimum_input_format_tree(instances=input_samples, multiple_test_cases=multiple_test_cases)
+                input_format = onlinejudge_template.analyzer.minimum_tree.construct_minimum_input_format_tree(instances=input_samples, multiple_test_cases=multiple_test_cases, workers=search_workers)
     except AnalyzerError as e:
         logger.info('failed to analyze the input format from the input sample cases: %s', e)
     if input_format is None:
@@ -117,12 +127,12 @@ def run(resources: AnalyzerResources) -> AnalyzerResult:
                 if not multiple_test_cases:
                     output_format = onlinejudge_template.analyzer.simple_patterns.guess_output_format_with_pattern_matching_using_input_format(instances=resources.sample_cases, input_format=input_format, input_variables=input_variables)
                 if output_format is None:
-                    output_format = onlinejudge_template.analyzer.minimum_tree.construct_minimum_output_format_tree_using_input_format(instances=resources.sample_cases, input_format=input_format, input_variables=input_variables, multiple_test_cases=multiple_test_cases)
+                    output_format = onlinejudge_template.analyzer.minimum_tree.construct_minimum_output_format_tree_using_input_format(instances=resources.sample_cases, input_format=input_format, input_variables=input_variables, multiple_test_cases=multiple_test_cases, workers=search_workers)
             else:
                 output_samples = [case.output.decode() for case in resources.sample_cases]
                 output_format = onlinejudge_template.analyzer.simple_patterns.guess_format_with_pattern_matching(instances=output_samples)
                 if output_format is None:
-                    output_format = onlinejudge_template.analyzer.minimum_tree.construct_minimum_output_format_tree(instances=output_samples)
+                    output_format = onlinejudge_template.analyzer.minimum_tree.construct_minimum_output_format_tree(instances=output_samples, workers=search_workers)
     except AnalyzerError as e:
         logger.info('failed to analyze the output format from the sample cases: %s', e)
     if output_format is None:
@@ -146,8 +156,8 @@ def run(resources: AnalyzerResources) -> AnalyzerResult:
     # list constants
     constants: Dict[VarName, ConstantDecl] = {}
     try:
-        if resources.html is not None or resources.sample_cases:
-            constants.update(onlinejudge_template.analyzer.constants.list_constants(html=resources.html, sample_cases=resources.sample_cases))
+        if document is not None or resources.sample_cases:
+            constants.update(onlinejudge_template.analyzer.constants.list_constants(html=document, sample_cases=resources.sample_cases))
     except AnalyzerError as e:
         logger.exception('failed to list used constants: %s', e)
 
@@ -21,24 +21,22 @@ import re
 from logging import getLogger
 from typing import *
 
+from onlinejudge_template.analyzer.html import HTMLDocument, get_document
 from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
 
+_REMOVED_CHARS = str.maketrans('', '', "\\{},'")
 
-def list_constants_from_html(html: bytes) -> Dict[VarName, ConstantDecl]:
+
+def list_constants_from_html(html: Union[bytes, HTMLDocument]) -> Dict[VarName, ConstantDecl]:
     replace = [
-        ("\\", ""),
-        ("{", ""),
-        ("}", ""),
-        (",", ""),
-        ("'", ""),
         (" ^ ", "^"),
         (" + ", "+"),
         ("10^9+7", "1000000007"),
         ("10^9+9", "1000000009"),
     ]
-    normalized = html.decode()
+    normalized = get_document(html).text.translate(_REMOVED_CHARS)  # remove some chars at once
     for a, b in replace:
         normalized = normalized.replace(a, b)
 
@@ -87,7 +85,7 @@ def list_constants_from_sample_cases(sample_cases: List[SampleCase]) -> Dict[Var
     return constants
 
 
-def list_constants(*, html: Optional[bytes], sample_cases: Optional[List[SampleCase]]) -> Dict[VarName, ConstantDecl]:
+def list_constants(*, html: Optional[Union[bytes, HTMLDocument]], sample_cases: Optional[List[SampleCase]]) -> Dict[VarName, ConstantDecl]:
     constants = {}
     if html is not None:
         constants.update(list_constants_from_html(html))
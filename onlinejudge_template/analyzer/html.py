@@ -20,6 +20,8 @@ the module to find the input format string written with ``<pre>`` tags from HTML
     Q_0 Q_1 \cdots Q_{N-1}
 """
 
+import functools
+import threading
 from logging import getLogger
 from typing import *
 
@@ -34,6 +36,61 @@ class HTMLParserError(AnalyzerError):
     pass
 
 
+class HTMLDocument:
+    """HTMLDocument is a parsed HTML shared by analyzers, to avoid parsing the same HTML many times.
+    The HTML is parsed lazily, and lists of tags are indexed by their names once.
+    A document may be shared by threads (e.g. `--jobs` of oj-prepare and `--serve -j` of oj-template), so the lazy parsing is guarded with a lock. The parsed tree is only read after that.
+    """
+    def __init__(self, html: bytes):
+        self.html = html
+        self._soup: Optional[bs4.BeautifulSoup] = None
+        self._text: Optional[str] = None
+        self._tags: Dict[str, List[bs4.Tag]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def soup(self) -> bs4.BeautifulSoup:
+        with self._lock:
+            if self._soup is None:
+                self._soup = bs4.BeautifulSoup(self.html, 'html.parser')
+                logger.debug('parsed HTML: %s...', repr(str(self._soup))[:200])
+            return self._soup
+
+    @property
+    def text(self) -> str:
+        """text is the decoded HTML, not the text content.
+        """
+
+        if self._text is None:
+            self._text = self.html.decode()
+        return self._text
+
+    def find_all(self, name: str) -> List[bs4.Tag]:
+        soup = self.soup
+        with self._lock:
+            if name not in self._tags:
+                self._tags[name] = soup.find_all(name)
+            return self._tags[name]
+
+    def find_all_with_class(self, name: str, class_: str) -> List[bs4.Tag]:
+        return [tag for tag in self.find_all(name) if class_ in tag.get_attribute_list('class')]
+
+
+# functools.lru_cache is thread-safe, and the cached documents guard themselves.
+@functools.lru_cache(maxsize=4)
+def _parse_html(html: bytes) -> HTMLDocument:
+    return HTMLDocument(html)
+
+
+def get_document(html: Union[bytes, HTMLDocument]) -> HTMLDocument:
+    """get_document returns the parsed document for the HTML. The same document is returned for the same recent HTML.
+    """
+
+    if isinstance(html, HTMLDocument):
+        return html
+    return _parse_html(html)
+
+
 table = {
     'in': ('Input', 'Input / 入力', '入力'),
     'out': ('Output', 'Output / 出力', '出力'),
@@ -65,17 +122,16 @@ def _extract_format_string_from_pre(x: bs4.Tag) -> str:
     return s
 
 
-def parse_generic_format_string(html: bytes, *, kind: str, url: str) -> str:
+def parse_generic_format_string(html: Union[bytes, HTMLDocument], *, kind: str, url: str) -> str:
     """
     :param kind: ``"in"`` or ``"out"``
     :raises HTMLParserError:
     """
 
-    soup = bs4.BeautifulSoup(html, 'html.parser')
-    logger.debug('parsed HTML: %s...', repr(str(soup))[:200])
+    document = get_document(html)
 
     if 'atcoder.jp' in url:
-        for h3 in soup.find_all('h3'):
+        for h3 in document.find_all('h3'):
             if h3.string in table[kind]:
                 pre = h3.parent.find('pre')
                 if pre:
@@ -83,7 +139,7 @@ def parse_generic_format_string(html: bytes, *, kind: str, url: str) -> str:
         raise HTMLParserError
 
     elif 'yukicoder.me' in url:
-        for h4 in soup.find_all('h4'):
+        for h4 in document.find_all('h4'):
             if h4.string in table[kind]:
                 pre = h4.parent.find('pre')
                 if pre:
@@ -93,7 +149,7 @@ def parse_generic_format_string(html: bytes, *, kind: str, url: str) -> str:
     elif 'yosupo.jp' in url:
         assert 'old.yosupo.jp' in url  # TODO: update this for new site https://judge.yosupo.jp/. The current implementation is for https://old.yosupo.jp/.
 
-        for h2 in soup.find_all('h2'):
+        for h2 in document.find_all('h2'):
             found = False
             for div in h2.find_all('div'):
                 if div.string in table[kind]:
@@ -110,9 +166,9 @@ def parse_generic_format_string(html: bytes, *, kind: str, url: str) -> str:
         raise NotImplementedError
 
 
-def parse_input_format_string(html: bytes, *, url: str) -> str:
+def parse_input_format_string(html: Union[bytes, HTMLDocument], *, url: str) -> str:
     return parse_generic_format_string(html, kind='in', url=url)
 
 
-def parse_output_format_string(html: bytes, *, url: str) -> str:
+def parse_output_format_string(html: Union[bytes, HTMLDocument], *, url: str) -> str:
     return parse_generic_format_string(html, kind='out', url=url)
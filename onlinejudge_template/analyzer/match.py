@@ -31,10 +31,14 @@ the module to match format trees and sample strings
 に相当する結果を返します。
 """
 
+import array
+import itertools
+import mmap
+import re
 from logging import getLogger
 from typing import *
 
-from onlinejudge_template.analyzer.simplify import evaluate
+from onlinejudge_template.analyzer.simplify import compile_expr
 from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
@@ -44,7 +48,116 @@ class FormatMatchError(AnalyzerError):
     pass
 
 
-def _get_env(values: Dict[VarName, Dict[Tuple[int, ...], Union[int, float, str]]]) -> Dict[VarName, Union[int, List[int], List[List[int]]]]:
+_DENSE_SIZE_LIMIT = 10**7
+
+
+class ArrayValues(Mapping[Tuple[int, ...], Union[int, float, str]]):
+    """ArrayValues is a compact storage of the values of a variable, which works as a read-only dict from indices to values.
+
+    Values are stored in a dense `array('q')` in row-major order while they are 64-bit integers, and in a dense list otherwise.
+    The shape is given with the first value, i.e. once the dims can be evaluated.
+    When the shape changes later (e.g. ragged arrays like `A_{i, j}` with `K_i` columns), this falls back to a dict.
+    """
+
+    __slots__ = ('_shape', '_data', '_filled', '_count', '_fallback')
+
+    def __init__(self) -> None:
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._data: Union[array.array, List[Union[int, float, str]]] = array.array('q')
+        self._filled = bytearray()
+        self._count = 0
+        self._fallback: Optional[Dict[Tuple[int, ...], Union[int, float, str]]] = None
+
+    def _offset(self, ix: Tuple[int, ...]) -> int:
+        assert self._shape is not None
+        offset = 0
+        for i, n in zip(ix, self._shape):
+            offset = offset * n + i
+        return offset
+
+    def set(self, ix: Tuple[int, ...], value: Union[int, float, str], *, shape: Tuple[int, ...]) -> None:
+        """
+        :param shape: is the evaluated dims of the variable. Each index must be less than the corresponding dim.
+        """
+
+        if shape != self._shape or self._fallback is not None:
+            self._set_slow(ix, value, shape=shape)
+            return
+        offset = 0
+        for i, n in zip(ix, shape):
+            offset = offset * n + i
+        try:
+            self._data[offset] = value  # type: ignore
+        except (TypeError, OverflowError):
+            # floats, strings or too large integers
+            self._data = self._data.tolist()  # type: ignore
+            self._data[offset] = value
+        if not self._filled[offset]:
+            self._filled[offset] = 1
+            self._count += 1
+
+    def _set_slow(self, ix: Tuple[int, ...], value: Union[int, float, str], *, shape: Tuple[int, ...]) -> None:
+        if self._fallback is None:
+            if self._shape is None:
+                size = 1
+                for n in shape:
+                    size *= n
+                if size <= _DENSE_SIZE_LIMIT:
+                    self._shape = shape
+                    self._data = array.array('q', bytes(8 * size))
+                    self._filled = bytearray(size)
+                    self.set(ix, value, shape=shape)
+                    return
+                self._fallback = {}
+            else:
+                self._fallback = dict(self.items())
+        self._fallback[ix] = value
+
+    def is_int_array(self) -> bool:
+        """is_int_array returns True if all values are stored in a dense array of 64-bit integers. This takes O(1).
+        """
+
+        return self._fallback is None and isinstance(self._data, array.array)
+
+    def __getitem__(self, ix: Tuple[int, ...]) -> Union[int, float, str]:
+        if self._fallback is not None:
+            return self._fallback[ix]
+        if self._shape is None or len(ix) != len(self._shape) or any(not 0 <= i < n for i, n in zip(ix, self._shape)):
+            raise KeyError(ix)
+        offset = self._offset(ix)
+        if not self._filled[offset]:
+            raise KeyError(ix)
+        return self._data[offset]
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        if self._fallback is not None:
+            return iter(self._fallback)
+        if self._shape is None:
+            return iter(())
+        return itertools.compress(itertools.product(*map(range, self._shape)), self._filled)
+
+    def __len__(self) -> int:
+        if self._fallback is not None:
+            return len(self._fallback)
+        return self._count
+
+    def values(self) -> Iterable[Union[int, float, str]]:  # type: ignore
+        if self._fallback is not None:
+            return self._fallback.values()
+        if self._count == len(self._data):
+            return self._data
+        return list(itertools.compress(self._data, self._filled))
+
+    def items(self) -> Iterable[Tuple[Tuple[int, ...], Union[int, float, str]]]:  # type: ignore
+        if self._fallback is not None:
+            return self._fallback.items()
+        return list(zip(self, self.values()))
+
+    def __repr__(self) -> str:
+        return f"""ArrayValues({dict(self.items())!r})"""
+
+
+def _get_env(values: Mapping[VarName, Mapping[Tuple[int, ...], Union[int, float, str]]]) -> Dict[VarName, Union[int, List[int], List[List[int]]]]:
     env: Dict[VarName, Union[int, List[int], List[List[int]]]] = {}
     for name, value in values.items():
         if () in value and isinstance(value[()], int):
@@ -62,87 +175,259 @@ def _get_env(values: Dict[VarName, Dict[Tuple[int, ...], Union[int, float, str]]
     return env
 
 
-def _match_format_dfs(node: FormatNode, tokens: List[str], *, variables: Dict[VarName, VarDecl], values: Dict[VarName, Dict[Tuple[int, ...], Union[int, float, str]]]) -> None:
+_CHUNK_SIZE = 1 << 16
+
+
+def _tokenize_str(data: str) -> Iterator[str]:
+    for line in data.splitlines():
+        yield from line.split()
+        yield '\n'
+
+
+def _tokenize_binary(read: Callable[[int], bytes]) -> Iterator[str]:
+    """_tokenize_binary reads the input chunk by chunk, so the whole input is never kept in memory.
+    Only an incomplete line or an incomplete token is carried to the next chunk.
     """
-    :raises FormatMatchError:
+
+    rest = b''
+    while True:
+        chunk = read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (rest + chunk).split(b'\n')
+        rest = lines.pop()
+        for line in lines:
+            for token in line.split():
+                yield token.decode()
+            yield '\n'
+
+        # flush the completed tokens in a long line
+        words = rest.split()
+        if len(words) >= 2 or (words and rest[-1:].isspace()):
+            last = b'' if rest[-1:].isspace() else words.pop()
+            for token in words:
+                yield token.decode()
+            rest = last if last else b' '
+    if rest:
+        for token in rest.split():
+            yield token.decode()
+        yield '\n'
+
+
+def _tokenize(data: Union[str, bytes, bytearray, mmap.mmap, BinaryIO]) -> Iterator[str]:
+    """_tokenize splits the data into tokens and newline markers `\\n`, lazily.
+    """
+
+    if isinstance(data, str):
+        return _tokenize_str(data)
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        offset = 0
+
+        def read(size: int) -> bytes:
+            nonlocal offset
+            chunk = bytes(view[offset:offset + size])
+            offset += len(chunk)
+            return chunk
+
+        return _tokenize_binary(read)
+    elif hasattr(data, 'read'):
+        return _tokenize_binary(data.read)
+    else:
+        raise TypeError(f"""unsupported type of data: {type(data)}""")
+
+
+class _TokenStream:
+    """_TokenStream is a token iterator with one-token lookahead.
+    """
+
+    __slots__ = ('_tokens', '_next')
+
+    def __init__(self, tokens: Iterator[str]):
+        self._tokens = tokens
+        self._next = next(tokens, None)
+
+    def peek(self) -> Optional[str]:
+        return self._next
+
+    def pop(self) -> Optional[str]:
+        token = self._next
+        self._next = next(self._tokens, None)
+        return token
+
+
+_INT_PATTERN = re.compile(r'0|-?[1-9][0-9]*')
+
+
+def _parse_token(token: str) -> Union[int, float, str]:
+    # int, which fits in 64 bits (signed or unsigned)
+    if _INT_PATTERN.fullmatch(token):
+        value = int(token)
+        if -2**63 <= value < 2**64:
+            return value
+
+    # float
+    if '.' in token:
+        try:
+            return float(token)
+        except ValueError:
+            pass
+
+    # str
+    return token
+
+
+def _update_env(env: Dict[VarName, Any], name: VarName, ix: Tuple[int, ...], value: Union[int, float, str]) -> None:
+    """_update_env updates the environment for exprs incrementally, i.e. without rebuilding the lists.
+    """
+
+    if not ix:
+        env[name] = value
+        return
+    if not isinstance(env.get(name), list):
+        env[name] = []
+    container = env[name]
+    for i in ix[:-1]:
+        while len(container) <= i:
+            container.append([])
+        container = container[i]
+    while len(container) <= ix[-1]:
+        container.append(None)
+    container[ix[-1]] = value
+
+
+_Matcher = Callable[[_TokenStream, Dict[VarName, Any], Optional[Dict[VarName, ArrayValues]]], None]
+
+
+def _compile_format_node(node: FormatNode, *, variables: Dict[VarName, VarDecl], env_names: Optional[Set[VarName]] = None) -> _Matcher:
+    """_compile_format_node converts the given format tree to a function to match tokens.
+    The exprs in the tree are compiled only once here.
+
+    The returned function takes a stream of tokens, an environment for exprs and a buffer of the results, and updates them.
+    When the buffer is `None`, the matched values are not recorded.
+    It raises :any:`FormatMatchError`.
+
+    :param env_names: is the set of variables to keep in the environment. `None` means all variables.
     """
 
     if isinstance(node, ItemNode):
-        if not tokens:
-            raise FormatMatchError('unexpected end of tokens')
-        token = tokens.pop()
-        if token == '\n':
-            raise FormatMatchError('unexpected newline')
-        value: Optional[Union[int, float, str]] = None
-
-        # int
-        if value is None and (token == '0' or not token.startswith('0')):
-            try:
-                if int(token) < 2**64:
-                    value = int(token)
-            except ValueError:
-                pass
-
-        # float
-        if value is None and '.' in token:
-            try:
-                value = float(token)
-            except ValueError:
-                pass
-
-        # str
-        if value is None:
-            value = token
-
-        # update
-        ix = []
-        env = _get_env(values)
+        name = node.name
+        use_env = env_names is None or name in env_names
+        compiled_indices = []
         for str_i, str_dim, str_base in zip(node.indices, variables[node.name].dims, variables[node.name].bases):
-            i = evaluate(Expr(f"""{str_i} - ({str_base})"""), env=env)
-            dim = evaluate(str_dim, env=env)
-            if i is None:
-                raise FormatMatchError(f"""failed to evaluate: {str_i} - ({str_base})""")
-            if dim is None:
-                raise FormatMatchError(f"""failed to evaluate: {str_dim}""")
-            if i < 0 or dim <= i:
-                raise FormatMatchError(f"""out of bound: index is {i} but size is {dim}""")
-            ix.append(i)
-        values[node.name][tuple(ix)] = value
+            str_index = Expr(f"""{str_i} - ({str_base})""")
+            compiled_indices.append((str_index, compile_expr(str_index), str_dim, compile_expr(str_dim)))
+
+        def match_item(tokens: _TokenStream, env: Dict[VarName, Any], values: Optional[Dict[VarName, ArrayValues]]) -> None:
+            token = tokens.pop()
+            if token is None:
+                raise FormatMatchError('unexpected end of tokens')
+            if token == '\n':
+                raise FormatMatchError('unexpected newline')
+            value = _parse_token(token)
+
+            # update
+            ix = []
+            shape = []
+            for str_index, index, str_dim, dim in compiled_indices:
+                i = index(env)
+                n = dim(env)
+                if i is None:
+                    raise FormatMatchError(f"""failed to evaluate: {str_index}""")
+                if n is None:
+                    raise FormatMatchError(f"""failed to evaluate: {str_dim}""")
+                if i < 0 or n <= i:
+                    raise FormatMatchError(f"""out of bound: index is {i} but size is {n}""")
+                ix.append(i)
+                shape.append(n)
+            if values is not None:
+                values[name].set(tuple(ix), value, shape=tuple(shape))
+            if use_env:
+                _update_env(env, name, tuple(ix), value)
+
+        return match_item
 
     elif isinstance(node, NewlineNode):
-        if not tokens:
-            raise FormatMatchError('unexpected end of tokens')
-        if tokens[-1] != '\n':
-            raise FormatMatchError(f"""unexpected non-newline: {repr(tokens[-1])}""")
-        tokens.pop()
+
+        def match_newline(tokens: _TokenStream, env: Dict[VarName, Any], values: Optional[Dict[VarName, ArrayValues]]) -> None:
+            token = tokens.peek()
+            if token is None:
+                raise FormatMatchError('unexpected end of tokens')
+            if token != '\n':
+                raise FormatMatchError(f"""unexpected non-newline: {repr(token)}""")
+            tokens.pop()
+
+        return match_newline
 
     elif isinstance(node, SequenceNode):
-        for item in node.items:
-            _match_format_dfs(item, tokens, variables=variables, values=values)
+        items = [_compile_format_node(item, variables=variables, env_names=env_names) for item in node.items]
+
+        def match_sequence(tokens: _TokenStream, env: Dict[VarName, Any], values: Optional[Dict[VarName, ArrayValues]]) -> None:
+            for item in items:
+                item(tokens, env, values)
+
+        return match_sequence
 
     elif isinstance(node, LoopNode):
-        size = evaluate(node.size, env=_get_env(values))
-        if size is None:
-            raise FormatMatchError(f"""failed to evaluate: {node.size}""")
-        for i in range(size):
-            assert node.name not in values
-            values[node.name] = {(): i}
-            _match_format_dfs(node.body, tokens, variables=variables, values=values)
-            del values[node.name]
+        counter = node.name
+        str_size = node.size
+        size = compile_expr(node.size)
+        body = _compile_format_node(node.body, variables=variables, env_names=env_names)
+
+        def match_loop(tokens: _TokenStream, env: Dict[VarName, Any], values: Optional[Dict[VarName, ArrayValues]]) -> None:
+            n = size(env)
+            if n is None:
+                raise FormatMatchError(f"""failed to evaluate: {str_size}""")
+            assert values is None or counter not in values
+            for i in range(n):
+                env[counter] = i
+                body(tokens, env, values)
+            env.pop(counter, None)
+
+        return match_loop
 
     else:
         assert False
 
 
+def _list_names_in_exprs(node: FormatNode, *, variables: Dict[VarName, VarDecl]) -> Set[VarName]:
+    """_list_names_in_exprs lists the names which may be used in exprs of the tree.
+    The result may contain extra names, e.g. names of functions.
+    """
+
+    exprs: List[Expr] = []
+    for decl in variables.values():
+        exprs.extend(decl.dims)
+        exprs.extend(decl.bases)
+
+    def go(node: FormatNode) -> None:
+        if isinstance(node, ItemNode):
+            exprs.extend(node.indices)
+        elif isinstance(node, NewlineNode):
+            pass
+        elif isinstance(node, SequenceNode):
+            for item in node.items:
+                go(item)
+        elif isinstance(node, LoopNode):
+            exprs.append(node.size)
+            go(node.body)
+        else:
+            assert False
+
+    go(node)
+    return {VarName(name) for expr in exprs for name in re.findall(r'[A-Za-z_][0-9A-Za-z_]*', expr)}
+
+
 def match_format(
     node: FormatNode,
-    data: str,
+    data: Union[str, bytes, bytearray, mmap.mmap, BinaryIO],
     *,
     variables: Dict[VarName, VarDecl],
-    values: Optional[Dict[VarName, Dict[Tuple[int, ...], Union[int, float, str]]]] = None,
-) -> Dict[VarName, Dict[Tuple[int, ...], Union[int, float, str]]]:
+    values: Optional[Dict[VarName, ArrayValues]] = None,
+) -> Dict[VarName, ArrayValues]:
     """
     :raises FormatMatchError:
+    :param data: is a string, a bytes, a mmap or a binary file object. The data is tokenized lazily.
     :param values: is an optional argument to specify pre-defined variables.
     """
 
@@ -151,17 +436,32 @@ def match_format(
         values = {}
     for name in variables.keys():
         assert name not in values
-        values[name] = {}
-
-    # tokenize input
-    tokens = []
-    for line in data.splitlines():
-        tokens.extend(line.split())
-        tokens.append('\n')
-    tokens.reverse()
+        values[name] = ArrayValues()
 
     # match
-    _match_format_dfs(node, tokens, variables=variables, values=values)
-    if tokens:
-        raise FormatMatchError(f"""end of tokens is expected, but {repr(tokens[0])} found""")
+    tokens = _TokenStream(_tokenize(data))
+    env: Dict[VarName, Any] = dict(_get_env(values))
+    _compile_format_node(node, variables=variables)(tokens, env, values)
+    if tokens.peek() is not None:
+        raise FormatMatchError(f"""end of tokens is expected, but {repr(tokens.peek())} found""")
     return values
+
+
+def validate_format(
+    node: FormatNode,
+    data: Union[str, bytes, bytearray, mmap.mmap, BinaryIO],
+    *,
+    variables: Dict[VarName, VarDecl],
+) -> None:
+    """validate_format is a streaming version of :any:`match_format` which doesn't return the matched values.
+    Only the values used in exprs (e.g. sizes of arrays) are kept, so this works for large test cases.
+
+    :raises FormatMatchError:
+    """
+
+    tokens = _TokenStream(_tokenize(data))
+    env: Dict[VarName, Any] = {}
+    env_names = _list_names_in_exprs(node, variables=variables)
+    _compile_format_node(node, variables=variables, env_names=env_names)(tokens, env, None)
+    if tokens.peek() is not None:
+        raise FormatMatchError(f"""end of tokens is expected, but {repr(tokens.peek())} found""")
@@ -85,7 +85,8 @@ the module to find minimum format trees from sample strings
     size EOFNode = 1
 """
 
-import abc
+import array
+import concurrent.futures
 import heapq
 import itertools
 import string
@@ -98,44 +99,43 @@ from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
 
+_KIND_INT = 0
+_KIND_STRING = 1
+_KIND_NEWLINE = 2
 
-class _Token(abc.ABC):
-    row: int
-    column: int
 
-    def __init__(self, *, row: int, column: int):
-        self.row = row
-        self.column = column
+class _Tokens:
+    """_Tokens is a compact representation of a tokenized sample, with parallel arrays instead of an object for each token.
 
-    def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(L{self.row}C{self.column})"
+    :ivar kinds: is the kinds of tokens. Each item is one of `_KIND_INT`, `_KIND_STRING` and `_KIND_NEWLINE`.
+    :ivar values: is the values of int tokens. Items for other tokens are 0.
+    :ivar int_runs: is the run-lengths of int tokens, i.e. `int_runs[i]` is the number of consecutive int tokens starting from the `i`-th token. This has a sentinel at the end.
+    :ivar word_runs: is the run-lengths of int or string tokens, similarly.
+    """
 
+    __slots__ = ('kinds', 'values', 'int_runs', 'word_runs')
 
-class _IntToken(_Token):
-    value: int
+    def __init__(self, *, kinds: bytes, values: array.array):
+        assert len(kinds) == len(values)
+        self.kinds = kinds
+        self.values = values
+        self.int_runs = array.array('q', bytes(8 * (len(kinds) + 1)))
+        self.word_runs = array.array('q', bytes(8 * (len(kinds) + 1)))
+        for i in reversed(range(len(kinds))):
+            if kinds[i] == _KIND_INT:
+                self.int_runs[i] = self.int_runs[i + 1] + 1
+            if kinds[i] != _KIND_NEWLINE:
+                self.word_runs[i] = self.word_runs[i + 1] + 1
 
-    def __init__(self, *, value: int, row: int, column: int):
-        super().__init__(row=row, column=column)
-        self.value = value
+    def __len__(self) -> int:
+        return len(self.kinds)
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(L{self.row}C{self.column}, value={self.value})"
-
-
-class _StringToken(_Token):
-    value: str
-
-    def __init__(self, *, value: str, row: int, column: int):
-        super().__init__(row=row, column=column)
-        self.value = value
-
-
-class _NewlineToken(_Token):
-    pass
+        return f"{self.__class__.__name__}(kinds={self.kinds!r}, values={self.values!r})"
 
 
 class _MatchState(NamedTuple):
-    tokens: List[_Token]
+    tokens: _Tokens
     offset: int
     env: List[int]
 
@@ -145,19 +145,42 @@ class _MatchStop(Exception):
         self.state = state
 
 
-class _Node(abc.ABC):
+class _Node:
     """_Node is a node similar to FormatNode but is easy to use for optimization.
+    This is not an `abc.ABC` because `isinstance` for ABCs is slow and this class is used in the hot loop of the search.
+
+    Nodes are immutable. The size, the number of placeholders and the structural hash are computed once in constructors.
     """
+
+    size: int
+    placeholders: int
+    _hash: int
+
+    def __eq__(self, other: Any) -> bool:
+        return self is other or (self.__class__ is other.__class__ and self._hash == other._hash and self._children_eq(other))
+
+    def _children_eq(self, other: Any) -> bool:
+        return True
+
+    def __hash__(self) -> int:
+        return self._hash
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
 
 
 class _PlaceholderNode(_Node):
-    pass
+    def __init__(self) -> None:
+        self.size = 1
+        self.placeholders = 1
+        self._hash = hash(_PlaceholderNode)
 
 
 class _EOFNode(_Node):
-    pass
+    def __init__(self) -> None:
+        self.size = 1
+        self.placeholders = 0
+        self._hash = hash(_EOFNode)
 
 
 class _SimpleNonLeafNode(_Node):
@@ -165,6 +188,12 @@ class _SimpleNonLeafNode(_Node):
 
     def __init__(self, *, next: _Node):
         self.next = next
+        self.size = 1 + next.size
+        self.placeholders = next.placeholders
+        self._hash = hash((self.__class__, next._hash))
+
+    def _children_eq(self, other: Any) -> bool:
+        return self.next == other.next
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(next={self.next})"
@@ -194,22 +223,19 @@ class _LoopNode(_Node):
         self.delta = delta
         self.body = body
         self.next = next
+        self.size = 1 + abs(delta) + body.size + next.size
+        self.placeholders = body.placeholders + next.placeholders
+        self._hash = hash((_LoopNode, index, delta, body._hash, next._hash))
+
+    def _children_eq(self, other: Any) -> bool:
+        return self.index == other.index and self.delta == other.delta and self.body == other.body and self.next == other.next
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(index={self.index}, delta={self.delta}, body={self.body}, next={self.next})"
 
 
 def get_tree_size(node: _Node) -> int:
-    if isinstance(node, _PlaceholderNode):
-        return 1
-    elif isinstance(node, _EOFNode):
-        return 1
-    elif isinstance(node, _SimpleNonLeafNode):
-        return 1 + get_tree_size(node.next)
-    elif isinstance(node, _LoopNode):
-        return 1 + abs(node.delta) + get_tree_size(node.body) + get_tree_size(node.next)
-    else:
-        assert False
+    return node.size
 
 
 def run_match(node: _Node, state: _MatchState) -> Optional[_MatchState]:
@@ -227,10 +253,9 @@ def run_match(node: _Node, state: _MatchState) -> Optional[_MatchState]:
         assert 0 <= state.offset <= len(state.tokens)
         if state.offset >= len(state.tokens):
             return None
-        token = state.tokens[state.offset]
-        if not isinstance(token, _IntToken):
+        if state.tokens.kinds[state.offset] != _KIND_INT:
             return None
-        state = _MatchState(tokens=state.tokens, offset=state.offset + 1, env=[token.value] + state.env)
+        state = _MatchState(tokens=state.tokens, offset=state.offset + 1, env=[state.tokens.values[state.offset]] + state.env)
         return run_match(node.next, state)
 
     elif isinstance(node, _StringNode):
@@ -238,7 +263,7 @@ def run_match(node: _Node, state: _MatchState) -> Optional[_MatchState]:
         if state.offset >= len(state.tokens):
             return None
         # An int is a str. `101` is an int but `1010100101010101010100111111101010101` may be a str. `10.1` is also a str.
-        if not isinstance(state.tokens[state.offset], _StringToken) and not isinstance(state.tokens[state.offset], _IntToken):
+        if state.tokens.kinds[state.offset] == _KIND_NEWLINE:
             return None
         state = _MatchState(tokens=state.tokens, offset=state.offset + 1, env=state.env)
         return run_match(node.next, state)
@@ -247,7 +272,7 @@ def run_match(node: _Node, state: _MatchState) -> Optional[_MatchState]:
         assert 0 <= state.offset <= len(state.tokens)
         if state.offset >= len(state.tokens):
             return None
-        if not isinstance(state.tokens[state.offset], _NewlineToken):
+        if state.tokens.kinds[state.offset] != _KIND_NEWLINE:
             return None
         state = _MatchState(tokens=state.tokens, offset=state.offset + 1, env=state.env)
         return run_match(node.next, state)
@@ -259,6 +284,14 @@ def run_match(node: _Node, state: _MatchState) -> Optional[_MatchState]:
             # loops of zero times cause some problems because some placeholders may be skipped
             return None
 
+        if isinstance(node.body, _SimpleNonLeafNode) and isinstance(node.body.next, _EOFNode) and not isinstance(node.body, _NewlineNode):
+            # loops of a single int or string, e.g. `A_1 A_2 ... A_N`, are matched in O(1) with the run-lengths
+            runs = state.tokens.int_runs if isinstance(node.body, _IntNode) else state.tokens.word_runs
+            if runs[state.offset] < count:
+                return None
+            state = _MatchState(tokens=state.tokens, offset=state.offset + count, env=state.env)
+            return run_match(node.next, state)
+
         for _ in range(count):
             result = run_match(node.body, state)
             if result is None:
@@ -271,82 +304,102 @@ def run_match(node: _Node, state: _MatchState) -> Optional[_MatchState]:
 
 
 def count_placeholder(node: _Node) -> int:
-    if isinstance(node, _PlaceholderNode):
-        return 1
-    elif isinstance(node, _EOFNode):
-        return 0
-    elif isinstance(node, _SimpleNonLeafNode):
-        return count_placeholder(node.next)
-    elif isinstance(node, _LoopNode):
-        return count_placeholder(node.body) + count_placeholder(node.next)
-    else:
-        assert False
+    return node.placeholders
+
+
+def _is_first_placeholder_on_spine(node: _Node) -> bool:
+    """_is_first_placeholder_on_spine checks whether the first placeholder is reached without entering bodies of loops.
+    If so, the placeholder is reached only once, and matching can be resumed from the state at the placeholder.
+    """
+
+    while True:
+        if isinstance(node, _PlaceholderNode):
+            return True
+        elif isinstance(node, _EOFNode):
+            return False
+        elif isinstance(node, _SimpleNonLeafNode):
+            node = node.next
+        elif isinstance(node, _LoopNode):
+            if node.body.placeholders:
+                return False
+            node = node.next
+        else:
+            assert False
 
 
 def get_replaced_first_placeholder(node: _Node, subst: _Node) -> Optional[_Node]:
+    if not node.placeholders:
+        return None
     if isinstance(node, _PlaceholderNode):
         return subst
-    elif isinstance(node, _EOFNode):
-        return None
     elif isinstance(node, _SimpleNonLeafNode):
         next = get_replaced_first_placeholder(node.next, subst)
-        if next is None:
-            return None
-        else:
-            return node.__class__(next=next)
+        assert next is not None
+        return node.__class__(next=next)
     elif isinstance(node, _LoopNode):
-        body = get_replaced_first_placeholder(node.body, subst)
-        if body is not None:
+        if node.body.placeholders:
+            body = get_replaced_first_placeholder(node.body, subst)
+            assert body is not None
             return _LoopNode(index=node.index, delta=node.delta, body=body, next=node.next)
         else:
             next = get_replaced_first_placeholder(node.next, subst)
-            if next is not None:
-                return _LoopNode(index=node.index, delta=node.delta, body=node.body, next=next)
-            else:
-                return None
+            assert next is not None
+            return _LoopNode(index=node.index, delta=node.delta, body=node.body, next=next)
     else:
         assert False
 
 
 class _PriorityQueue:
     def __init__(self) -> None:
-        self._heap: List[Tuple[int, int, _Node]] = []
+        self._heap: List[Tuple[int, int, Any]] = []
         self._counter = itertools.count()
 
-    def push(self, cost: int, node: _Node) -> None:
-        # Put an index to costs to avoid comparison of nodes.
-        heapq.heappush(self._heap, (cost, next(self._counter), node))
+    def push(self, cost: int, item: Any) -> None:
+        # Put an index to costs to avoid comparison of items.
+        heapq.heappush(self._heap, (cost, next(self._counter), item))
 
-    def pop(self) -> _Node:
+    def pop(self) -> Any:
         """pop() returns the item which has smallest cost value.
         :raises IndexError:
         """
 
-        _, _, node = heapq.heappop(self._heap)
-        return node
+        _, _, item = heapq.heappop(self._heap)
+        return item
+
+    def peek_cost(self) -> int:
+        """
+        :raises IndexError:
+        """
+
+        cost, _, _ = self._heap[0]
+        return cost
 
     def empty(self) -> bool:
         return not self._heap
 
 
-def tokenize_content(content: str) -> Iterator[_Token]:
+def tokenize_content(content: str) -> _Tokens:
     # The int tokens are tokens which can be used as loop sizes. Only small integers satisfy this condition.
     int_max = len(content.split()) + len(content.splitlines()) + 3
 
-    for y, line in enumerate(content.splitlines(keepends=True)):
-        words = line.split()
-        for x, word in enumerate(words):
+    kinds = bytearray()
+    values = array.array('q')
+    for line in content.splitlines(keepends=True):
+        for word in line.split():
             try:
                 n = int(word)
             except ValueError:
-                yield _StringToken(value=word, row=y, column=x)
+                n = -1
+            if 0 <= n <= int_max:
+                kinds.append(_KIND_INT)
+                values.append(n)
             else:
-                if 0 <= n <= int_max:
-                    yield _IntToken(value=n, row=y, column=x)
-                else:
-                    yield _StringToken(value=word, row=y, column=x)
+                kinds.append(_KIND_STRING)
+                values.append(0)
         if line.endswith('\n'):  # including "\r\n"
-            yield _NewlineToken(row=y, column=len(words))
+            kinds.append(_KIND_NEWLINE)
+            values.append(0)
+    return _Tokens(kinds=bytes(kinds), values=values)
 
 
 def list_next_possible_node(states: List[_MatchState]) -> Iterator[_Node]:
@@ -367,7 +420,7 @@ def list_next_possible_node(states: List[_MatchState]) -> Iterator[_Node]:
         return
 
     # when all next tokens are int tokens
-    if all([isinstance(state.tokens[state.offset], _IntToken) for state in states]):
+    if all([state.tokens.kinds[state.offset] == _KIND_INT for state in states]):
         yield _IntNode(next=_PlaceholderNode())
         for i in range(env_size):
             for delta in (-1, 0, 1):
@@ -376,7 +429,7 @@ def list_next_possible_node(states: List[_MatchState]) -> Iterator[_Node]:
         return
 
     # when all next tokens are string tokens
-    if all([isinstance(state.tokens[state.offset], _StringToken) or isinstance(state.tokens[state.offset], _IntToken) for state in states]):
+    if all([state.tokens.kinds[state.offset] != _KIND_NEWLINE for state in states]):
         yield _StringNode(next=_PlaceholderNode())
         for i in range(env_size):
             for delta in (-1, 0, 1):
@@ -385,7 +438,7 @@ def list_next_possible_node(states: List[_MatchState]) -> Iterator[_Node]:
         return
 
     # when all next tokens are newline tokens
-    if all([isinstance(state.tokens[state.offset], _NewlineToken) for state in states]):
+    if all([state.tokens.kinds[state.offset] == _KIND_NEWLINE for state in states]):
         yield _NewlineNode(next=_PlaceholderNode())
         # don't yield loop node here
         return
@@ -393,46 +446,122 @@ def list_next_possible_node(states: List[_MatchState]) -> Iterator[_Node]:
     return
 
 
-def _construct_minimum_input_format_internal_tree(*, instances: List[List[_Token]], initial_env: Optional[List[List[int]]] = None, iteration_limit: int = 10000, size_limit: int = 20, initial_node: _Node = _PlaceholderNode()) -> Optional[_Node]:
+def _run_match_or_stop(node: _Node, state: _MatchState) -> Optional[_MatchState]:
+    """_run_match_or_stop runs the matching and returns the state at the first placeholder or at EOF.
+    """
+
+    try:
+        result = run_match(node, state)
+        if result is None:
+            return None
+        if result.offset != len(result.tokens):
+            return None  # matching finished before EOF
+        return result
+    except _MatchStop as e:
+        return e.state
+
+
+def _match_candidate(node: _Node, starts: List[_MatchState]) -> Optional[List[_MatchState]]:
+    states: List[_MatchState] = []
+    for start in starts:
+        state = _run_match_or_stop(node, start)
+        if state is None:
+            return None
+        states.append(state)
+    return states
+
+
+# The tokenized instances in worker processes. They are sent only once per worker, in _init_worker.
+_worker_instances: List[_Tokens] = []
+
+
+def _init_worker(instances: List[_Tokens]) -> None:
+    global _worker_instances
+    _worker_instances = instances
+
+
+def _match_candidate_in_worker(task: Tuple[_Node, List[Tuple[int, List[int]]]]) -> Optional[List[Tuple[int, List[int]]]]:
+    """_match_candidate_in_worker is :any:`_match_candidate` for worker processes. States are sent as pairs of offsets and envs, without tokens.
+    """
+
+    node, starts = task
+    states = _match_candidate(node, [_MatchState(tokens=tokens, offset=offset, env=env) for tokens, (offset, env) in zip(_worker_instances, starts)])
+    if states is None:
+        return None
+    return [(state.offset, state.env) for state in states]
+
+
+def _construct_minimum_input_format_internal_tree(*, instances: List[_Tokens], initial_env: Optional[List[List[int]]] = None, iteration_limit: int = 10000, size_limit: int = 20, initial_node: _Node = _PlaceholderNode(), workers: Optional[int] = None) -> Optional[_Node]:
+    """
+    :param workers: is the number of worker processes to match candidates in parallel. The search is serial when this is `None`. The result doesn't depend on this.
+    """
+
+    if workers is None:
+        return _construct_minimum_input_format_internal_tree_with_executor(instances=instances, initial_env=initial_env, iteration_limit=iteration_limit, size_limit=size_limit, initial_node=initial_node, executor=None, workers=1, batch_size=1)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(instances, )) as executor:
+        return _construct_minimum_input_format_internal_tree_with_executor(instances=instances, initial_env=initial_env, iteration_limit=iteration_limit, size_limit=size_limit, initial_node=initial_node, executor=executor, workers=workers, batch_size=32 * workers)
+
+
+def _construct_minimum_input_format_internal_tree_with_executor(*, instances: List[_Tokens], initial_env: Optional[List[List[int]]], iteration_limit: int, size_limit: int, initial_node: _Node, executor: Optional[concurrent.futures.Executor], workers: int, batch_size: int) -> Optional[_Node]:
     # init
+    # Each item is a triple of a parent tree, a node to replace the first placeholder of the parent, and optionally the states to resume the matching from.
+    # Trees are constructed lazily when popped, because most pushed trees are never popped.
     que = _PriorityQueue()
-    que.push(get_tree_size(initial_node), initial_node)
+    que.push(get_tree_size(initial_node), (None, initial_node, None))
+    visited: Set[_Node] = set()
     while not que.empty():
-        # pop
-        cur = que.pop()
+        # pop a batch of candidates with the same cost
+        # Children of a candidate never cost less than the candidate, so processing a batch in order is equivalent to processing the candidates one by one.
+        batch: List[Tuple[_Node, _Node, List[_MatchState]]] = []
+        cost = que.peek_cost()
+        while not que.empty() and que.peek_cost() == cost and len(batch) < batch_size:
+            parent, delta, resume = que.pop()
+            if parent is None:
+                cur = delta
+            else:
+                cur = get_replaced_first_placeholder(parent, delta)
+                assert cur is not None
+            if cur in visited:
+                continue  # structurally identical trees give the same results
+            visited.add(cur)
+
+            if resume is not None:
+                batch.append((cur, delta, resume))
+            else:
+                starts = []
+                for i, instance in enumerate(instances):
+                    if initial_env is not None:
+                        env = initial_env[i]
+                    else:
+                        env = []
+                    starts.append(_MatchState(tokens=instance, offset=0, env=env))
+                batch.append((cur, cur, starts))
 
         # calc
-        states = []
-        for i, instance in enumerate(instances):
-            if initial_env is not None:
-                env = initial_env[i]
-            else:
-                env = []
-            try:
-                state = run_match(cur, _MatchState(tokens=instance, offset=0, env=env))
-                if state is None:
-                    break
-                if state.offset != len(state.tokens):
-                    break  # matching finished before EOF
-            except _MatchStop as e:
-                state = e.state
-            states.append(state)
-        if len(states) != len(instances):
-            continue
-        if all([state.offset == len(state.tokens) for state in states]) and not count_placeholder(cur):
-            return cur
-
-        # push
-        for delta in list_next_possible_node(states):
-            nxt = get_replaced_first_placeholder(cur, delta)
-            assert nxt is not None
-            if get_tree_size(nxt) <= size_limit:
-                que.push(get_tree_size(nxt), nxt)
-
-        # timeout. This function doesn't have good time complexity, so may take too long time.
-        iteration_limit -= 1
-        if iteration_limit < 0:
-            break
+        results: Iterable[Optional[List[_MatchState]]]
+        if executor is None:
+            results = [_match_candidate(node, starts) for _, node, starts in batch]
+        else:
+            tasks = [(node, [(start.offset, start.env) for start in starts]) for _, node, starts in batch]
+            results = [None if result is None else [_MatchState(tokens=tokens, offset=offset, env=env) for tokens, (offset, env) in zip(instances, result)] for result in executor.map(_match_candidate_in_worker, tasks, chunksize=(len(tasks) + workers - 1) // workers)]
+
+        for (cur, _, _), states in zip(batch, results):
+            if states is None:
+                continue
+            if all([state.offset == len(state.tokens) for state in states]) and not count_placeholder(cur):
+                return cur
+
+            # push
+            resumable = _is_first_placeholder_on_spine(cur)
+            for nxt_delta in list_next_possible_node(states):
+                size = get_tree_size(cur) - 1 + get_tree_size(nxt_delta)
+                if size <= size_limit:
+                    que.push(size, (cur, nxt_delta, states if resumable else None))
+
+            # timeout. This function doesn't have good time complexity, so may take too long time.
+            iteration_limit -= 1
+            if iteration_limit < 0:
+                return None
 
     return None
 
@@ -503,13 +632,17 @@ def _convert_to_format_node(node: _Node, *, env: List[EnvItem], used: Set[VarNam
         assert False
 
 
-def construct_minimum_input_format_tree(*, instances: List[str], multiple_test_cases: bool = False) -> Optional[FormatNode]:
-    tokenized_instances = [list(tokenize_content(instance)) for instance in instances]
+def construct_minimum_input_format_tree(*, instances: List[str], multiple_test_cases: bool = False, workers: Optional[int] = None) -> Optional[FormatNode]:
+    """
+    :param workers: is the number of worker processes for the search. `None` means the serial search.
+    """
+
+    tokenized_instances = [tokenize_content(instance) for instance in instances]
     if multiple_test_cases:
         initial_node: _Node = _IntNode(next=_NewlineNode(next=_LoopNode(index=0, delta=0, body=_PlaceholderNode(), next=_EOFNode())))
     else:
         initial_node = _PlaceholderNode()
-    node = _construct_minimum_input_format_internal_tree(instances=tokenized_instances, initial_node=initial_node)
+    node = _construct_minimum_input_format_internal_tree(instances=tokenized_instances, initial_node=initial_node, workers=workers)
     if node is None:
         return None
     format_node = _convert_to_format_node(node, env=[], used=set(), fixed_names=(multiple_test_cases and [node_util.testcases_varname] or []))
@@ -517,11 +650,11 @@ def construct_minimum_input_format_tree(*, instances: List[str], multiple_test_c
     return node_util.remove_superfluous_sequence_nodes(format_node)
 
 
-def construct_minimum_output_format_tree(*, instances: List[str]) -> Optional[FormatNode]:
-    return construct_minimum_input_format_tree(instances=instances)
+def construct_minimum_output_format_tree(*, instances: List[str], workers: Optional[int] = None) -> Optional[FormatNode]:
+    return construct_minimum_input_format_tree(instances=instances, workers=workers)
 
 
-def construct_minimum_output_format_tree_using_input_format(*, instances: List[SampleCase], input_format: FormatNode, input_variables: Dict[VarName, VarDecl], multiple_test_cases: bool) -> Optional[FormatNode]:
+def construct_minimum_output_format_tree_using_input_format(*, instances: List[SampleCase], input_format: FormatNode, input_variables: Dict[VarName, VarDecl], multiple_test_cases: bool, workers: Optional[int] = None) -> Optional[FormatNode]:
     # prepare environments
     minimizer_env: List[List[int]] = []
     converter_env: List[EnvItem] = []
@@ -529,7 +662,7 @@ def construct_minimum_output_format_tree_using_input_format(*, instances: List[S
     try:
         for i, data in enumerate(instances):
             minimizer_env.append([])
-            input_values = match_format(input_format, data.input.decode(), variables=input_variables)
+            input_values = match_format(input_format, data.input, variables=input_variables)
             for name in sorted(input_variables.keys()):
                 decl = input_variables[name]
                 if (decl.type == VarType.IndexInt or decl.type == VarType.ValueInt) and not decl.dims:
@@ -543,19 +676,19 @@ def construct_minimum_output_format_tree_using_input_format(*, instances: List[S
     except FormatMatchError as e:
         logger.debug('failed to match sample input: %s', e)
         output_samples = [case.output.decode() for case in instances]
-        return construct_minimum_output_format_tree(instances=output_samples)
+        return construct_minimum_output_format_tree(instances=output_samples, workers=workers)
     for i in range(len(minimizer_env)):
         assert len(minimizer_env[i]) == len(converter_env)
 
     # construct the tree
-    tokenized_instances = [list(tokenize_content(instance.output.decode())) for instance in instances]
+    tokenized_instances = [tokenize_content(instance.output.decode()) for instance in instances]
     initial_node: _Node = _PlaceholderNode()
     if multiple_test_cases:
         for i, item in enumerate(converter_env):
             if item.name == node_util.testcases_varname:
                 initial_node = _LoopNode(index=i, delta=0, body=_PlaceholderNode(), next=_EOFNode())
                 break
-    node = _construct_minimum_input_format_internal_tree(instances=tokenized_instances, initial_env=minimizer_env, initial_node=initial_node)
+    node = _construct_minimum_input_format_internal_tree(instances=tokenized_instances, initial_env=minimizer_env, initial_node=initial_node, workers=workers)
     if node is None:
         return None
 
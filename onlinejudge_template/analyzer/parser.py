@@ -29,6 +29,8 @@ the module to parse format strings and construct format trees
 """
 
 import abc
+import copy
+import functools
 import re
 from logging import getLogger
 from typing import *
@@ -69,7 +71,10 @@ tokens = (
 )
 
 
+@functools.lru_cache(maxsize=None)
 def build_lexer() -> lex.Lexer:
+    """build_lexer builds the lexer only once. Use `clone()` to get a lexer to use.
+    """
     def t_NEWLINE(t: lex.LexToken) -> lex.LexToken:
         r"""(\r?\n|<br>)"""
         t.lexer.lineno += 1
@@ -171,15 +176,18 @@ class DotsParserNode(ParserNode):
         self.last = last
 
 
-def build_parser(*, input: str) -> yacc.LRParser:
-    def find_column(lexpos: int) -> int:
+@functools.lru_cache(maxsize=None)
+def build_parser() -> yacc.LRParser:
+    """build_parser builds the LALR tables only once. Use `copy.copy()` to get a parser to use.
+    """
+    def find_column(input: str, lexpos: int) -> int:
         line_start = input.rfind('\n', 0, lexpos) + 1
         return lexpos - line_start + 1
 
     def loc(p: yacc.YaccProduction) -> Dict[str, int]:
         return {
             'line': p.lineno(1),
-            'column': find_column(p.lexpos(1)),
+            'column': find_column(p.lexer.lexdata, p.lexpos(1)),
         }
 
     def p_main(p: yacc.YaccProduction) -> None:
@@ -268,7 +276,7 @@ def build_parser(*, input: str) -> yacc.LRParser:
         p[0] = p[1]
 
     def p_error(t: lex.LexToken) -> None:
-        raise FormatStringParserError("parser: unexpected token: {} \"{}\" at line {} column {}".format(t.type, t.value, t.lineno, find_column(t.lexpos)))
+        raise FormatStringParserError("parser: unexpected token: {} \"{}\" at line {} column {}".format(t.type, t.value, t.lineno, find_column(t.lexer.lexdata, t.lexpos)))
 
     return yacc.yacc(debug=False, write_tables=False)
 
@@ -447,12 +455,13 @@ def run(pre: str) -> FormatNode:
     """
 
     # list tokens with lex
-    lexer = build_lexer()
+    # The lexer and the parser have states for each input, so we use copies of them.
+    lexer = build_lexer().clone()
     lexer.input(pre)
     logger.debug('Lex tokens: %s', list(lexer.clone()))
 
     # make a tree with yacc
-    parser = build_parser(input=pre)
+    parser = copy.copy(build_parser())
     parsed = parser.parse(lexer=lexer)
     logger.debug('Yacc tree: %s', parsed)
 
@@ -323,7 +323,7 @@ def guess_output_format_with_pattern_matching_using_input_format(*, instances: L
     for pattern, variables in list_all_patterns():
         try:
             for data in instances:
-                match_format(pattern, data.output.decode(), variables=variables)
+                match_format(pattern, data.output, variables=variables)
         except FormatMatchError:
             pass
         else:
@@ -349,9 +349,9 @@ def guess_output_format_with_pattern_matching_using_input_format(*, instances: L
                 # try matching
                 try:
                     for data in instances:
-                        input_values = match_format(input_format, data.input.decode(), variables=input_variables)
+                        input_values = match_format(input_format, data.input, variables=input_variables)
                         values = {name: input_values[name]}  # hide variables other than the `name`
-                        match_format(pattern, data.output.decode(), variables=variables, values=values)
+                        match_format(pattern, data.output, variables=variables, values=values)
                 except FormatMatchError as e:
                     logger.error(e)
                 else:
@@ -14,7 +14,9 @@ the module to manipulate mathematical expressions (e.g. ``2 * n + 1``, ``a_i + i
 # TODO: move and split this module?
 
 import abc
+import copy
 import fractions
+import functools
 import re
 from logging import getLogger
 from typing import *
@@ -26,30 +28,51 @@ from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
 
+# the maximum number of entries of each cache of parsed or simplified exprs
+_CACHE_SIZE = 4096
+
 
 class ExprParserError(AnalyzerError):
     pass
 
 
 class _Expr(abc.ABC):
-    pass
+    """_Expr is an immutable node of exprs. Nodes are hashable and compared structurally, so they can be used as keys of caches.
+    """
+
+    __slots__ = ('_hash', )
+    _hash: int
+
+    def __hash__(self) -> int:
+        return self._hash
 
 
 class _Variable(_Expr):
     """_Variable represents a symbol whose value is not fixed.
     """
+
+    __slots__ = ('name', 'args')
+
     def __init__(self, name: str, *args: _Expr):
         self.name = name
         self.args = args
+        self._hash = hash((_Variable, name, args))
+
+    __hash__ = _Expr.__hash__
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.name == other.name and self.args == other.args
+        return self is other or (isinstance(other, self.__class__) and self._hash == other._hash and self.name == other.name and self.args == other.args)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(map(repr, (self.name, *self.args)))})"
 
 
 class _Function(_Expr):
     """_Function represents an n-ary symbol (n >= 1) whose value is fixed.
     """
 
+    __slots__ = ('value', 'args')
+
     ADD = '__add__'
     SUB = '__sub__'
     MUL = '__mul__'
@@ -59,19 +82,34 @@ class _Function(_Expr):
     def __init__(self, value: str, *args: _Expr):
         self.value = value
         self.args = args
+        self._hash = hash((_Function, value, args))
+
+    __hash__ = _Expr.__hash__
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.value == other.value and self.args == other.args
+        return self is other or (isinstance(other, self.__class__) and self._hash == other._hash and self.value == other.value and self.args == other.args)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(map(repr, (self.value, *self.args)))})"
 
 
 class _Constant(_Expr):
     """_Constant represents a 0-ary symbol whose value is fixed.
     """
+
+    __slots__ = ('value', )
+
     def __init__(self, value: int):
         self.value = value
+        self._hash = hash((_Constant, value))
+
+    __hash__ = _Expr.__hash__
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.value == other.value
+        return self is other or (isinstance(other, self.__class__) and self.value == other.value)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.value!r})"
 
 
 _tokens = (
@@ -90,7 +128,11 @@ _tokens = (
 )
 
 
+@functools.lru_cache(maxsize=None)
 def _build_lexer() -> lex.Lexer:
+    """_build_lexer builds the lexer only once. Use `clone()` to get a lexer to use.
+    """
+
     tokens = _tokens
 
     t_ignore = ' '
@@ -117,19 +159,17 @@ def _build_lexer() -> lex.Lexer:
     return lex.lex()
 
 
-def _build_parser(*, input: str) -> yacc.LRParser:
+@functools.lru_cache(maxsize=None)
+def _build_parser() -> yacc.LRParser:
+    """_build_parser builds the LALR tables only once. Use `copy.copy()` to get a parser to use.
+    """
+
     tokens = _tokens
 
-    def find_column(lexpos: int) -> int:
+    def find_column(input: str, lexpos: int) -> int:
         line_start = input.rfind('\n', 0, lexpos) + 1
         return lexpos - line_start + 1
 
-    def loc(p: yacc.YaccProduction) -> Dict[str, int]:
-        return {
-            'line': p.lineno(1),
-            'column': find_column(p.lexpos(1)),
-        }
-
     def p_expr(p: yacc.YaccProduction) -> None:
         """expr : expr ADD term
                 | expr SUB term
@@ -198,20 +238,25 @@ def _build_parser(*, input: str) -> yacc.LRParser:
         if t is None:
             raise ExprParserError("parser: something wrong")
         else:
-            raise ExprParserError("parser: unexpected token: {} \"{}\" at line {} column {}".format(t.type, t.value, t.lineno, find_column(t.lexpos)))
+            raise ExprParserError("parser: unexpected token: {} \"{}\" at line {} column {}".format(t.type, t.value, t.lineno, find_column(t.lexer.lexdata, t.lexpos)))
 
     return yacc.yacc(debug=False, write_tables=False)
 
 
+@functools.lru_cache(maxsize=_CACHE_SIZE)
 def _parse(s: str) -> _Expr:
     """
     :raises ExprParserError:
+
+    .. note::
+        The results are cached and shared. Don't modify them.
     """
 
     try:
-        lexer = _build_lexer()
+        # The lexer and the parser have states for each input, so we use copies of them.
+        lexer = _build_lexer().clone()
         lexer.input(s)
-        parser = _build_parser(input=s)
+        parser = copy.copy(_build_parser())
         return parser.parse(lexer=lexer)
     except ExprParserError as e:
         logger.debug('failed to parse {}: {}'.format(repr(s), e))
@@ -258,6 +303,9 @@ def _format(e: _Expr) -> str:
     return go(e, prec=0)
 
 
+_Env = Mapping[VarName, Union[int, List[int], List[List[int]], List[List[List[int]]]]]
+
+
 def _get_subscripted_value(value: Union[int, List[int], List[List[int]], List[List[List[int]]]], args: List[int], *, name_for_error_message: str) -> int:
     """
     :raises ExprParserError:
@@ -267,59 +315,131 @@ def _get_subscripted_value(value: Union[int, List[int], List[List[int]], List[Li
     for depth, index in enumerate(args):
         if not isinstance(result, list):
             raise ExprParserError('{} is expected to have type int^{} -> int, but actually has type int^{} -> {}'.format(name_for_error_message, len(args), depth + 1, type(result).__name__))
+        if not 0 <= index < len(result):
+            raise ExprParserError('index out of range: {}[{}]'.format(name_for_error_message, ', '.join(map(str, args))))
         result = result[index]
     if not isinstance(result, int):
         raise ExprParserError('{} is expected to have type int^{} -> int, but actually has type int^{} -> {}'.format(name_for_error_message, len(args), len(args), type(result).__name__))
     return result
 
 
-def evaluate(s: Expr, *, env: Mapping[VarName, Union[int, List[int], List[List[int]], List[List[List[int]]]]] = {}) -> Optional[int]:
-    """evaluate converts the given expr to an integer.
+def _has_division(e: _Expr) -> bool:
+    if isinstance(e, _Variable):
+        return any(map(_has_division, e.args))
+    elif isinstance(e, _Function):
+        return e.value == _Function.DIV or any(map(_has_division, e.args))
+    elif isinstance(e, _Constant):
+        return False
+    else:
+        assert False
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _compile(e: _Expr) -> Callable[[_Env], int]:
+    """_compile converts the given expr to a closure which evaluates the expr.
+
+    The closure computes with `int` when the expr has no divisions, and computes with `fractions.Fraction` only when the expr has divisions.
+
+    :returns: a closure which raises :any:`ExprParserError` when evaluation fails
     """
-    def go(e: _Expr) -> fractions.Fraction:
+
+    exact = _has_division(e)
+
+    def go(e: _Expr) -> Callable[[_Env], Any]:
         if isinstance(e, _Variable):
-            if e.name not in env:
-                raise ExprParserError('{} is not defined'.format(e.name))
-            args: List[fractions.Fraction] = list(map(go, e.args))
-            indices: List[int] = []
-            for arg in args:
-                if arg.denominator != 1:
-                    raise ExprParserError('indices must be an integer, not fraction: {}[{}]'.format(e.name, ', '.join(map(str, args))))
-                indices.append(arg.numerator)
-            return fractions.Fraction(_get_subscripted_value(env[VarName(e.name)], indices, name_for_error_message=e.name))
+            name = VarName(e.name)
+            args = list(map(go, e.args))
+
+            def variable(env: _Env) -> Any:
+                if name not in env:
+                    raise ExprParserError('{} is not defined'.format(name))
+                indices: List[int] = []
+                for arg in args:
+                    index = arg(env)
+                    if exact:
+                        if index.denominator != 1:
+                            raise ExprParserError('indices must be an integer, not fraction: {}[{}]'.format(name, index))
+                        index = index.numerator
+                    indices.append(index)
+                value = _get_subscripted_value(env[name], indices, name_for_error_message=name)
+                return fractions.Fraction(value) if exact else value
+
+            return variable
+
         elif isinstance(e, _Function):
             args = list(map(go, e.args))
-            if e.value == _Function.ADD and len(e.args) == 2:
-                return args[0] + args[1]
-            elif e.value == _Function.SUB and len(e.args) == 2:
-                return args[0] - args[1]
-            elif e.value == _Function.MUL and len(e.args) == 2:
-                return args[0] * args[1]
-            elif e.value == _Function.DIV and len(e.args) == 2:
-                return args[0] / args[1]
-            elif e.value == _Function.NEG and len(e.args) == 1:
-                return -args[0]
+            if e.value == _Function.ADD and len(args) == 2:
+                lhs, rhs = args
+                return lambda env: lhs(env) + rhs(env)
+            elif e.value == _Function.SUB and len(args) == 2:
+                lhs, rhs = args
+                return lambda env: lhs(env) - rhs(env)
+            elif e.value == _Function.MUL and len(args) == 2:
+                lhs, rhs = args
+                return lambda env: lhs(env) * rhs(env)
+            elif e.value == _Function.DIV and len(args) == 2:
+                lhs, rhs = args
+
+                def div(env: _Env) -> fractions.Fraction:
+                    denominator = rhs(env)
+                    if denominator == 0:
+                        raise ExprParserError('division by zero')
+                    return lhs(env) / denominator
+
+                return div
+            elif e.value == _Function.NEG and len(args) == 1:
+                arg, = args
+                return lambda env: -arg(env)
             else:
                 assert False
+
         elif isinstance(e, _Constant):
-            return fractions.Fraction(e.value)
+            value = fractions.Fraction(e.value) if exact else e.value
+            return lambda env: value
+
         else:
             assert False
 
+    f = go(e)
+    if not exact:
+        return f
+
+    def to_integer(env: _Env) -> int:
+        evaluated = f(env)
+        if evaluated.denominator != 1:
+            raise ExprParserError('{} is not an integer'.format(evaluated))
+        return evaluated.numerator
+
+    return to_integer
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def compile_expr(s: Expr) -> Callable[[_Env], Optional[int]]:
+    """compile_expr converts the given expr to a function which works as same as `evaluate(s, env=env)`.
+    Use this when you evaluate the same expr many times.
+    """
+
     try:
-        expr = _parse(s)
-    except ExprParserError as e:
-        logger.debug('failed to parse {}: {}'.format(repr(s), e))
-        return None
-    try:
-        evaluated = go(expr)
+        f = _compile(_parse(s))
     except ExprParserError as e:
-        logger.debug('failed to evaluate {} in {}: {}'.format(repr(s), env, e))
-        return None
-    if evaluated.denominator != 1:
-        logger.debug('failed to evaluate {} in {}: {} is not an integer'.format(repr(s), env, evaluated))
-        return None
-    return evaluated.numerator
+        logger.debug('failed to parse %s: %s', repr(s), e)
+        return lambda env: None
+
+    def evaluate_compiled(env: _Env) -> Optional[int]:
+        try:
+            return f(env)
+        except ExprParserError as e:
+            logger.debug('failed to evaluate %s: %s', repr(s), e)
+            return None
+
+    return evaluate_compiled
+
+
+def evaluate(s: Expr, *, env: _Env = {}) -> Optional[int]:
+    """evaluate converts the given expr to an integer.
+    """
+
+    return compile_expr(s)(env)
 
 
 def _convert_to_dnf(e: _Expr) -> List[Tuple[List[_Expr], List[_Expr]]]:
@@ -408,7 +528,8 @@ def _convert_from_dnf(freq: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], fracti
     :raises ExprParserError:
     """
 
-    exprs: List[str] = []
+    # construct the same tree which the parser makes from the string like `2 * (x) * (y) / (z) - (w) + 1`
+    result: Optional[_Expr] = None
     factors = sorted(freq.items())
     if factors and not factors[0][0][0] and not factors[0][0][1]:
         # move the constant factor to the back
@@ -424,31 +545,26 @@ def _convert_from_dnf(freq: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], fracti
             neg = True
             coeff = -coeff
 
-        # construct a string for a factor
-        s = ''
-        if coeff == 1:
-            pass
+        # construct a tree for a factor
+        e: Optional[_Expr] = None
+        if coeff != 1:
+            e = _Constant(coeff.numerator)
+        for s in num:
+            e = _parse(s) if e is None else _Function(_Function.MUL, e, _parse(s))
+        if e is None:
+            e = _Constant(1)
+        for s in den:
+            e = _Function(_Function.DIV, e, _parse(s))
+        if result is None:
+            result = _Function(_Function.NEG, e) if neg else e
         else:
-            s += str(coeff.numerator)
-        if s and num:
-            s += ' * '
-        s += ' * '.join(['(' + e + ')' for e in num])
-        if not s:
-            s += '1'
-        if den:
-            s += ' / '
-        s += ' / '.join(['(' + e + ')' for e in den])
-        if neg:
-            s = '- ' + s
-        if exprs and not s.startswith('-'):
-            s = '+ ' + s
-        exprs.append(s)
-    s = ' '.join(exprs)
-    if not s:
-        s += '0'
-    return _parse(s)
+            result = _Function(_Function.SUB if neg else _Function.ADD, result, e)
+    if result is None:
+        result = _Constant(0)
+    return result
 
 
+@functools.lru_cache(maxsize=_CACHE_SIZE)
 def _simplify_expr(e: _Expr) -> _Expr:
     """
     :raises ExprParserError:
@@ -457,6 +573,7 @@ def _simplify_expr(e: _Expr) -> _Expr:
     return _convert_from_dnf(_simplify_dnf(_convert_to_dnf(e)))
 
 
+@functools.lru_cache(maxsize=_CACHE_SIZE)
 def simplify(s: Expr) -> Expr:
     """simplify converts the given expr to a simple expr.
     """
@@ -511,3 +628,27 @@ def rename_variables_in_expr(expr: Expr, *, replace: Dict[VarName, VarName]) ->
         else:
             s.append(c)
     return Expr(_format(_parse(''.join(s))))
+
+
+def cache_info() -> Dict[str, 'functools._CacheInfo']:
+    """cache_info returns the statistics (hits, misses, etc.) of the caches of parsed, simplified and compiled exprs.
+    """
+
+    return {
+        'parse': _parse.cache_info(),
+        'simplify_expr': _simplify_expr.cache_info(),
+        'simplify': simplify.cache_info(),
+        'compile': _compile.cache_info(),
+        'compile_expr': compile_expr.cache_info(),
+    }
+
+
+def cache_clear() -> None:
+    """cache_clear clears the caches of parsed, simplified and compiled exprs.
+    """
+
+    _parse.cache_clear()
+    _simplify_expr.cache_clear()
+    simplify.cache_clear()
+    _compile.cache_clear()
+    compile_expr.cache_clear()
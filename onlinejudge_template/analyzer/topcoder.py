@@ -7,8 +7,7 @@ import urllib.parse
 from logging import getLogger
 from typing import *
 
-import bs4
-
+from onlinejudge_template.analyzer.html import HTMLDocument, get_document
 from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
@@ -23,8 +22,8 @@ def is_topcoder_url(url: str) -> bool:
     return result.netloc == 'community.topcoder.com'
 
 
-def _parse_topcoder_html(soup: bs4.BeautifulSoup) -> Dict[str, str]:
-    problem_texts = soup.find_all('td', class_='problemText')
+def _parse_topcoder_html(document: HTMLDocument) -> Dict[str, str]:
+    problem_texts = document.find_all_with_class('td', 'problemText')
     if len(problem_texts) != 1:
         raise TopcoderParserError("""<td class="problemText"> is not found or not unique""")
     problem_text = problem_texts[0]
@@ -85,7 +84,7 @@ def _parse_topcoder_method_signature(signature: str) -> Tuple[TopcoderType, List
     return (return_type, formal_arguments)
 
 
-def parse_topcoder_class_definition(html: bytes, *, url: str) -> TopcoderClassDefinition:
+def parse_topcoder_class_definition(html: Union[bytes, HTMLDocument], *, url: str) -> TopcoderClassDefinition:
     """parse_topcoder_class_definition parses the Definition section of the problem from HTML.
 
     :raises TopcoderParserError:
@@ -94,8 +93,7 @@ def parse_topcoder_class_definition(html: bytes, *, url: str) -> TopcoderClassDe
         example: https://community.topcoder.com/stat?c=problem_statement&pm=11213
     """
 
-    soup = bs4.BeautifulSoup(html, 'html.parser')
-    definition = _parse_topcoder_html(soup)
+    definition = _parse_topcoder_html(get_document(html))
     return_type, formal_arguments = _parse_topcoder_method_signature(definition['Method signature'])
     class_definition = TopcoderClassDefinition(
         class_name=definition['Class'],
@@ -35,10 +35,11 @@ the module to infer types of variables in format trees
 に相当する結果を返します。
 """
 
+import functools
 from logging import getLogger
 from typing import *
 
-from onlinejudge_template.analyzer.match import match_format
+from onlinejudge_template.analyzer.match import ArrayValues, match_format
 from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
@@ -78,22 +79,43 @@ def unify_types(t1: VarType, t2: VarType) -> VarType:
     assert False
 
 
-def get_var_types_from_match_result(values: Dict[VarName, Dict[Tuple[int, ...], Union[int, float, str]]], *, variables: Dict[VarName, VarDecl]) -> Dict[VarName, VarType]:
+def _get_var_types_of_values(values: Mapping[Tuple[int, ...], Union[int, float, str]]) -> Set[VarType]:
+    """_get_var_types_of_values classifies all values at once, without calling :any:`get_var_type` for each value.
+    """
+
+    if isinstance(values, ArrayValues) and values.is_int_array():
+        # no need to look at each value
+        return {VarType.ValueInt} if values else set()
+    column = values.values()
+    kinds = set(map(type, column))
+    ts: Set[VarType] = set()
+    if int in kinds:
+        ts.add(VarType.ValueInt)
+    if float in kinds:
+        ts.add(VarType.Float)
+    if str in kinds:
+        if kinds == {str}:
+            strings = cast(Iterable[str], column)
+        else:
+            strings = [value for value in column if isinstance(value, str)]
+        if max(map(len, strings)) == 1:
+            ts.add(VarType.Char)
+        else:
+            ts.add(VarType.String)
+    return ts
+
+
+def get_var_types_from_match_result(values: Mapping[VarName, Mapping[Tuple[int, ...], Union[int, float, str]]], *, variables: Dict[VarName, VarDecl]) -> Dict[VarName, VarType]:
     """
     :raises TypingError:
     """
 
     types: Dict[VarName, VarType] = {}
     for name in variables.keys():
-        ts = set(map(get_var_type, values[name].values()))
-        while len(ts) >= 2:
-            t1 = ts.pop()
-            t2 = ts.pop()
-            t3 = unify_types(t1, t2)
-            ts.add(t3)
+        ts = _get_var_types_of_values(values[name])
         if not ts:
             raise TypingError(f"""failed to infer type: {name} has no candidate types""")
-        types[name] = ts.pop()
+        types[name] = functools.reduce(unify_types, ts)
     for decl in variables.values():
         for name in decl.depending:
             if types[name] not in (VarType.IndexInt, VarType.ValueInt):
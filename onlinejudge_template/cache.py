@@ -0,0 +1,164 @@
+"""
+the module to cache downloaded pages and analyzed results on disk
+
+この module は、ダウンロードした HTML やサンプルケース、および解析結果をディスク上にキャッシュします。
+同じ問題に対してテンプレートを何度も生成する場合に、ネットワークアクセスと解析を省略するために使われます。
+"""
+
+import hashlib
+import os
+import pathlib
+import pickle
+import tempfile
+import time
+import urllib.parse
+from logging import getLogger
+from typing import *
+
+import appdirs
+
+from onlinejudge_template.__about__ import __version__
+from onlinejudge_template.types import *
+
+logger = getLogger(__name__)
+
+default_cache_dir = pathlib.Path(appdirs.user_cache_dir('online-judge-tools')) / 'template-generator'
+default_ttl = 7 * 24 * 60 * 60  # in seconds
+default_max_size = 100 * 1024 * 1024  # in bytes
+
+
+def normalize_url(url: str) -> str:
+    """normalize_url removes differences of URLs which don't matter, e.g. the case of the hostname and fragments.
+    """
+
+    parsed = urllib.parse.urlsplit(url.strip())
+    return urllib.parse.urlunsplit((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or '/', parsed.query, ''))
+
+
+def _hash(*items: bytes) -> str:
+    h = hashlib.sha256()
+    for item in items:
+        h.update(hashlib.sha256(item).digest())
+    return h.hexdigest()
+
+
+def _get_downloaded_path(url: str, *, cache_dir: pathlib.Path) -> pathlib.Path:
+    return cache_dir / 'downloaded' / (_hash(normalize_url(url).encode()) + '.pickle')
+
+
+def _get_analyzed_path(resources: AnalyzerResources, *, cache_dir: pathlib.Path) -> pathlib.Path:
+    items = [normalize_url(resources.url or '').encode(), __version__.encode(), resources.html or b'']
+    for case in resources.sample_cases or []:
+        items.append(case.input)
+        items.append(case.output)
+    return cache_dir / 'analyzed' / (_hash(*items) + '.pickle')
+
+
+def _load(path: pathlib.Path) -> Optional[Any]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as fh:
+            data = pickle.load(fh)
+    except Exception as e:
+        logger.warning('broken cache file is removed: %s: %s', str(path), e)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        return None
+    try:
+        os.utime(path)  # for LRU eviction
+    except OSError as e:
+        logger.warning('failed to update the cache file: %s: %s', str(path), e)  # e.g. evicted by another process
+    return data
+
+
+def _store(path: pathlib.Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write atomically, because other processes may read the file at the same time
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            pickle.dump(data, fh)
+        os.replace(tmp, str(path))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_downloaded(url: str, *, cache_dir: pathlib.Path = default_cache_dir, ttl: int = default_ttl) -> Optional[Tuple[bytes, List[SampleCase]]]:
+    """load_downloaded returns the HTML and the sample cases downloaded before.
+
+    :param ttl: is the lifetime of entries in seconds. Expired entries are ignored.
+    """
+
+    path = _get_downloaded_path(url, cache_dir=cache_dir)
+    data = _load(path)
+    if data is None:
+        return None
+    if data['url'] != normalize_url(url) or time.time() - data['timestamp'] > ttl:
+        return None
+    logger.info('use the cached HTML and sample cases: %s', str(path))
+    return data['html'], data['sample_cases']
+
+
+def store_downloaded(url: str, *, html: bytes, sample_cases: List[SampleCase], cache_dir: pathlib.Path = default_cache_dir, max_size: int = default_max_size) -> None:
+    data = {
+        'url': normalize_url(url),
+        'timestamp': time.time(),
+        'html': html,
+        'sample_cases': sample_cases,
+    }
+    _store(_get_downloaded_path(url, cache_dir=cache_dir), data)
+    evict(cache_dir=cache_dir, max_size=max_size)
+
+
+def load_analyzer_result(resources: AnalyzerResources, *, cache_dir: pathlib.Path = default_cache_dir) -> Optional[AnalyzerResult]:
+    """load_analyzer_result returns the result analyzed before with the same URL, the same HTML, the same sample cases and the same version of the analyzer.
+    Only `url`, `html` and `sample_cases` of `resources` are used, so this function can be called before the HTML is analyzed.
+    """
+
+    path = _get_analyzed_path(resources, cache_dir=cache_dir)
+    data = _load(path)
+    if data is None:
+        return None
+    logger.info('use the cached analyzed result: %s', str(path))
+    result = data['result']
+    return result._replace(resources=result.resources._replace(html=resources.html))
+
+
+def store_analyzer_result(result: AnalyzerResult, *, cache_dir: pathlib.Path = default_cache_dir, max_size: int = default_max_size) -> None:
+    data = {
+        'version': __version__,
+        'result': result._replace(resources=result.resources._replace(html=None)),  # the HTML is stored in the other file
+    }
+    _store(_get_analyzed_path(result.resources, cache_dir=cache_dir), data)
+    evict(cache_dir=cache_dir, max_size=max_size)
+
+
+def evict(*, cache_dir: pathlib.Path = default_cache_dir, max_size: int = default_max_size) -> None:
+    """evict removes least recently used files until the total size becomes at most `max_size` bytes.
+    """
+
+    files: List[Tuple[float, int, pathlib.Path]] = []
+    for path in cache_dir.glob('*/*.pickle'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # removed by another process
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum([size for _, size, _ in files])
+    for _, size, path in sorted(files):
+        if total <= max_size:
+            break
+        logger.debug('evict the cache file: %s', str(path))
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def clear(*, cache_dir: pathlib.Path = default_cache_dir) -> None:
+    evict(cache_dir=cache_dir, max_size=0)
@@ -1,3 +1,5 @@
+import functools
+import hashlib
 import pathlib
 from logging import getLogger
 from typing import *
@@ -5,35 +7,75 @@ from typing import *
 import appdirs
 import mako.lookup
 import mako.template
-import pkg_resources
 
 import onlinejudge_template.generator.hook as hook
+from onlinejudge_template.__about__ import __version__
 from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
 
 
-def _get_template(template_file: str) -> mako.template.Template:
+def _get_resource_directory() -> str:
+    try:
+        from importlib.resources import files  # type: ignore  # Python 3.9+
+    except ImportError:
+        import onlinejudge_template_resources
+        return str(pathlib.Path(onlinejudge_template_resources.__file__).parent / 'template')
+    return str(files('onlinejudge_template_resources') / 'template')
+
+
+def _get_module_directory() -> Optional[pathlib.Path]:
+    """_get_module_directory returns the directory to cache templates compiled to Python modules. The cache is separated for each version of this package.
+    """
+
+    module_directory = pathlib.Path(appdirs.user_cache_dir('online-judge-tools')) / 'template-generator' / 'mako' / __version__
+    try:
+        module_directory.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning('failed to make the cache directory for templates: %s', e)
+        return None
+    return module_directory
+
+
+def _get_module_filename(filename: str, uri: str, *, module_directory: pathlib.Path) -> str:
+    # Use the hash of the content, because Mako checks only mtime of the template file.
+    with open(filename, 'rb') as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()
+    return str(module_directory / (digest[:32] + '-' + pathlib.Path(filename).name + '.py'))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_lookup() -> mako.lookup.TemplateLookup:
+    """_get_lookup returns the process-wide lookup. Templates in the lookup are reloaded when they are modified.
+    """
+
     directories = [
         str(pathlib.Path(appdirs.user_config_dir('online-judge-tools')) / 'template'),
-        pkg_resources.resource_filename('onlinejudge_template_resources', 'template'),
+        _get_resource_directory(),
     ]
-    lookup = mako.lookup.TemplateLookup(directories=directories, input_encoding="utf-8", output_encoding="utf-8")
+    module_directory = _get_module_directory()
+    modulename_callable = None
+    if module_directory is not None:
+        modulename_callable = functools.partial(_get_module_filename, module_directory=module_directory)
+    return mako.lookup.TemplateLookup(directories=directories, input_encoding="utf-8", output_encoding="utf-8", modulename_callable=modulename_callable)
+
+
+def _get_template(template_file: str) -> mako.template.Template:
+    lookup = _get_lookup()
     path = pathlib.Path(template_file)
     has_slash = path.name != template_file  # If template_file has path separators or any other things characteristic to paths, we use it as a path. This is a similar behavior to searching commands in shell.
     if has_slash and path.exists():
-        with open(path, "rb") as fh:
-            lookup.put_string(template_file, fh.read())
-    template = lookup.get_template(template_file)
+        module_filename = None
+        if lookup.modulename_callable is not None:
+            module_filename = lookup.modulename_callable(str(path), template_file)
+        template = mako.template.Template(filename=str(path), uri=template_file, lookup=lookup, module_filename=module_filename, input_encoding="utf-8", output_encoding="utf-8")
+    else:
+        template = lookup.get_template(template_file)
     logger.info('use template file: %s', template.filename)
     return template
 
 
-def run(analyzed: AnalyzerResult, *, template_file: str) -> bytes:
-    """
-    :raises: mako.exceptions.MakoException
-    """
-
+def _render(analyzed: AnalyzerResult, *, template_file: str) -> Tuple[bytes, Dict[str, Any]]:
     data: Dict[str, Any] = {
         'analyzed': analyzed,
         'config': {},
@@ -41,5 +83,34 @@ def run(analyzed: AnalyzerResult, *, template_file: str) -> bytes:
     hook._prepare_hook(data=data)
     template = _get_template(template_file)
     rendered = template.render(data=data)
+    return rendered, data
+
+
+def run(analyzed: AnalyzerResult, *, template_file: str) -> bytes:
+    """
+    :raises: mako.exceptions.MakoException
+    """
+
+    rendered, data = _render(analyzed, template_file=template_file)
     rendered = hook._execute_hook(rendered, data=data)
     return rendered
+
+
+def run_many(analyzed: AnalyzerResult, *, template_files: List[str], exceptions: List[Exception], cwd: Optional[pathlib.Path] = None) -> Dict[str, bytes]:
+    """run_many is the same to `run` for each template, but runs the filter commands (e.g. formatters) in batches.
+
+    :param exceptions: is a list to which errors of templates are appended. Failed templates are omitted from the result.
+    :param cwd: is the working directory of the filter commands. The current directory is used if `None`.
+    """
+
+    rendered: Dict[str, Tuple[bytes, Dict[str, Any]]] = {}
+    for template_file in template_files:
+        if template_file in rendered:
+            continue
+        try:
+            rendered[template_file] = _render(analyzed, template_file=template_file)
+        except Exception as e:
+            logger.exception('failed to generate code from the template %s: %s', template_file, e)
+            exceptions.append(e)
+    results = hook._execute_hooks(list(rendered.values()), cwd=cwd)
+    return dict(zip(rendered.keys(), results))
@@ -35,6 +35,20 @@ class InputNode(PythonNode):
         self.exprs = exprs
 
 
+class InputRowTokensNode(PythonNode):
+    def __init__(self, target: str, size: str, decl: VarDecl):
+        self.target = target
+        self.size = size
+        self.decl = decl
+
+
+class InputRowNode(PythonNode):
+    def __init__(self, target: str, size: str, decl: VarDecl):
+        self.target = target
+        self.size = size
+        self.decl = decl
+
+
 class PrintTokensNode(PythonNode):
     def __init__(self, exprs: List[str]):
         self.exprs = exprs
@@ -35,6 +35,14 @@ the module to generate C++ code
 
 - :func:`generate_input`
 - :func:`write_input`
+
+:func:`generate_input` が出力するコードは、乱数生成器 ``gen`` (``std::mt19937_64`` など) がすでに宣言されていることを仮定します。
+
+``data['config']['io'] = 'fast'`` (もしくは ``data['config']['scanner'] = 'fast'`` や ``data['config']['printer'] = 'fast'``) とすると、``fread`` / ``fwrite`` を使う高速な入出力のコードを生成します。
+このとき :func:`declare_fast_io` が出力する関数を ``main`` より前に書いてください。
+
+``data['config']['array_layout'] = 'flat'`` とすると、多次元配列を ``std::vector<std::vector<T> >`` ではなく連続した 1 本の ``std::vector<T>`` として宣言します。
+要素 ``a[j][i]`` は ``a[W * j + i]`` のように添字を計算して参照します。
 """
 
 from logging import getLogger
@@ -60,6 +68,134 @@ def _join_with_indent(lines: Iterator[str], *, nest: int, data: Dict[str, Any])
     return '\n'.join(buf)
 
 
+_FAST_IO_LIBRARY = r"""namespace fast_io {
+char in_buf[1 << 16], out_buf[1 << 16];
+size_t in_pos = 0, in_len = 0, out_len = 0;
+inline int peek_byte() {
+    if (in_pos == in_len) {
+        in_len = fread(in_buf, 1, sizeof(in_buf), stdin);
+        in_pos = 0;
+        if (in_len == 0) return EOF;
+    }
+    return (unsigned char)in_buf[in_pos];
+}
+inline int skip_spaces() {
+    int c;
+    while ((c = peek_byte()) != EOF and isspace(c)) ++in_pos;
+    return c;
+}
+template <class T>
+inline void read_integer(T& x) {
+    int c = skip_spaces();
+    bool negative = (c == '-');
+    if (negative) c = (++in_pos, peek_byte());
+    x = 0;
+    for (; c != EOF and isdigit(c); c = (++in_pos, peek_byte())) x = x * 10 + (negative ? -(c - '0') : c - '0');  // don't overflow for the minimum value
+}
+inline void read_string(std::string& x) {
+    x.clear();
+    for (int c = skip_spaces(); c != EOF and not isspace(c); c = (++in_pos, peek_byte())) x.push_back(c);
+}
+inline void read_char(char& x) {
+    int c = skip_spaces();
+    x = c;
+    if (c != EOF) ++in_pos;
+}
+inline void read_double(double& x) {
+    std::string s;
+    read_string(s);
+    x = std::strtod(s.c_str(), nullptr);
+}
+inline void flush() {
+    fwrite(out_buf, 1, out_len, stdout);
+    out_len = 0;
+}
+struct flush_at_exit {
+    ~flush_at_exit() { flush(); }
+} flush_at_exit_instance;
+inline void write_char(char c) {
+    if (out_len == sizeof(out_buf)) flush();
+    out_buf[out_len++] = c;
+}
+template <class T>
+inline void write_integer(T x) {
+    char s[24];
+    int n = 0;
+    bool negative = (x < 0);
+    do {
+        int d = x % 10;
+        s[n++] = '0' + (negative ? -d : d);
+        x /= 10;
+    } while (x);
+    if (negative) write_char('-');
+    while (n) write_char(s[--n]);
+}
+inline void write_string(const std::string& x) {
+    for (char c : x) write_char(c);
+}
+inline void write_double(double x) {
+    char s[64];
+    snprintf(s, sizeof(s), "%.15g", x);
+    write_string(s);
+}
+// overloads for variables whose types are not known by the generator
+template <class T>
+inline void read(T& x) { read_integer(x); }
+inline void read(std::string& x) { read_string(x); }
+inline void read(char& x) { read_char(x); }
+inline void read(double& x) { read_double(x); }
+template <class T>
+inline void write(const T& x) { write_integer(x); }
+inline void write(const std::string& x) { write_string(x); }
+inline void write(const char* x) { write_string(x); }
+inline void write(char x) { write_char(x); }
+inline void write(double x) { write_double(x); }
+}  // namespace fast_io"""
+
+
+def _is_fast_io(data: Dict[str, Any]) -> bool:
+    """
+    :raises CPlusPlusGeneratorError:
+    """
+
+    io = data['config'].get('io')
+    if io is None or io == 'default':
+        return False
+    elif io == 'fast':
+        return True
+    else:
+        raise CPlusPlusGeneratorError(f"""invalid "io" config: {io}""")
+
+
+def _get_scanner(data: Dict[str, Any]) -> Any:
+    scanner = data['config'].get('scanner')
+    if scanner is None and _is_fast_io(data):
+        return 'fast'
+    return scanner
+
+
+def _get_printer(data: Dict[str, Any]) -> Any:
+    printer = data['config'].get('printer')
+    if printer is None and _is_fast_io(data):
+        return 'fast'
+    return printer
+
+
+def _get_fast_io_function(type: Optional[VarType], *, prefix: str) -> str:
+    if type in (VarType.IndexInt, VarType.ValueInt):
+        return f"""fast_io::{prefix}_integer"""
+    elif type == VarType.Float:
+        return f"""fast_io::{prefix}_double"""
+    elif type == VarType.String:
+        return f"""fast_io::{prefix}_string"""
+    elif type == VarType.Char:
+        return f"""fast_io::{prefix}_char"""
+    elif type is None:
+        return f"""fast_io::{prefix}"""
+    else:
+        assert False
+
+
 def _declare_loop(var: VarName, size: str, *, data: Dict[str, Any]) -> str:
     """
     :raises CPlusPlusGeneratorError:
@@ -83,8 +219,10 @@ def _read_variables(exprs: List[Tuple[str, Optional[VarType]]], *, data: Dict[st
 
     if not exprs:
         return []
-    scanner = data['config'].get('scanner')
-    if scanner == 'scanf':
+    scanner = _get_scanner(data)
+    if scanner == 'fast':
+        return [f"""{_get_fast_io_function(type, prefix='read')}({expr});""" for expr, type in exprs]
+    elif scanner == 'scanf':
         specifiers = ''
         arguments = ['']
         for expr, type in exprs:
@@ -109,8 +247,19 @@ def _write_variables(exprs: List[Tuple[str, Optional[VarType]]], *, end: str, da
     """
 
     assert end in ('', ' ', '\n')
-    printer = data['config'].get('printer')
-    if printer == 'printf':
+    printer = _get_printer(data)
+    if printer == 'fast':
+        lines = []
+        for i, (expr, type) in enumerate(exprs):
+            if i:
+                lines.append("""fast_io::write_char(' ');""")
+            lines.append(f"""{_get_fast_io_function(type, prefix='write')}({expr});""")
+        if end == ' ':
+            lines.append("""fast_io::write_char(' ');""")
+        elif end == '\n':
+            lines.append("""fast_io::write_char('\\n');""")
+        return lines
+    elif printer == 'printf':
         specifiers = ''
         arguments = ['']
         for expr, type in exprs:
@@ -193,19 +342,42 @@ def _get_base_type_format_specifier(type: Optional[VarType], *, name: str, data:
         assert False
 
 
+def _is_flat_array(decl: VarDecl, *, data: Dict[str, Any]) -> bool:
+    """_is_flat_array returns whether the multi-dimensional array is stored in a single contiguous `std::vector`.
+
+    :raises CPlusPlusGeneratorError:
+    """
+
+    layout = data['config'].get('array_layout')
+    if layout is None or layout == 'nested':
+        return False
+    elif layout == 'flat':
+        return len(decl.dims) >= 2
+    else:
+        raise CPlusPlusGeneratorError(f"""invalid "array_layout" config: {layout}""")
+
+
 def _get_type_and_ctor(decl: VarDecl, *, data: Dict[str, Any]) -> Tuple[str, str]:
     type = _get_base_type(decl.type, data=data)
+    if _is_flat_array(decl, data=data):
+        size = simplify(Expr(' * '.join([f"""({dim})""" for dim in decl.dims])))
+        return f"""std::vector<{type}{' ' if type.endswith('>') else ''}>""", f"""({size})"""
     ctor = ""
     for dim in reversed(decl.dims):
-        sndarg = f""", {type}({ctor})""" if ctor else ''
+        sndarg = f""", {type}{ctor}""" if ctor else ''
         ctor = f"""({dim}{sndarg})"""
         space = ' ' if type.endswith('>') else ''
         type = f"""std::vector<{type}{space}>"""
     return type, ctor
 
 
-def _get_variable(*, decl: VarDecl, indices: List[Expr], decls: Dict[VarName, VarDecl]) -> str:
+def _get_variable(*, decl: VarDecl, indices: List[Expr], decls: Dict[VarName, VarDecl], data: Dict[str, Any]) -> str:
     var = str(decl.name)
+    if _is_flat_array(decl, data=data):
+        offset = Expr('0')
+        for index, base, dim in zip(indices, decl.bases, decl.dims):
+            offset = simplify(Expr(f"""({offset}) * ({dim}) + ({index}) - ({base})"""))
+        return f"""{var}[{offset}]"""
     for index, base in zip(indices, decl.bases):
         i = simplify(Expr(f"""{index} - ({base})"""))
         var = f"""{var}[{i}]"""
@@ -262,7 +434,7 @@ def _read_input_dfs(node: FormatNode, *, declared: Set[str], initialized: Set[st
             raise CPlusPlusGeneratorError(f"""variable {node.name} is not declared yet""")
         initialized.add(node.name)
         decl = decls[node.name]
-        var = _get_variable(decl=decls[node.name], indices=node.indices, decls=decls)
+        var = _get_variable(decl=decls[node.name], indices=node.indices, decls=decls, data=data)
         return make_node(var, decl.type)
     elif isinstance(node, NewlineNode):
         return SentencesNode(sentences=[])
@@ -302,7 +474,7 @@ def _write_output_dfs(node: FormatNode, *, decls: Dict[VarName, VarDecl], data:
 
     if isinstance(node, ItemNode):
         decl = decls[node.name]
-        var = _get_variable(decl=decl, indices=node.indices, decls=decls)
+        var = _get_variable(decl=decl, indices=node.indices, decls=decls, data=data)
         return OutputTokensNode(exprs=[(VarName(var), decl.type)], end='')
     elif isinstance(node, NewlineNode):
         return OutputTokensNode(exprs=[], end='\n')
@@ -408,8 +580,6 @@ def _generate_input_fallback(message: str, data: Dict[str, Any], *, nest: int =
     lines = []
     lines.append(f"""// {message}""")
     lines.append(f"""// TODO: edit here""")
-    lines.append(f"""std::random_device device;""")
-    lines.append(f"""std::default_random_engine gen(device());""")
     lines.extend(_declare_variables([VarDecl(name=VarName('n'), type=VarType.IndexInt, dims=[], bases=[], depending=set())], data=data))
     lines.extend(_generate_variable(('n', VarType.IndexInt), data=data))
     lines.extend(_declare_variables([VarDecl(name=VarName('a'), type=VarType.ValueInt, dims=[Expr('n')], bases=[Expr('0')], depending=set([VarName('n')]))], data=data))
@@ -437,8 +607,9 @@ def _write_input_fallback(message: str, data: Dict[str, Any], *, nest: int = 1)
     lines.append(f"""// TODO: edit here""")
     lines.extend(_write_variables([('n', VarType.IndexInt)], end='\n', data=data))
     lines.append(_declare_loop(var=VarName('i'), size='n', data=data) + " {")
-    lines.extend(_read_variables([('a[i]', VarType.ValueInt)], data=data))
+    lines.extend(_write_variables([('a[i]', VarType.ValueInt)], end=' ', data=data))
     lines.append("""}""")
+    lines.extend(_write_variables([], end='\n', data=data))
     return _join_with_indent(iter(lines), nest=nest, data=data)
 
 
@@ -527,10 +698,7 @@ def formal_arguments(data: Dict[str, Any]) -> str:
 
     args = []
     for name, decl in decls.items():
-        type = _get_base_type(decl.type, data=data)
-        for _ in reversed(decl.dims):
-            space = ' ' if type.endswith('>') else ''
-            type = f"""std::vector<{type}{space}>"""
+        type, _ = _get_type_and_ctor(decl, data=data)
         if decl.dims:
             type = f"""const {type} &"""
         args.append(f"""{type} {name}""".replace('& ', '&'))
@@ -587,3 +755,17 @@ def declare_constants(data: Dict[str, Any], *, nest: int = 0) -> str:
     for decl in analyzed.constants.values():
         lines.append(_declare_constant(decl, data=data))
     return _join_with_indent(iter(lines), nest=nest, data=data)
+
+
+def uses_fast_io(data: Dict[str, Any]) -> bool:
+    """uses_fast_io returns whether the generated code needs :func:`declare_fast_io`.
+    """
+
+    return _get_scanner(data) == 'fast' or _get_printer(data) == 'fast'
+
+
+def declare_fast_io(data: Dict[str, Any], *, nest: int = 0) -> str:
+    """declare_fast_io returns the definitions of the buffered reader and writer used with `data['config']['io'] = 'fast'`.
+    """
+
+    return _join_with_indent(iter([line.strip() for line in _FAST_IO_LIBRARY.splitlines()]), nest=nest, data=data)
@@ -1,12 +1,33 @@
+import collections
+import concurrent.futures
+import hashlib
+import pathlib
 import shlex
 import subprocess
 import sys
+import tempfile
+import threading
 import traceback
 from logging import getLogger
 from typing import *
 
 logger = getLogger(__name__)
 
+# The formatted results are cached in memory by (command, working directory, hash of input). The command contains the formatter and its style, and the working directory decides which config files (e.g. `.clang-format`) are used.
+# The cache is bounded and the least recently used entries are removed, because the process may live long with `oj-template --serve`.
+_formatted_cache: 'collections.OrderedDict[Tuple[Tuple[str, ...], str, str], bytes]' = collections.OrderedDict()
+_formatted_cache_lock = threading.Lock()
+_formatted_cache_size = 1024
+
+# yapf keeps the style in a global variable, so FormatCode must not be called concurrently.
+_yapf_api_lock = threading.Lock()
+
+# commands which can format many files in one process with `-i` (in-place) option, and the suffixes of the files
+_inplace_suffixes = {
+    'clang-format': '.cpp',
+    'yapf': '.py',
+}
+
 
 def _prepare_hook(*, data: Dict[str, Any]) -> None:
     data['hook'] = []
@@ -20,17 +41,141 @@ def register_filter_command(command: List[str], *, data: Dict[str, Any]) -> None
     data['hook'].extend(command)
 
 
-def _execute_hook(rendered: bytes, *, data: Dict[str, Any]) -> bytes:
-    if not data['hook']:
-        return rendered
-    logger.info('execute filter command: $ %s', ' '.join(map(shlex.quote, data['hook'])))
+def _is_yapf_with_style(command: List[str]) -> bool:
+    # `yapf` without `--style` reads the config files (e.g. `.style.yapf`) of the project, so it is left to the command.
+    return pathlib.Path(command[0]).name == 'yapf' and len(command) == 3 and command[1] == '--style'
+
+
+def _format_with_yapf_api(command: List[str], rendered: bytes) -> Optional[bytes]:
+    """_format_with_yapf_api runs `yapf --style STYLE` in this process, without starting a new process.
+
+    :returns: `None` if the command is not such a command or yapf is not importable.
+    """
+
+    if not _is_yapf_with_style(command):
+        return None
     try:
-        return subprocess.check_output(data['hook'], input=rendered, stderr=sys.stderr)
-    except Exception as e:
-        logger.exception(e)
-        return b'\n'.join([
-            traceback.format_exc().encode(),
-            b'',
-            b'Generated code (before processed by the filter):',
-            rendered,
-        ])
+        from yapf.yapflib.yapf_api import FormatCode
+    except ImportError:
+        return None
+    with _yapf_api_lock:
+        formatted, _ = FormatCode(rendered.decode(), style_config=command[2])
+    return formatted.encode()
+
+
+def _run_filter_command(command: List[str], rendered: bytes, *, cwd: Optional[pathlib.Path] = None) -> bytes:
+    formatted = _format_with_yapf_api(command, rendered)
+    if formatted is None:
+        formatted = subprocess.check_output(command, input=rendered, stderr=sys.stderr, cwd=(str(cwd) if cwd is not None else None))
+    return formatted
+
+
+def _get_inplace_suffix(command: List[str]) -> Optional[str]:
+    """_get_inplace_suffix returns the suffix of files if the command can format many files in one process with `-i`.
+    Only commands with an explicit style are allowed, because formatters look for config files (e.g. `.clang-format`) from the directories of the files, which are temporary directories.
+    """
+
+    suffix = _inplace_suffixes.get(pathlib.Path(command[0]).name)
+    if suffix is None:
+        return None
+    if len(command) == 3 and command[1] in ('--style', '-style'):
+        style = command[2]
+    elif len(command) == 2 and command[1].startswith(('--style=', '-style=')):
+        style = command[1].split('=', 1)[1]
+    else:
+        return None
+    if style == 'file' or style.startswith('file:'):
+        return None
+    return suffix
+
+
+def _run_filter_command_in_batch(command: List[str], items: List[bytes], *, cwd: Optional[pathlib.Path] = None) -> List[bytes]:
+    """_run_filter_command_in_batch runs the command once for many files, if possible.
+    """
+
+    suffix = _get_inplace_suffix(command)
+    if len(items) == 1 or suffix is None or _is_yapf_with_style(command):
+        return [_run_filter_command(command, rendered, cwd=cwd) for rendered in items]
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        paths = [pathlib.Path(tempdir) / f"""{i}{suffix}""" for i in range(len(items))]
+        for path, rendered in zip(paths, items):
+            path.write_bytes(rendered)
+        subprocess.check_call(command + ['-i'] + [str(path) for path in paths], stdout=sys.stderr, stderr=sys.stderr, cwd=(str(cwd) if cwd is not None else None))
+        return [path.read_bytes() for path in paths]
+
+
+def _get_fallback_result(rendered: bytes) -> bytes:
+    return b'\n'.join([
+        traceback.format_exc().encode(),
+        b'',
+        b'Generated code (before processed by the filter):',
+        rendered,
+    ])
+
+
+def _execute_hooks(items: List[Tuple[bytes, Dict[str, Any]]], *, cwd: Optional[pathlib.Path] = None) -> List[bytes]:
+    """_execute_hooks runs the registered filter commands for many rendered files.
+    Files with the same command are processed together, and the results are cached.
+    If a command fails, the files are processed one by one, and each failed file is replaced with the error message and the code before processed.
+
+    :param cwd: is the working directory of the commands. The current directory is used if `None`.
+    """
+
+    results: List[Optional[bytes]] = [None] * len(items)
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for i, (rendered, data) in enumerate(items):
+        if not data['hook']:
+            results[i] = rendered
+            continue
+        command = tuple(data['hook'])
+        with _formatted_cache_lock:
+            key = (command, str(cwd), hashlib.sha256(rendered).hexdigest())
+            results[i] = _formatted_cache.get(key)
+            if results[i] is not None:
+                _formatted_cache.move_to_end(key)
+        if results[i] is None:
+            groups.setdefault(command, []).append(i)
+
+    def process(command: Tuple[str, ...], indices: List[int]) -> None:
+        logger.info('execute filter command: $ %s', ' '.join(map(shlex.quote, command)))
+        try:
+            formatted = _run_filter_command_in_batch(list(command), [items[i][0] for i in indices], cwd=cwd)
+        except Exception as e:
+            logger.exception(e)
+            if len(indices) == 1:
+                results[indices[0]] = _get_fallback_result(items[indices[0]][0])
+                return
+            # retry one by one to find which file fails
+            formatted = []
+            for i in indices:
+                try:
+                    formatted.append(_run_filter_command(list(command), items[i][0], cwd=cwd))
+                except Exception as e:
+                    logger.exception(e)
+                    results[i] = _get_fallback_result(items[i][0])
+                    formatted.append(None)  # type: ignore
+        for i, result in zip(indices, formatted):
+            if result is None:
+                continue
+            results[i] = result
+            with _formatted_cache_lock:
+                _formatted_cache[(command, str(cwd), hashlib.sha256(items[i][0]).hexdigest())] = result
+                while len(_formatted_cache) > _formatted_cache_size:
+                    _formatted_cache.popitem(last=False)
+
+    if len(groups) <= 1:
+        for command, indices in groups.items():
+            process(command, indices)
+    else:
+        # different commands (e.g. clang-format and yapf) run in parallel
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            for future in [executor.submit(process, command, indices) for command, indices in groups.items()]:
+                future.result()
+
+    assert all([result is not None for result in results])
+    return cast(List[bytes], results)
+
+
+def _execute_hook(rendered: bytes, *, data: Dict[str, Any]) -> bytes:
+    return _execute_hooks([(rendered, data)])[0]
@@ -17,8 +17,11 @@ the module to generate Python code
 
 - :func:`generate_input`
 - :func:`write_input`
+
+``data['config']['io'] = 'fast'`` とすると、入力を ``sys.stdin.buffer`` からまとめて読み、配列を一括で変換し、出力をまとめて書き出すコードを生成します。
 """
 
+import re
 from typing import *
 
 import onlinejudge_template.generator._utils as utils
@@ -67,6 +70,54 @@ def _get_variable(*, decl: VarDecl, indices: Sequence[Expr]) -> str:
     return var
 
 
+def _is_fast_io(data: Dict[str, Any]) -> bool:
+    """
+    :raises PythonGeneratorError:
+    """
+
+    io = data['config'].get('io')
+    if io is None or io == 'default':
+        return False
+    elif io == 'fast':
+        return True
+    else:
+        raise PythonGeneratorError(f"""invalid "io" config: {io}""")
+
+
+def _uses_name(expr: str, name: str) -> bool:
+    return re.search(r'\b' + re.escape(name) + r'\b', expr) is not None
+
+
+def _get_row_target(node: LoopNode, *, decls: Dict[VarName, VarDecl], ignore_newlines: bool = True) -> Optional[Tuple[VarDecl, str]]:
+    """_get_row_target returns the target to assign at once, when the loop visits consecutive elements of the last dimension of an array.
+    For example, this returns `a` for `for i in range(n): a[i]`, and `b[j][1:m + 1]` for `for i in range(m): b[j][i + 1]`.
+
+    :param ignore_newlines: ignores newlines in the loop. If this is false, only loops whose elements are on the same line are accepted.
+    """
+
+    body = node.body
+    if isinstance(body, SequenceNode):
+        items = [item for item in body.items if not (ignore_newlines and isinstance(item, NewlineNode))]
+        if len(items) == 1:
+            body = items[0]
+    if not isinstance(body, ItemNode):
+        return None
+    decl = decls[body.name]
+    indices = body.indices
+    if not indices or len(indices) != len(decl.dims):
+        return None
+    if any([_uses_name(index, node.name) for index in indices[:-1]]):
+        return None
+    start = simplify(Expr(f"""{indices[-1]} - ({decl.bases[-1]}) - {node.name}"""))
+    if _uses_name(start, node.name):
+        return None
+    var = _get_variable(decl=decl, indices=indices[:-1])
+    if start == '0' and simplify(Expr(f"""{decl.dims[-1]} - ({node.size})""")) == '0':
+        return decl, var
+    end = simplify(Expr(f"""{start} + {node.size}"""))
+    return decl, f"""{var}[{start}:{end}]"""
+
+
 def _declare_variable(name: VarName, dims: List[Expr], *, data: Dict[str, Any]) -> Iterator[str]:
     if dims:
         ctor = "None"
@@ -148,6 +199,10 @@ def _read_input_dfs(node: FormatNode, *, decls: Dict[VarName, VarDecl], data: Di
             sentences.append(_read_input_dfs(item, decls=decls, data=data))
         return SentencesNode(sentences=sentences)
     elif isinstance(node, LoopNode):
+        row = _get_row_target(node, decls=decls, ignore_newlines=False)
+        if row is not None:
+            decl, target = row
+            return InputRowTokensNode(target=target, size=node.size, decl=decl)
         return RangeNode(name=node.name, size=node.size, body=_read_input_dfs(node.body, decls=decls, data=data))
     else:
         assert False
@@ -175,6 +230,10 @@ def _optimize_syntax_tree(node: PythonNode, *, data: Dict[str, Any]) -> PythonNo
         return node
     elif isinstance(node, InputNode):
         return node
+    elif isinstance(node, InputRowTokensNode):
+        return node
+    elif isinstance(node, InputRowNode):
+        return node
     elif isinstance(node, PrintTokensNode):
         return node
     elif isinstance(node, PrintNode):
@@ -193,6 +252,10 @@ def _optimize_syntax_tree(node: PythonNode, *, data: Dict[str, Any]) -> PythonNo
                 sentence = InputNode(exprs=last.exprs + sentence.exprs)
                 sentences.pop()
                 que = [sentence] + que  # type: ignore
+            elif isinstance(last, InputRowTokensNode) and isinstance(sentence, InputNode) and not sentence.exprs:
+                sentence = InputRowNode(target=last.target, size=last.size, decl=last.decl)
+                sentences.pop()
+                que = [sentence] + que  # type: ignore
             elif isinstance(last, PrintTokensNode) and isinstance(sentence, PrintNode):
                 sentence = PrintNode(exprs=last.exprs + sentence.exprs)
                 sentences.pop()
@@ -251,6 +314,16 @@ def _realize_input_nodes_without_tokens(node: PythonNode, *, declared: Set[VarNa
             else:
                 raise TokenizedInputRequiredError
 
+    elif isinstance(node, InputRowTokensNode):
+        raise TokenizedInputRequiredError
+
+    elif isinstance(node, InputRowNode):
+        initialized.add(node.decl.name)
+        if _get_python_type(node.decl.type) == "str":
+            return OtherNode(line=f"""{node.target} = input().split()""")
+        else:
+            return OtherNode(line=f"""{node.target} = list(map({_get_python_type(node.decl.type)}, input().split()))""")
+
     elif isinstance(node, PrintTokensNode):
         return node
     elif isinstance(node, PrintNode):
@@ -289,6 +362,13 @@ def _realize_input_nodes_with_tokens_dfs(node: PythonNode, tokens: str, *, decla
             sentences.append(node_)
         return SentencesNode(sentences=sentences)
 
+    elif isinstance(node, InputRowTokensNode) or isinstance(node, InputRowNode):
+        initialized.add(node.decl.name)
+        if _get_python_type(node.decl.type) == "str":
+            return OtherNode(line=f"""{node.target} = [next({tokens}) for _ in range({node.size})]""")
+        else:
+            return OtherNode(line=f"""{node.target} = [{_get_python_type(node.decl.type)}(next({tokens})) for _ in range({node.size})]""")
+
     elif isinstance(node, PrintTokensNode):
         return node
     elif isinstance(node, PrintNode):
@@ -309,14 +389,166 @@ def _realize_input_nodes_with_tokens_dfs(node: PythonNode, tokens: str, *, decla
         assert False
 
 
-def _realize_input_nodes_with_tokens(node: PythonNode, tokens: str, *, decls: Dict[VarName, VarDecl], data: Dict[str, Any]) -> PythonNode:
+def _realize_input_nodes_with_tokens(node: PythonNode, tokens: str, *, declared: Set[VarName], decls: Dict[VarName, VarDecl], data: Dict[str, Any]) -> PythonNode:
     node = SentencesNode(sentences=[
         OtherNode(line="""import sys"""),
         OtherNode(line=f"""{tokens} = iter(sys.stdin.read().split())"""),
         node,
         OtherNode(line=f"""assert next({tokens}, None) is None"""),
     ])
-    return _realize_input_nodes_with_tokens_dfs(node, tokens, declared=set(), initialized=set(), decls=decls, data=data)
+    return _realize_input_nodes_with_tokens_dfs(node, tokens, declared=declared, initialized=set(), decls=decls, data=data)
+
+
+def _convert_token(token: str, type: Optional[VarType]) -> str:
+    if _get_python_type(type) == "str":
+        return f"""{token}.decode()"""
+    else:
+        return f"""{_get_python_type(type)}({token})"""
+
+
+def _convert_tokens(tokens: str, type: Optional[VarType]) -> str:
+    if _get_python_type(type) == "str":
+        return f"""map(bytes.decode, {tokens})"""
+    else:
+        return f"""map({_get_python_type(type)}, {tokens})"""
+
+
+def _read_input_fast_dfs(node: FormatNode, tokens: str, *, declared: Set[VarName], initialized: Set[VarName], decls: Dict[VarName, VarDecl], data: Dict[str, Any]) -> PythonNode:
+    decl_nodes = _declare_all_possible_variables(declared=declared, initialized=initialized, decls=decls, data=data)
+    if decl_nodes:
+        return SentencesNode(sentences=decl_nodes + [_read_input_fast_dfs(node, tokens, declared=declared, initialized=initialized, decls=decls, data=data)])
+
+    if isinstance(node, ItemNode):
+        decl = decls[node.name]
+        var = _get_variable(decl=decl, indices=node.indices)
+        initialized.add(node.name)
+        return OtherNode(line=f"""{var} = {_convert_token(f"next({tokens})", decl.type)}""")
+    elif isinstance(node, NewlineNode):
+        return SentencesNode(sentences=[])
+    elif isinstance(node, SequenceNode):
+        # read consecutive scalars with the same type at once, e.g. `n, m = map(int, islice(tokens, 2))`. Newlines don't matter here.
+        items = [item for item in node.items if not isinstance(item, NewlineNode)]
+        sentences: List[PythonNode] = []
+        i = 0
+        while i < len(items):
+            j = i
+            while j < len(items) and isinstance(items[j], ItemNode) and not decls[cast(ItemNode, items[j]).name].dims and _get_python_type(decls[cast(ItemNode, items[j]).name].type) == _get_python_type(decls[cast(ItemNode, items[i]).name].type):
+                j += 1
+            if j - i >= 2:
+                decl_nodes = _declare_all_possible_variables(declared=declared, initialized=initialized, decls=decls, data=data)
+                names = [cast(ItemNode, item).name for item in items[i:j]]
+                initialized.update(names)
+                sentences.extend(decl_nodes)
+                sentences.append(OtherNode(line=f"""{', '.join(names)} = {_convert_tokens(f"islice({tokens}, {j - i})", decls[names[0]].type)}"""))
+                i = j
+            else:
+                sentences.append(_read_input_fast_dfs(items[i], tokens, declared=declared, initialized=initialized, decls=decls, data=data))
+                i += 1
+        return SentencesNode(sentences=sentences)
+    elif isinstance(node, LoopNode):
+        row = _get_row_target(node, decls=decls)
+        if row is not None:
+            decl, target = row
+            initialized.add(decl.name)
+            return OtherNode(line=f"""{target} = list({_convert_tokens(f"islice({tokens}, {node.size})", decl.type)})""")
+        declared.add(node.name)
+        body = _read_input_fast_dfs(node.body, tokens, declared=declared, initialized=initialized, decls=decls, data=data)
+        declared.remove(node.name)
+        return RangeNode(name=node.name, size=node.size, body=body)
+    else:
+        assert False
+
+
+def _list_arrays_read_at_once(node: FormatNode, *, decls: Dict[VarName, VarDecl], ignore_newlines: bool = True) -> Set[VarName]:
+    """_list_arrays_read_at_once lists 1-dimensional arrays which are made by a single assignment, i.e. the rows found by :func:`_get_row_target`. They don't need declarations.
+    """
+
+    counts: Dict[VarName, int] = {}
+    found: Set[VarName] = set()
+
+    def go(node: FormatNode) -> None:
+        if isinstance(node, ItemNode):
+            counts[node.name] = counts.get(node.name, 0) + 1
+        elif isinstance(node, NewlineNode):
+            pass
+        elif isinstance(node, SequenceNode):
+            for item in node.items:
+                go(item)
+        elif isinstance(node, LoopNode):
+            row = _get_row_target(node, decls=decls, ignore_newlines=ignore_newlines)
+            if row is not None and len(row[0].dims) == 1 and row[1] == row[0].name:
+                found.add(row[0].name)
+            go(node.body)
+        else:
+            assert False
+
+    go(node)
+    return {name for name in found if counts[name] == 1}
+
+
+def _read_input_fast(node: FormatNode, tokens: str, *, decls: Dict[VarName, VarDecl], data: Dict[str, Any]) -> PythonNode:
+    declared = _list_arrays_read_at_once(node, decls=decls)
+    return SentencesNode(sentences=[
+        OtherNode(line="""import sys"""),
+        OtherNode(line="""from itertools import islice"""),
+        OtherNode(line=f"""{tokens} = iter(sys.stdin.buffer.read().split())"""),
+        _read_input_fast_dfs(node, tokens, declared=declared, initialized=set(), decls=decls, data=data),
+        OtherNode(line=f"""assert next({tokens}, None) is None"""),
+    ])
+
+
+def _join_exprs_to_str(exprs: List[str]) -> str:
+    if len(exprs) == 1 and exprs[0].startswith('*'):
+        return f"""' '.join(map(str, {exprs[0][1:]}))"""
+    elif len(exprs) == 1:
+        return f"""str({exprs[0]})"""
+    else:
+        return f"""' '.join(map(str, [{', '.join(exprs)}]))"""
+
+
+def _serialize_syntax_tree_with_buffered_output(node: PythonNode, buffer: str, *, data: Dict[str, Any]) -> Iterator[str]:
+    """_serialize_syntax_tree_with_buffered_output is the same to _serialize_syntax_tree, but collects the output into the list instead of calling `print`.
+    """
+
+    if isinstance(node, InputTokensNode):
+        assert False
+    elif isinstance(node, InputNode):
+        assert False
+    elif isinstance(node, PrintTokensNode):
+        if node.exprs:
+            yield f"""{buffer}.append({_join_exprs_to_str(node.exprs)} + ' ')"""
+    elif isinstance(node, PrintNode):
+        if node.exprs:
+            yield f"""{buffer}.append({_join_exprs_to_str(node.exprs)} + '\\n')"""
+        else:
+            yield f"""{buffer}.append('\\n')"""
+    elif isinstance(node, SentencesNode):
+        for item in node.sentences:
+            yield from _serialize_syntax_tree_with_buffered_output(item, buffer, data=data)
+    elif isinstance(node, RangeNode):
+        body = node.body
+        if isinstance(body, SentencesNode) and len(body.sentences) == 1:
+            body = body.sentences[0]
+        if isinstance(body, PrintNode) and len(body.exprs) == 1 and not body.exprs[0].startswith('*'):
+            yield f"""{buffer}.extend([str({body.exprs[0]}) + '\\n' for {node.name} in range({node.size})])"""
+        else:
+            yield f"""for {node.name} in range({node.size}):"""
+            yield from _serialize_syntax_tree_with_buffered_output(node.body, buffer, data=data)
+            yield _DEDENT
+    elif isinstance(node, OtherNode):
+        yield node.line
+    else:
+        assert False
+
+
+def _serialize_output_syntax_tree(node: PythonNode, *, data: Dict[str, Any]) -> Iterator[str]:
+    if _is_fast_io(data):
+        yield """import sys"""
+        yield """out = []"""
+        yield from _serialize_syntax_tree_with_buffered_output(node, 'out', data=data)
+        yield """sys.stdout.write(''.join(out))"""
+    else:
+        yield from _serialize_syntax_tree(node, data=data)
 
 
 def _serialize_syntax_tree(node: PythonNode, *, data: Dict[str, Any]) -> Iterator[str]:
@@ -369,7 +601,7 @@ def write_input(data: Dict[str, Any], *, nest: int = 1) -> str:
 
     node = _write_output_dfs(analyzed.input_format, decls=analyzed.input_variables, data=data)
     node = _optimize_syntax_tree(node, data=data)
-    lines = list(_serialize_syntax_tree(node, data=data))
+    lines = list(_serialize_output_syntax_tree(node, data=data))
     return _join_with_indent(lines, nest=nest, data=data)
 
 
@@ -383,7 +615,7 @@ def write_output(data: Dict[str, Any], *, nest: int = 1) -> str:
 
     node = _write_output_dfs(analyzed.output_format, decls=analyzed.output_variables, data=data)
     node = _optimize_syntax_tree(node, data=data)
-    lines = list(_serialize_syntax_tree(node, data=data))
+    lines = list(_serialize_output_syntax_tree(node, data=data))
     return _join_with_indent(lines, nest=nest, data=data)
 
 
@@ -397,12 +629,19 @@ def read_input(data: Dict[str, Any], *, nest: int = 1) -> str:
         ]
         return _join_with_indent(lines, nest=nest, data=data)
 
+    if _is_fast_io(data):
+        node = _read_input_fast(analyzed.input_format, 'tokens', decls=analyzed.input_variables, data=data)
+        lines = list(_serialize_syntax_tree(node, data=data))
+        return _join_with_indent(lines, nest=nest, data=data)
+
+    # rows on their own lines are read with `list(map(int, input().split()))`, and in the tokenized form too they are assigned at once
+    read_at_once = _list_arrays_read_at_once(analyzed.input_format, decls=analyzed.input_variables, ignore_newlines=False)
     node = _read_input_dfs(analyzed.input_format, decls=analyzed.input_variables, data=data)
     node = _optimize_syntax_tree(node, data=data)
     try:
-        node = _realize_input_nodes_without_tokens(node, declared=set(), initialized=set(), decls=analyzed.input_variables, data=data)
+        node = _realize_input_nodes_without_tokens(node, declared=set(read_at_once), initialized=set(), decls=analyzed.input_variables, data=data)
     except TokenizedInputRequiredError:
-        node = _realize_input_nodes_with_tokens(node, 'tokens', decls=analyzed.input_variables, data=data)
+        node = _realize_input_nodes_with_tokens(node, 'tokens', declared=set(read_at_once), decls=analyzed.input_variables, data=data)
     node = _optimize_syntax_tree(node, data=data)
     lines = list(_serialize_syntax_tree(node, data=data))
     return _join_with_indent(lines, nest=nest, data=data)
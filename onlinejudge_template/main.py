@@ -1,28 +1,147 @@
 import argparse
+import os
+import pathlib
+import stat
 import sys
 from logging import DEBUG, INFO, basicConfig, getLogger
 from typing import *
 
-import colorlog
-
-import onlinejudge.dispatch
-import onlinejudge.utils
-import onlinejudge_template.analyzer.combined as analyzer
-import onlinejudge_template.generator._main as generator
-import onlinejudge_template.network as network
+from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
 
 
+def analyze(url: Optional[str], *, html: Optional[bytes] = None, sample_cases: Optional[List[SampleCase]] = None, cookie: Optional[str] = None, use_cache: bool = True, refresh: bool = False, search_workers: Optional[int] = None, exceptions: List[Exception]) -> AnalyzerResult:
+    """analyze downloads and analyzes a problem. The result can be used to render any number of templates with :any:`generator.run_many`.
+    If `html` is given, it is used instead of the downloaded page.
+
+    :param search_workers: is the number of worker processes for the minimum tree search. See :any:`analyzer.combined.run`.
+    :param exceptions: is a list to which errors are appended. An empty result is returned if the analysis fails.
+    """
+
+    # Import heavy modules (requests, bs4, ply, etc.) here, to make `oj-template --help` fast.
+    import onlinejudge.dispatch
+    import onlinejudge.utils
+    import onlinejudge_template.cache as cache
+    import onlinejudge_template.network as network
+
+    # download
+    problem = None
+    if url is not None:
+        problem = onlinejudge.dispatch.problem_from_url(url)
+    if problem is not None:
+        url = problem.get_url()  # normalize url
+        url = url.replace('judge.yosupo.jp', 'old.yosupo.jp')  # TODO: support the new pages
+    logger.debug('url: %s', url)
+    if html is not None:
+        if sample_cases is None:
+            sample_cases = []
+    elif url is None:
+        raise ValueError('either url or html is required')
+    else:
+        downloaded = None
+        if use_cache and not refresh:
+            downloaded = cache.load_downloaded(url)
+        if downloaded is not None:
+            html, sample_cases = downloaded
+        else:
+            try:
+                with onlinejudge.utils.with_cookiejar(onlinejudge.utils.get_default_session(), path=pathlib.Path(cookie) if cookie else onlinejudge.utils.default_cookie_path) as session:
+                    html, sample_cases = network.download_html_and_sample_cases(url, session=session, problem=problem)
+            except Exception as e:
+                exceptions.append(e)
+                logger.error('failed to download sample cases')
+                html = b''
+                sample_cases = []
+            else:
+                if use_cache and sample_cases is not None:
+                    try:
+                        cache.store_downloaded(url, html=html, sample_cases=sample_cases)
+                    except OSError as e:
+                        logger.warning('failed to write the cache: %s', e)
+    logger.debug('sample cases: %s', sample_cases)
+
+    # analyze
+    analyzed = None
+    if use_cache and not refresh and not exceptions:
+        # look up the cache before importing analyzers, because they are heavy. Only the URL, the HTML and the sample cases are used as the key.
+        analyzed = cache.load_analyzer_result(AnalyzerResources(url=url, html=html, input_format_string=None, output_format_string=None, sample_cases=sample_cases))
+    if analyzed is None:
+        import onlinejudge_template.analyzer.combined as analyzer
+        resources = analyzer.prepare_from_html(html, url=url or '', sample_cases=sample_cases)
+        logger.debug('analyzer resources: %s', resources._replace(html=b'...skipped...'))
+        try:
+            analyzed = analyzer.run(resources, search_workers=search_workers)
+        except Exception as e:
+            exceptions.append(e)
+            logger.exception('failed to analyze the problem')
+            analyzed = analyzer.get_empty_analyzer_result(resources)
+        else:
+            if use_cache and not exceptions:
+                try:
+                    cache.store_analyzer_result(analyzed)
+                except OSError as e:
+                    logger.warning('failed to write the cache: %s', e)
+    logger.debug('analyzed result: %s', analyzed._replace(resources=analyzed.resources._replace(html=b'...skipped...')))
+    return analyzed
+
+
+def generate(url: Optional[str], *, template_files: List[str], html: Optional[bytes] = None, sample_cases: Optional[List[SampleCase]] = None, cookie: Optional[str] = None, use_cache: bool = True, refresh: bool = False, search_workers: Optional[int] = None, exceptions: List[Exception]) -> Dict[str, bytes]:
+    """generate analyzes a problem once and renders all the templates from the result.
+
+    :param exceptions: is a list to which errors are appended. Failed templates are omitted from the result.
+    :returns: a dict from template files to generated code
+    """
+
+    import onlinejudge_template.generator._main as generator
+
+    analyzed = analyze(url, html=html, sample_cases=sample_cases, cookie=cookie, use_cache=use_cache, refresh=refresh, search_workers=search_workers, exceptions=exceptions)
+    return generator.run_many(analyzed, template_files=template_files, exceptions=exceptions)
+
+
+def _write_code(code: bytes, *, template_file: str, output_dir: Optional[pathlib.Path]) -> None:
+    if output_dir is None:
+        sys.stdout.buffer.write(code)
+        return
+    dest = output_dir / pathlib.Path(template_file).name
+    if dest.exists():
+        logger.error('file already exists: %s', str(dest))
+        return
+    logger.info('write file: %s', str(dest))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(dest, 'wb') as fh:
+        fh.write(code)
+    if code.startswith(b'#!'):
+        os.chmod(dest, os.stat(dest).st_mode | stat.S_IEXEC)
+
+
 def main(args: Optional[List[str]] = None) -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument('url')
-    parser.add_argument('-t', '--template', default='main.cpp')
+    parser.add_argument('url', nargs='?')
+    parser.add_argument('-t', '--template', action='append', help='can be used many times. The problem is analyzed only once. (default: main.cpp)')
+    parser.add_argument('-o', '--output-dir', type=pathlib.Path, help='write the generated files into this directory instead of stdout. Required when two or more templates are given.')
     parser.add_argument('-v', '--verbose', action='store_true')
-    parser.add_argument('-c', '--cookie', default=onlinejudge.utils.default_cookie_path)
+    parser.add_argument('-c', '--cookie', help='default: the cookie file of online-judge-tools')
+    parser.add_argument('--no-cache', action='store_true', help='neither read nor write the cache of downloaded pages and analyzed results')
+    parser.add_argument('--refresh', action='store_true', help='ignore the cache and update it')
+    parser.add_argument('--serve', action='store_true', help='run a server which keeps loaded modules and caches, instead of generating code. Other oj-template commands use the server while it is running.')
+    parser.add_argument('--stdio', action='store_true', help='with --serve, speak JSON-RPC on stdin/stdout instead of the Unix socket')
+    parser.add_argument('--socket', help='the path of the Unix socket of the server (default: in the cache directory of online-judge-tools)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='with --serve, the number of requests processed concurrently (default: 1)')
+    parser.add_argument('--search-workers', type=int, metavar='N', help='the number of worker processes to analyze formats from sample cases. This may be faster for large sample cases. (default: no worker processes)')
+    parser.add_argument('--no-server', action='store_true', help="don't use the server even if it is running")
+    parser.add_argument('--dump-analysis', action='store_true', help='write the analyzed result to stdout instead of generating code')
+    parser.add_argument('--dump-format', choices=['json', 'binary'], default='json', help='the format for --dump-analysis (default: json)')
+    parser.add_argument('--from-analysis', metavar='FILE', help='generate code from the result written with --dump-analysis, instead of downloading and analyzing the problem. Use "-" for stdin.')
     parsed = parser.parse_args(args=args)
+    if parsed.url is None and not parsed.serve and parsed.from_analysis is None:
+        parser.error('the following arguments are required: url')
+    templates: List[str] = parsed.template or ['main.cpp']
+    if len(templates) >= 2 and parsed.output_dir is None:
+        parser.error('--output-dir is required to use two or more templates')
 
     # configure logging
+    import colorlog
     handler = colorlog.StreamHandler()
     handler.setFormatter(colorlog.ColoredFormatter('%(log_color)s%(levelname)s%(reset)s:%(name)s:%(message)s'))
     level = INFO
@@ -30,44 +149,70 @@ def main(args: Optional[List[str]] = None) -> None:
         level = DEBUG
     basicConfig(level=level, handlers=[handler])
 
-    exceptions: List[Exception] = []
+    if parsed.serve or not parsed.no_server:
+        import onlinejudge_template.server as server
+        socket_path = pathlib.Path(parsed.socket) if parsed.socket else server.default_socket_path
 
-    # download
-    url = parsed.url
-    problem = onlinejudge.dispatch.problem_from_url(url)
-    if problem is not None:
-        url = problem.get_url()  # normalize url
-        url = url.replace('judge.yosupo.jp', 'old.yosupo.jp')  # TODO: support the new pages
-    logger.debug('url: %s', url)
-    try:
-        with onlinejudge.utils.with_cookiejar(onlinejudge.utils.get_default_session(), path=parsed.cookie) as session:
-            html = network.download_html(url, session=session)
-            sample_cases = network.download_sample_cases(url, session=session)
-    except Exception as e:
-        exceptions.append(e)
-        logger.error('failed to download sample cases')
-        html = b''
-        sample_cases = []
-    logger.debug('sample cases: %s', sample_cases)
+    if parsed.serve:
+        if parsed.stdio:
+            server.serve_stdio(jobs=parsed.jobs)
+        else:
+            server.serve_unix_socket(socket_path, jobs=parsed.jobs)
+        return
 
-    # analyze
-    resources = analyzer.prepare_from_html(html, url=url, sample_cases=sample_cases)
-    logger.debug('analyzer resources: %s', resources._replace(html=b'...skipped...'))
-    try:
-        analyzed = analyzer.run(resources)
-    except Exception as e:
-        exceptions.append(e)
-        logger.exception('failed to analyze the problem')
-        analyzed = analyzer.get_empty_analyzer_result(resources)
-    logger.debug('analyzed result: %s', analyzed._replace(resources=analyzed.resources._replace(html=b'...skipped...')))
+    if parsed.dump_analysis:
+        import onlinejudge_template.serialization as serialization
+        exceptions: List[Exception] = []
+        analyzed = analyze(parsed.url, cookie=parsed.cookie, use_cache=not parsed.no_cache, refresh=parsed.refresh, search_workers=parsed.search_workers, exceptions=exceptions)
+        if parsed.dump_format == 'json':
+            sys.stdout.buffer.write(serialization.dumps_json(analyzed, indent=2).encode() + b'\n')
+        else:
+            sys.stdout.buffer.write(serialization.dumps_binary(analyzed))
+        if exceptions:
+            raise exceptions[0]
+        return
 
-    # generate
-    try:
-        code = generator.run(analyzed, template_file=parsed.template)
-        sys.stdout.buffer.write(code)
-    except Exception as e:
-        exceptions.append(e)
-        logger.exception('failed to generate code')
+    if parsed.from_analysis is not None:
+        import onlinejudge_template.generator._main as generator
+        import onlinejudge_template.serialization as serialization
+        if parsed.from_analysis == '-':
+            analyzed = serialization.loads(sys.stdin.buffer.read())
+        else:
+            with open(parsed.from_analysis, 'rb') as fh:
+                analyzed = serialization.loads(fh.read())
+        exceptions = []
+        codes = generator.run_many(analyzed, template_files=templates, exceptions=exceptions)
+        for template in templates:
+            if template in codes:
+                _write_code(codes[template], template_file=template, output_dir=parsed.output_dir)
+        if exceptions:
+            raise exceptions[0]
+        return
+
+    if not parsed.no_server:
+        # relative paths are relative to the current directory of this process, not the server's one
+        params = {
+            'url': parsed.url,
+            'templates': [str(pathlib.Path(template).resolve()) if pathlib.Path(template).name != template else template for template in templates],
+            'cookie': str(pathlib.Path(parsed.cookie).resolve()) if parsed.cookie else None,
+            'no_cache': parsed.no_cache,
+            'refresh': parsed.refresh,
+            'search_workers': parsed.search_workers,
+        }
+        result = server.call_if_compatible('generate', params, path=socket_path)
+        if result is not None:
+            for template, requested in zip(templates, params['templates']):
+                if result['codes'].get(requested) is not None:
+                    _write_code(server.decode_bytes(result['codes'][requested]), template_file=template, output_dir=parsed.output_dir)
+            if result['errors']:
+                raise RuntimeError(result['errors'][0])
+            return
+
+    exceptions = []
+    codes = generate(parsed.url, template_files=templates, cookie=parsed.cookie, use_cache=not parsed.no_cache, refresh=parsed.refresh, search_workers=parsed.search_workers, exceptions=exceptions)
+    for template in templates:
+        if template in codes:
+            _write_code(codes[template], template_file=template, output_dir=parsed.output_dir)
 
     if exceptions:
         raise exceptions[0]
@@ -4,10 +4,14 @@ the module to access networks
 この module はネットワークアクセスを行い、問題の HTML やサンプルケースを取得します。
 """
 
+import concurrent.futures
+import contextlib
+import time
 from logging import getLogger
 from typing import *
 
 import requests
+import requests.adapters
 
 import onlinejudge
 import onlinejudge.utils
@@ -15,22 +19,91 @@ from onlinejudge_template.types import *
 
 logger = getLogger(__name__)
 
+default_timeout = 30.0  # in seconds
+
+
+@contextlib.contextmanager
+def _log_elapsed_time(what: str, url: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.debug('%s took %.3f sec: %s', what, time.perf_counter() - start, url)
+
+
+class _TimeoutHTTPAdapter(requests.adapters.HTTPAdapter):
+    """_TimeoutHTTPAdapter is an adapter which uses the default timeout for requests without timeouts, e.g. requests in online-judge-api-client.
+    """
+    def __init__(self, *, timeout: Optional[float], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.timeout = timeout
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def configure_session(session: requests.Session, *, pool_connections: int = 10, pool_maxsize: int = 10, timeout: Optional[float] = default_timeout) -> requests.Session:
+    """configure_session sets the sizes of the connection pools of the session. Connections are kept alive and reused in the pools.
+
+    :param pool_connections: is the number of hosts whose connections are pooled.
+    :param pool_maxsize: is the number of connections pooled for each host. Use the number of concurrent requests.
+    :param timeout: is the default timeout in seconds for requests on the session without their own timeouts.
+    """
+
+    for prefix in ('https://', 'http://'):
+        session.mount(prefix, _TimeoutHTTPAdapter(timeout=timeout, pool_connections=pool_connections, pool_maxsize=pool_maxsize))
+    return session
+
+
+def _get_configured_session(session: Optional[requests.Session]) -> requests.Session:
+    """_get_configured_session configures the session with :any:`configure_session` unless it is already configured, to bound every request with a timeout.
+    """
 
-def download_html(url: str, *, session: Optional[requests.Session] = None) -> bytes:
     session = session or onlinejudge.utils.get_default_session()
-    resp = session.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+    if not isinstance(session.get_adapter('https://'), _TimeoutHTTPAdapter):
+        configure_session(session, timeout=default_timeout)
+    return session
+
+
+def download_html(url: str, *, session: Optional[requests.Session] = None, timeout: Optional[float] = default_timeout) -> bytes:
+    session = _get_configured_session(session)
+    with _log_elapsed_time('downloading HTML', url):
+        resp = session.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=timeout)
     logger.debug('HTTP response: %s', resp)
     resp.raise_for_status()
     return resp.content
 
 
-def download_sample_cases(url: str, *, session: Optional[requests.Session] = None) -> Optional[List[SampleCase]]:
-    session = session or onlinejudge.utils.get_default_session()
+def download_sample_cases(url: str, *, session: Optional[requests.Session] = None, problem: Optional[onlinejudge.type.Problem] = None) -> Optional[List[SampleCase]]:
+    """
+    :param problem: is the problem for the URL. This is an optional argument to avoid resolving the URL again.
+
+    Requests are bounded by the default timeout of the session. See :any:`configure_session`.
+    """
+
+    session = _get_configured_session(session)
     try:
-        problem = onlinejudge.dispatch.problem_from_url(url)
+        if problem is None:
+            problem = onlinejudge.dispatch.problem_from_url(url)
         assert problem is not None
-        sample_cases = problem.download_sample_cases(session=session)
+        with _log_elapsed_time('downloading sample cases', url):
+            sample_cases = problem.download_sample_cases(session=session)
         return [SampleCase(input=case.input_data, output=case.output_data) for case in sample_cases]
     except Exception as e:
         logger.error('downloading sample cases failed: %s', e)
         return None
+
+
+def download_html_and_sample_cases(url: str, *, session: Optional[requests.Session] = None, problem: Optional[onlinejudge.type.Problem] = None, timeout: Optional[float] = default_timeout) -> Tuple[bytes, Optional[List[SampleCase]]]:
+    """download_html_and_sample_cases runs :any:`download_html` and :any:`download_sample_cases` concurrently.
+
+    :raises requests.exceptions.RequestException: when downloading the HTML fails
+    """
+
+    session = _get_configured_session(session)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        html = executor.submit(download_html, url, session=session, timeout=timeout)
+        sample_cases = executor.submit(download_sample_cases, url, session=session, problem=problem)
+        return html.result(), sample_cases.result()
@@ -0,0 +1,276 @@
+"""
+the module to serialize and deserialize analyzed results
+
+この module は AnalyzerResult を JSON やバイナリ形式に変換し、またそれらから復元します。
+解析と生成を別々のプロセスで実行したり、解析結果を保存しておいて後でネットワークなしにコードを生成したりするために使われます。
+"""
+
+import base64
+import json
+import zlib
+from typing import *
+
+from onlinejudge_template.types import *
+
+# The version of the schema. Increment this when the format changes incompatibly.
+SCHEMA_VERSION = 1
+
+# The binary form is the compact JSON compressed with zlib, prefixed with this magic bytes and the schema version.
+_BINARY_MAGIC = b'OJTA'
+
+
+def _encode_bytes(data: bytes) -> Union[str, Dict[str, str]]:
+    try:
+        return data.decode()
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(data).decode()}
+
+
+def _decode_bytes(data: Union[str, Dict[str, str]]) -> bytes:
+    if isinstance(data, str):
+        return data.encode()
+    else:
+        return base64.b64decode(data['base64'])
+
+
+def _encode_var_type(type: Optional[VarType]) -> Optional[str]:
+    return None if type is None else type.value
+
+
+def _decode_var_type(type: Optional[str]) -> Optional[VarType]:
+    return None if type is None else VarType(type)
+
+
+def _encode_format_node(node: FormatNode) -> Dict[str, Any]:
+    if isinstance(node, ItemNode):
+        return {'kind': 'ItemNode', 'name': node.name, 'indices': list(node.indices)}
+    elif isinstance(node, NewlineNode):
+        return {'kind': 'NewlineNode'}
+    elif isinstance(node, SequenceNode):
+        return {'kind': 'SequenceNode', 'items': [_encode_format_node(item) for item in node.items]}
+    elif isinstance(node, LoopNode):
+        return {'kind': 'LoopNode', 'size': node.size, 'name': node.name, 'body': _encode_format_node(node.body)}
+    else:
+        assert False
+
+
+def _decode_format_node(data: Dict[str, Any]) -> FormatNode:
+    if data['kind'] == 'ItemNode':
+        return ItemNode(name=data['name'], indices=data['indices'])
+    elif data['kind'] == 'NewlineNode':
+        return NewlineNode()
+    elif data['kind'] == 'SequenceNode':
+        return SequenceNode(items=[_decode_format_node(item) for item in data['items']])
+    elif data['kind'] == 'LoopNode':
+        return LoopNode(size=data['size'], name=data['name'], body=_decode_format_node(data['body']))
+    else:
+        raise ValueError(f"""unknown kind of FormatNode: {data['kind']}""")
+
+
+def _encode_variables(variables: Dict[VarName, VarDecl]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for name, decl in variables.items():
+        data[name] = {
+            'type': _encode_var_type(decl.type),
+            'dims': list(decl.dims),
+            'bases': list(decl.bases),
+            'depending': sorted(decl.depending),
+        }
+    return data
+
+
+def _decode_variables(data: Dict[str, Any]) -> Dict[VarName, VarDecl]:
+    variables: Dict[VarName, VarDecl] = {}
+    for name, decl in data.items():
+        variables[VarName(name)] = VarDecl(
+            name=VarName(name),
+            type=_decode_var_type(decl['type']),
+            dims=list(map(Expr, decl['dims'])),
+            bases=list(map(Expr, decl['bases'])),
+            depending=set(map(VarName, decl['depending'])),
+        )
+    return variables
+
+
+def _encode_output_type(output_type: OutputType) -> Dict[str, Any]:
+    if isinstance(output_type, YesNoOutputType):
+        return {'kind': 'YesNoOutputType', 'name': output_type.name, 'yes': output_type.yes, 'no': output_type.no}
+    elif isinstance(output_type, OneOutputType):
+        return {'kind': 'OneOutputType', 'name': output_type.name, 'type': _encode_var_type(output_type.type)}
+    elif isinstance(output_type, TwoOutputType):
+        return {
+            'kind': 'TwoOutputType',
+            'name1': output_type.name1,
+            'type1': _encode_var_type(output_type.type1),
+            'name2': output_type.name2,
+            'type2': _encode_var_type(output_type.type2),
+            'print_newline_after_item': output_type.print_newline_after_item,
+        }
+    elif isinstance(output_type, VectorOutputType):
+        return {
+            'kind': 'VectorOutputType',
+            'name': output_type.name,
+            'type': _encode_var_type(output_type.type),
+            'subscripted_name': output_type.subscripted_name,
+            'counter_name': output_type.counter_name,
+            'print_size': output_type.print_size,
+            'print_newline_after_size': output_type.print_newline_after_size,
+            'print_newline_after_item': output_type.print_newline_after_item,
+        }
+    else:
+        assert False
+
+
+def _decode_output_type(data: Dict[str, Any]) -> OutputType:
+    if data['kind'] == 'YesNoOutputType':
+        return YesNoOutputType(name=Expr(data['name']), yes=data['yes'], no=data['no'])
+    elif data['kind'] == 'OneOutputType':
+        return OneOutputType(name=Expr(data['name']), type=_decode_var_type(data['type']))
+    elif data['kind'] == 'TwoOutputType':
+        return TwoOutputType(name1=Expr(data['name1']), type1=_decode_var_type(data['type1']), name2=Expr(data['name2']), type2=_decode_var_type(data['type2']), print_newline_after_item=data['print_newline_after_item'])
+    elif data['kind'] == 'VectorOutputType':
+        return VectorOutputType(name=VarName(data['name']), type=_decode_var_type(data['type']), subscripted_name=data['subscripted_name'], counter_name=VarName(data['counter_name']), print_size=data['print_size'], print_newline_after_size=data['print_newline_after_size'], print_newline_after_item=data['print_newline_after_item'])
+    else:
+        raise ValueError(f"""unknown kind of OutputType: {data['kind']}""")
+
+
+def _encode_constants(constants: Dict[VarName, ConstantDecl]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for name, decl in constants.items():
+        data[name] = {
+            'value': decl.value,
+            'type': decl.type.value,
+        }
+    return data
+
+
+def _decode_constants(data: Dict[str, Any]) -> Dict[VarName, ConstantDecl]:
+    constants: Dict[VarName, ConstantDecl] = {}
+    for name, decl in data.items():
+        constants[VarName(name)] = ConstantDecl(name=VarName(name), value=decl['value'], type=VarType(decl['type']))
+    return constants
+
+
+def _encode_resources(resources: AnalyzerResources) -> Dict[str, Any]:
+    return {
+        'url': resources.url,
+        'html': None if resources.html is None else _encode_bytes(resources.html),
+        'input_format_string': resources.input_format_string,
+        'output_format_string': resources.output_format_string,
+        'sample_cases': None if resources.sample_cases is None else [{
+            'input': _encode_bytes(case.input),
+            'output': _encode_bytes(case.output)
+        } for case in resources.sample_cases],
+    }
+
+
+def _decode_resources(data: Dict[str, Any]) -> AnalyzerResources:
+    return AnalyzerResources(
+        url=data['url'],
+        html=None if data['html'] is None else _decode_bytes(data['html']),
+        input_format_string=data['input_format_string'],
+        output_format_string=data['output_format_string'],
+        sample_cases=None if data['sample_cases'] is None else [SampleCase(input=_decode_bytes(case['input']), output=_decode_bytes(case['output'])) for case in data['sample_cases']],
+    )
+
+
+def _encode_topcoder_class_definition(definition: TopcoderClassDefinition) -> Dict[str, Any]:
+    return {
+        'class_name': definition.class_name,
+        'method_name': definition.method_name,
+        'formal_arguments': [[type.value, name] for type, name in definition.formal_arguments],
+        'return_type': definition.return_type.value,
+    }
+
+
+def _decode_topcoder_class_definition(data: Dict[str, Any]) -> TopcoderClassDefinition:
+    return TopcoderClassDefinition(
+        class_name=data['class_name'],
+        method_name=data['method_name'],
+        formal_arguments=[(TopcoderType(type), VarName(name)) for type, name in data['formal_arguments']],
+        return_type=TopcoderType(data['return_type']),
+    )
+
+
+def encode_analyzer_result(result: AnalyzerResult) -> Dict[str, Any]:
+    """encode_analyzer_result converts the result to an object which consists of only dicts, lists, strings, numbers, booleans and `None`.
+    """
+
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'resources': _encode_resources(result.resources),
+        'input_format': None if result.input_format is None else _encode_format_node(result.input_format),
+        'input_variables': None if result.input_variables is None else _encode_variables(result.input_variables),
+        'output_format': None if result.output_format is None else _encode_format_node(result.output_format),
+        'output_variables': None if result.output_variables is None else _encode_variables(result.output_variables),
+        'constants': _encode_constants(result.constants),
+        'output_type': None if result.output_type is None else _encode_output_type(result.output_type),
+        'topcoder_class_definition': None if result.topcoder_class_definition is None else _encode_topcoder_class_definition(result.topcoder_class_definition),
+    }
+
+
+def decode_analyzer_result(data: Dict[str, Any]) -> AnalyzerResult:
+    """
+    :raises ValueError: if the data is broken or its schema version is not supported
+    """
+
+    if not isinstance(data, dict) or data.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"""unsupported schema version of the analyzed result: {data.get('schema_version') if isinstance(data, dict) else None} (expected: {SCHEMA_VERSION})""")
+    try:
+        return AnalyzerResult(
+            resources=_decode_resources(data['resources']),
+            input_format=None if data['input_format'] is None else _decode_format_node(data['input_format']),
+            input_variables=None if data['input_variables'] is None else _decode_variables(data['input_variables']),
+            output_format=None if data['output_format'] is None else _decode_format_node(data['output_format']),
+            output_variables=None if data['output_variables'] is None else _decode_variables(data['output_variables']),
+            constants=_decode_constants(data['constants']),
+            output_type=None if data['output_type'] is None else _decode_output_type(data['output_type']),
+            topcoder_class_definition=None if data['topcoder_class_definition'] is None else _decode_topcoder_class_definition(data['topcoder_class_definition']),
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"""broken analyzed result: {type(e).__name__}: {e}""") from e
+
+
+def dumps_json(result: AnalyzerResult, *, indent: Optional[int] = None) -> str:
+    return json.dumps(encode_analyzer_result(result), indent=indent, ensure_ascii=False)
+
+
+def loads_json(data: Union[str, bytes]) -> AnalyzerResult:
+    """
+    :raises ValueError:
+    """
+
+    return decode_analyzer_result(json.loads(data))
+
+
+def dumps_binary(result: AnalyzerResult) -> bytes:
+    compact = json.dumps(encode_analyzer_result(result), separators=(',', ':')).encode()
+    return _BINARY_MAGIC + bytes([SCHEMA_VERSION]) + zlib.compress(compact)
+
+
+def loads_binary(data: bytes) -> AnalyzerResult:
+    """
+    :raises ValueError:
+    """
+
+    if not data.startswith(_BINARY_MAGIC) or len(data) <= len(_BINARY_MAGIC):
+        raise ValueError('not a binary analyzed result')
+    if data[len(_BINARY_MAGIC)] != SCHEMA_VERSION:
+        raise ValueError(f"""unsupported schema version of the analyzed result: {data[len(_BINARY_MAGIC)]} (expected: {SCHEMA_VERSION})""")
+    try:
+        compact = zlib.decompress(data[len(_BINARY_MAGIC) + 1:])
+    except zlib.error as e:
+        raise ValueError(f"""broken analyzed result: {e}""") from e
+    return loads_json(compact)
+
+
+def loads(data: bytes) -> AnalyzerResult:
+    """loads reads the result in either the JSON form or the binary form.
+
+    :raises ValueError:
+    """
+
+    if data.startswith(_BINARY_MAGIC):
+        return loads_binary(data)
+    else:
+        return loads_json(data)
@@ -0,0 +1,279 @@
+"""
+the module for the server mode of oj-template
+
+この module は `oj-template --serve` のためのものです。
+server は import 済みの module や構築済みの parser、コンパイル済みのテンプレートなどを保持したまま、JSON-RPC 2.0 でコード生成のリクエストを受け付けます。
+通信は Unix socket もしくは stdin/stdout で行い、1 行に 1 つの JSON object を書きます。
+"""
+
+import concurrent.futures
+import contextlib
+import json
+import pathlib
+import signal
+import socket
+import sys
+import threading
+from logging import getLogger
+from typing import *
+
+import appdirs
+
+from onlinejudge_template.__about__ import __version__
+
+logger = getLogger(__name__)
+
+default_socket_path = pathlib.Path(appdirs.user_cache_dir('online-judge-tools')) / 'template-generator' / 'server.sock'
+
+# timeouts in seconds for clients. `generate` may download the problem, so it waits longer.
+ping_timeout = 3.0
+default_timeout = 60.0
+
+# error codes of JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+def encode_bytes(data: bytes) -> str:
+    """encode_bytes converts bytes to a JSON string. Bytes which are not UTF-8 are kept with surrogate escapes.
+    """
+
+    return data.decode('utf-8', errors='surrogateescape')
+
+
+def decode_bytes(data: str) -> bytes:
+    return data.encode('utf-8', errors='surrogateescape')
+
+
+def _ping(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {'version': __version__}
+
+
+def _generate(params: Dict[str, Any]) -> Dict[str, Any]:
+    """_generate is the method `generate`.
+
+    The params are `url`, `html`, `sample_cases` (a list of objects with `input` and `output`), `template` or `templates` (a list), `cookie`, `no_cache`, `refresh` and `search_workers`. Either `url` or `html` is required.
+    The result has `codes` (an object from templates to code; failed templates are omitted), `code` (the code of the first template, or `null` if it fails) and `errors` (a list of messages).
+    """
+
+    from onlinejudge_template.main import generate
+    from onlinejudge_template.types import SampleCase
+
+    templates = params.get('templates', [params.get('template', 'main.cpp')])
+    if not isinstance(templates, list) or not templates or not all([isinstance(template, str) for template in templates]):
+        raise TypeError('templates must be a non-empty list of strings')
+    html = None
+    if params.get('html') is not None:
+        html = decode_bytes(params['html'])
+    sample_cases = None
+    if params.get('sample_cases') is not None:
+        sample_cases = [SampleCase(input=decode_bytes(case['input']), output=decode_bytes(case['output'])) for case in params['sample_cases']]
+    if params.get('url') is None and html is None:
+        raise ValueError('either url or html is required')
+
+    exceptions: List[Exception] = []
+    codes = generate(params.get('url'), template_files=templates, html=html, sample_cases=sample_cases, cookie=params.get('cookie'), use_cache=not params.get('no_cache', False), refresh=params.get('refresh', False), search_workers=params.get('search_workers'), exceptions=exceptions)
+    return {
+        'codes': {template: encode_bytes(code)
+                  for template, code in codes.items()},
+        'code': encode_bytes(codes[templates[0]]) if templates[0] in codes else None,
+        'errors': [f"""{type(e).__name__}: {e}""" for e in exceptions],
+    }
+
+
+_methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'ping': _ping,
+    'generate': _generate,
+}
+
+
+def _make_error(id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {'jsonrpc': '2.0', 'error': {'code': code, 'message': message}, 'id': id}
+
+
+def handle_request(request: Any) -> Optional[Dict[str, Any]]:
+    """handle_request processes a JSON-RPC 2.0 request object.
+
+    :returns: the response object, or `None` for notifications
+    """
+
+    if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str):
+        return _make_error(None, INVALID_REQUEST, 'Invalid Request')
+    id = request.get('id')
+    method = _methods.get(request['method'])
+    params = request.get('params', {})
+    if method is None:
+        response = _make_error(id, METHOD_NOT_FOUND, f"""Method not found: {request['method']}""")
+    elif not isinstance(params, dict):
+        response = _make_error(id, INVALID_PARAMS, 'Invalid params: params must be an object')
+    else:
+        try:
+            response = {'jsonrpc': '2.0', 'result': method(params), 'id': id}
+        except (KeyError, TypeError, ValueError) as e:
+            logger.exception('invalid params: %s', e)
+            response = _make_error(id, INVALID_PARAMS, f"""Invalid params: {type(e).__name__}: {e}""")
+        except Exception as e:
+            logger.exception('failed to process the request: %s', e)
+            response = _make_error(id, INTERNAL_ERROR, f"""Internal error: {type(e).__name__}: {e}""")
+    if 'id' not in request:
+        return None
+    return response
+
+
+def _handle_line(line: bytes) -> Optional[bytes]:
+    try:
+        request = json.loads(line.decode())
+    except ValueError:
+        response: Optional[Dict[str, Any]] = _make_error(None, PARSE_ERROR, 'Parse error')
+    else:
+        response = handle_request(request)
+    if response is None:
+        return None
+    return json.dumps(response).encode() + b'\n'
+
+
+def _serve_stream(rfile: BinaryIO, wfile: BinaryIO, *, executor: concurrent.futures.Executor) -> None:
+    """_serve_stream processes requests until EOF. Responses are written in the order of completion, so clients should use `id` to match them.
+    """
+
+    lock = threading.Lock()
+
+    def process(line: bytes) -> None:
+        response = _handle_line(line)
+        if response is not None:
+            with lock:
+                wfile.write(response)
+                wfile.flush()
+
+    futures: List[concurrent.futures.Future] = []
+    for line in rfile:
+        if not line.strip():
+            continue
+        futures = [future for future in futures if not future.done()]
+        futures.append(executor.submit(process, line))
+    concurrent.futures.wait(futures)
+
+
+def _warm_up() -> None:
+    """_warm_up loads heavy modules and builds the parser in advance.
+    """
+
+    import onlinejudge.dispatch
+    import onlinejudge_template.analyzer.combined
+    import onlinejudge_template.analyzer.parser as parser
+    import onlinejudge_template.generator._main as generator
+
+    parser.build_lexer()
+    parser.build_parser()
+    generator._get_lookup()
+
+
+def serve_stdio(*, jobs: int = 1) -> None:
+    """serve_stdio speaks JSON-RPC on stdin/stdout until stdin is closed.
+    """
+
+    _warm_up()
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        with contextlib.redirect_stdout(sys.stderr):  # stdout is only for responses
+            _serve_stream(stdin, stdout, executor=executor)
+
+
+def make_unix_socket_server(path: pathlib.Path, *, executor: concurrent.futures.Executor) -> Any:
+    """make_unix_socket_server makes a `socketserver.ThreadingUnixStreamServer`.
+    Requests of all connections are processed with the given executor.
+
+    :raises RuntimeError: if another server is already running on the path
+    """
+
+    import socketserver
+
+    if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+        raise RuntimeError('Unix sockets are not supported on this platform. Use --stdio instead.')
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            _serve_stream(cast(BinaryIO, self.rfile), cast(BinaryIO, self.wfile), executor=executor)
+
+    if path.exists():
+        if call('ping', {}, path=path, timeout=ping_timeout) is not None:
+            raise RuntimeError(f"""the server is already running: {str(path)}""")
+        path.unlink()  # removes the socket of the server which died
+    path.parent.mkdir(parents=True, exist_ok=True)
+    server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+    server.daemon_threads = True
+    path.chmod(0o600)  # other users must not use the server, because it reads files with our permissions
+    return server
+
+
+def serve_unix_socket(path: pathlib.Path = default_socket_path, *, jobs: int = 1) -> None:
+    """serve_unix_socket speaks JSON-RPC on a Unix socket until interrupted.
+    """
+
+    _warm_up()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        server = make_unix_socket_server(path, executor=executor)
+        logger.info('listening on %s', str(path))
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # remove the socket also when killed
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            path.unlink()
+
+
+def call(method: str, params: Dict[str, Any], *, path: pathlib.Path = default_socket_path, timeout: Optional[float] = default_timeout) -> Optional[Any]:
+    """call sends a request to the server on the Unix socket.
+
+    :param timeout: is the timeout in seconds for each of connecting, sending and receiving.
+    :returns: the result, or `None` if no server is running or the server doesn't respond in time
+    :raises RuntimeError: if the server returns an error
+    """
+
+    if not hasattr(socket, 'AF_UNIX') or not path.exists():
+        return None
+    request = {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': 0}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            logger.info('use the server: %s', str(path))
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile('rb') as fh:
+                line = fh.readline()
+    except socket.timeout:
+        logger.warning('the server did not respond in %s seconds: %s', timeout, str(path))
+        return None
+    except OSError as e:
+        logger.debug('the server is not available: %s', e)
+        return None
+    if not line:
+        return None
+    response = json.loads(line.decode())
+    if 'error' in response:
+        raise RuntimeError(f"""the server returned an error: {response['error']['message']}""")
+    return response['result']
+
+
+def call_if_compatible(method: str, params: Dict[str, Any], *, path: pathlib.Path = default_socket_path, timeout: Optional[float] = default_timeout) -> Optional[Any]:
+    """call_if_compatible is the same to `call`, but it checks the version of the server with `ping` before.
+    A server of another version may generate different code, so it is not used.
+
+    :returns: the result, or `None` if no compatible server is running
+    :raises RuntimeError: if the server returns an error
+    """
+
+    pong = call('ping', {}, path=path, timeout=ping_timeout)
+    if pong is None:
+        return None
+    if not isinstance(pong, dict) or pong.get('version') != __version__:
+        logger.warning('ignore the server of another version: %s (this is %s)', pong.get('version') if isinstance(pong, dict) else None, __version__)
+        return None
+    return call(method, params, path=path, timeout=timeout)
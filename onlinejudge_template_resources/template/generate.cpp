@@ -18,7 +18,9 @@
         include = "#include <bits/stdc++.h>"
     else:
         include = "\n".join([
+            "#include <fstream>",
             "#include <iostream>",
+            "#include <random>",
             "#include <string>",
             "#include <vector>",
         ])
@@ -36,6 +38,7 @@
 ${include}
 // usage: $ oj generate-input ./generate
 // usage: $ oj generate-input --hack-actual=./a.out --hack-expected=./naive ./generate
+// usage: $ mkdir -p test && ./generate --count 1000 --seed 0 --output-dir test
 #define REP(i, n) for (int i = 0; (i) < (int)(n); ++ (i))
 #define REP3(i, m, n) for (int i = (m); (i) < (int)(n); ++ (i))
 #define REP_R(i, n) for (int i = (int)(n) - 1; (i) >= 0; -- (i))
@@ -44,8 +47,50 @@ ${include}
 using namespace std;
 
 // generated by ${about.title} ${about.version} (${about.url})
-int main() {
+void generate(std::mt19937_64 &gen) {
 ${cplusplus.generate_input(data)}
 ${cplusplus.write_input(data)}
+}
+
+int main(int argc, char **argv) {
+    std::ios::sync_with_stdio(false);
+    int count = -1;  // -1 means a single case to stdout
+    uint64_t seed = std::random_device()();
+    std::string output_dir = "test";
+    for (int i = 1; i < argc; ++ i) {
+        std::string arg = argv[i];
+        if (arg == "--count" && i + 1 < argc) {
+            count = std::stoi(argv[++ i]);
+        } else if (arg == "--seed" && i + 1 < argc) {
+            seed = std::stoull(argv[++ i]);
+        } else if (arg == "--output-dir" && i + 1 < argc) {
+            output_dir = argv[++ i];
+        } else {
+            std::cerr << "usage: " << argv[0] << " [--count N] [--seed S] [--output-dir DIR]" << std::endl;
+            return 1;
+        }
+    }
+    if (count == -1) {
+        std::mt19937_64 gen(seed);
+        generate(gen);
+        return 0;
+    }
+
+    // write many cases in a process. The i-th case depends only on seed + i.
+    int width = std::to_string(std::max(0, count - 1)).size();
+    std::streambuf *stdout_buf = std::cout.rdbuf();
+    REP (i, count) {
+        std::string name = std::to_string(i);
+        std::string path = output_dir + "/random-" + std::string(width - name.size(), '0') + name + ".in";
+        std::ofstream fh(path);
+        if (not fh) {
+            std::cerr << "failed to open " << path << std::endl;
+            return 1;
+        }
+        std::mt19937_64 gen(seed + i);
+        std::cout.rdbuf(fh.rdbuf());
+        generate(gen);
+        std::cout.rdbuf(stdout_buf);
+    }
     return 0;
 }
@@ -20,6 +20,11 @@
 #!/usr/bin/env python3
 # usage: $ oj generate-input 'python3 generate.py'
 # usage: $ oj generate-input --hack-actual=./a.out --hack-expected=./naive 'python3 generate.py'
+# usage: $ python3 generate.py --count 1000 --seed 0 --output-dir test --jobs 4
+import argparse
+import contextlib
+import io
+import os
 import random
 
 # generated by ${about.title} ${about.version} (${about.url})
@@ -27,5 +32,42 @@ def main():
 ${python.generate_input(data)}
 ${python.write_input(data)}
 
+
+def generate_case(seed, path):
+    random.seed(seed)
+    with io.StringIO() as buf:
+        with contextlib.redirect_stdout(buf):
+            main()
+        with open(path, 'w') as fh:
+            fh.write(buf.getvalue())
+
+
+def generate_cases(*, count, seed, output_dir, jobs):
+    """generate_cases writes many cases in a process, without starting the interpreter for each case. The i-th case depends only on seed + i.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    width = len(str(count - 1))
+    seeds = [(None if seed is None else seed + i) for i in range(count)]
+    paths = [os.path.join(output_dir, 'random-{}.in'.format(str(i).zfill(width))) for i in range(count)]
+    if jobs == 1:
+        for seed, path in zip(seeds, paths):
+            generate_case(seed, path)
+    else:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(generate_case, seeds, paths, chunksize=max(1, count // (4 * jobs))))
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, help='write this number of cases to files in --output-dir, instead of a case to stdout')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output-dir', default='test')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='the number of worker processes for --count')
+    args = parser.parse_args()
+    if args.count is None:
+        random.seed(args.seed)
+        main()
+    else:
+        generate_cases(count=args.count, seed=args.seed, output_dir=args.output_dir, jobs=args.jobs)
@@ -14,6 +14,8 @@
     logger = getLogger(__name__)
     data["config"]["rep_macro"] = "REP"
     data["config"]["long_long_int"] = "int64_t"
+    # data["config"]["io"] = "fast"  # use a buffered reader/writer with fread()/fwrite() instead of std::cin/std::cout
+    # data["config"]["array_layout"] = "flat"  # store multi-dimensional arrays in a single std::vector, e.g. a[W * j + i] instead of a[j][i]
     if platform.system() == "Linux" and "clang" not in os.environ.get("CXX", "g++"):
         include = "#include <bits/stdc++.h>"
     else:
@@ -40,6 +42,10 @@ ${include}
 #define REP3R(i, m, n) for (int i = (int)(n) - 1; (i) >= (int)(m); -- (i))
 #define ALL(x) ::std::begin(x), ::std::end(x)
 using namespace std;
+% if cplusplus.uses_fast_io(data):
+
+${cplusplus.declare_fast_io(data)}
+% endif
 
 ${cplusplus.declare_constants(data)}
 % if topcoder.is_topcoder(data):
@@ -1,6 +1,8 @@
 import unittest
+import unittest.mock
 
 import onlinejudge_template.analyzer.combined as analyzer
+import onlinejudge_template.analyzer.minimum_tree as minimum_tree
 from onlinejudge_template.types import *
 
 
@@ -34,3 +36,24 @@ class TestAnalyzerCombined(unittest.TestCase):
         analyzed = analyzer.run(resources)
         self.assertEqual(str(analyzed.input_format), str(input_format))
         self.assertEqual(str(analyzed.output_format), str(output_format))
+
+    def test_search_workers(self) -> None:
+        resources = AnalyzerResources(
+            url=None,
+            html=None,
+            input_format_string=None,
+            output_format_string=None,
+            sample_cases=[
+                SampleCase(input=b'4 2\n1 2 3 4\n5 6\n', output=b'10\n11\n'),
+                SampleCase(input=b'2 1\n7 8\n9\n', output=b'15\n9\n'),
+            ],
+        )
+
+        expected = analyzer.run(resources)
+        with unittest.mock.patch.object(minimum_tree, '_construct_minimum_input_format_internal_tree', wraps=minimum_tree._construct_minimum_input_format_internal_tree) as mock:
+            actual = analyzer.run(resources, search_workers=2)
+            self.assertTrue(mock.called)
+            self.assertTrue(all([call[1]['workers'] == 2 for call in mock.call_args_list]))
+        self.assertIsNotNone(actual.input_format)
+        self.assertEqual(repr(actual.input_format), repr(expected.input_format))
+        self.assertEqual(repr(actual.output_format), repr(expected.output_format))
@@ -1,4 +1,8 @@
+import concurrent.futures
 import unittest
+import unittest.mock
+
+import bs4
 
 import onlinejudge_template.analyzer.html as analyzer
 from onlinejudge_template.network import download_html
@@ -234,3 +238,38 @@ class TestFormatStringDetectorYukicoder(unittest.TestCase):
         html = download_html(url)
         self.assertEqual(analyzer.parse_input_format_string(html, url=url), expected_input)
         self.assertEqual(analyzer.parse_output_format_string(html, url=url), expected_output)
+
+
+class TestHTMLDocument(unittest.TestCase):
+    """TestHTMLDocument is a class for unit tests about the cache of parsed HTML (without network access).
+    """
+
+    html = b"""<div><h3>Input</h3><pre><var>N</var>\r\n<var>A_1</var> <var>A_2</var></pre></div><div class="part foo"><h3>Output</h3><pre><var>ans</var></pre></div>"""
+    url = 'https://atcoder.jp/contests/abc999/tasks/abc999_a'
+
+    def setUp(self) -> None:
+        analyzer._parse_html.cache_clear()
+
+    def test_parsed_once(self) -> None:
+        with unittest.mock.patch.object(bs4.BeautifulSoup, '__init__', autospec=True, side_effect=bs4.BeautifulSoup.__init__) as mock:
+            self.assertEqual(analyzer.parse_input_format_string(self.html, url=self.url), '<var>N</var>\r\n<var>A_1</var> <var>A_2</var>\r\n')
+            self.assertEqual(analyzer.parse_output_format_string(self.html, url=self.url), '<var>ans</var>\r\n')
+            self.assertEqual(mock.call_count, 1)
+        self.assertIs(analyzer.get_document(self.html), analyzer.get_document(self.html))
+
+    def test_find_all_cached_per_tag(self) -> None:
+        document = analyzer.HTMLDocument(self.html)
+        with unittest.mock.patch.object(document.soup, 'find_all', wraps=document.soup.find_all) as mock:
+            pres = document.find_all('pre')
+            self.assertEqual(len(pres), 2)
+            self.assertIs(document.find_all('pre'), pres)
+            self.assertEqual(len(document.find_all('var')), 4)
+            self.assertEqual(document.find_all_with_class('div', 'foo'), [pres[1].parent])
+            self.assertEqual([call[0][0] for call in mock.call_args_list], ['pre', 'var', 'div'])
+
+    def test_shared_by_threads(self) -> None:
+        with unittest.mock.patch.object(bs4.BeautifulSoup, '__init__', autospec=True, side_effect=bs4.BeautifulSoup.__init__) as mock:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(lambda _: analyzer.parse_input_format_string(self.html, url=self.url), range(8)))
+            self.assertEqual(mock.call_count, 1)
+        self.assertEqual(len(set(results)), 1)
@@ -1,3 +1,4 @@
+import io
 import textwrap
 import unittest
 
@@ -44,3 +45,67 @@ class TestMinimumTree(unittest.TestCase):
 
         actual = analyzer.match_format(node=node, data=data, variables={decl.name: decl for decl in variables})
         self.assertEqual(actual, expected)
+
+    def test_large(self) -> None:
+        # The number of tokens is large, so this test takes too long time if the matching takes quadratic time.
+        n = 10**5
+        node = SequenceNode(items=[
+            ItemNode(indices=[], name='n'),
+            NewlineNode(),
+            LoopNode(name='i', size='n', body=ItemNode(indices=['i + 1'], name='a')),
+            NewlineNode(),
+        ])
+        data = f"""{n}\n""" + ' '.join(map(str, range(n))) + '\n'
+        variables = [
+            VarDecl(name=VarName('n'), type=None, dims=[], bases=[], depending=set()),
+            VarDecl(name=VarName('a'), type=None, dims=[Expr('n')], bases=[Expr('1')], depending={VarName('n')}),
+        ]
+
+        actual = analyzer.match_format(node=node, data=data, variables={decl.name: decl for decl in variables})
+        self.assertEqual(actual[VarName('n')], {(): n})
+        self.assertEqual(actual[VarName('a')], {(i, ): i for i in range(n)})
+
+    def test_streaming(self) -> None:
+        node = SequenceNode(items=[
+            ItemNode(indices=[], name='n'),
+            NewlineNode(),
+            LoopNode(name='i', size='n', body=ItemNode(indices=['i'], name='a')),
+            NewlineNode(),
+        ])
+        data = b'3\r\n10 20 30\r\n'
+        variables = [
+            VarDecl(name=VarName('n'), type=None, dims=[], bases=[], depending=set()),
+            VarDecl(name=VarName('a'), type=None, dims=[Expr('n')], bases=[Expr('0')], depending={VarName('n')}),
+        ]
+        variables_dict = {decl.name: decl for decl in variables}
+
+        expected = {'n': {(): 3}, 'a': {(0, ): 10, (1, ): 20, (2, ): 30}}
+        self.assertEqual(analyzer.match_format(node=node, data=data, variables=variables_dict), expected)
+        self.assertEqual(analyzer.match_format(node=node, data=io.BytesIO(data), variables=variables_dict), expected)
+        analyzer.validate_format(node=node, data=io.BytesIO(data), variables=variables_dict)
+        with self.assertRaises(analyzer.FormatMatchError):
+            analyzer.validate_format(node=node, data=io.BytesIO(b'3\n10 20\n'), variables=variables_dict)
+
+    def test_array_values(self) -> None:
+        # A_{i, j} with K_i columns is ragged, so the storage falls back to a dict.
+        node = SequenceNode(items=[
+            ItemNode(indices=[], name='n'),
+            NewlineNode(),
+            LoopNode(name='i', size='n', body=SequenceNode(items=[
+                ItemNode(indices=['i'], name='k'),
+                LoopNode(name='j', size='k_i', body=ItemNode(indices=['i', 'j'], name='a')),
+                NewlineNode(),
+            ])),
+        ])
+        data = '2\n1 x\n2 y z\n'
+        variables = [
+            VarDecl(name=VarName('n'), type=None, dims=[], bases=[], depending=set()),
+            VarDecl(name=VarName('k'), type=None, dims=[Expr('n')], bases=[Expr('0')], depending={VarName('n')}),
+            VarDecl(name=VarName('a'), type=None, dims=[Expr('n'), Expr('k_i')], bases=[Expr('0'), Expr('0')], depending={VarName('n'), VarName('k')}),
+        ]
+
+        actual = analyzer.match_format(node=node, data=data, variables={decl.name: decl for decl in variables})
+        self.assertTrue(actual[VarName('k')].is_int_array())
+        self.assertFalse(actual[VarName('a')].is_int_array())
+        self.assertEqual(actual[VarName('k')], {(0, ): 1, (1, ): 2})
+        self.assertEqual(actual[VarName('a')], {(0, 0): 'x', (1, 0): 'y', (1, 1): 'z'})
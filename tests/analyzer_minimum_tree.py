@@ -217,3 +217,62 @@ class TestMinimumTree(unittest.TestCase):
         actual = analyzer.construct_minimum_input_format_tree(instances=instances, multiple_test_cases=True)
         print(actual)
         self.assertEqual(str(actual), str(expected))
+
+    def test_workers(self) -> None:
+        instances = [
+            textwrap.dedent("""\
+            4 2
+            1 2 3 4
+            5 6
+            """),
+            textwrap.dedent("""\
+            2 1
+            7 8
+            9
+            """),
+        ]
+
+        expected = analyzer.construct_minimum_input_format_tree(instances=instances)
+        actual = analyzer.construct_minimum_input_format_tree(instances=instances, workers=2)
+        self.assertIsNotNone(actual)
+        self.assertEqual(str(actual), str(expected))
+
+
+class TestCompactTokens(unittest.TestCase):
+    INSTANCES = [
+        '3\n1 2 3\n',
+        '4 2\nab 3 cd 5 6\n7\n',
+        '10 20\r\n0 x\n\n5',
+    ]
+
+    def test_tokenize_content(self) -> None:
+        for instance in self.INSTANCES:
+            tokens = analyzer.tokenize_content(instance)
+            words = [word for line in instance.splitlines(keepends=True) for word in line.split() + (['\n'] if line.endswith('\n') else [])]
+            self.assertEqual(len(tokens), len(words))
+            for i, word in enumerate(words):
+                if word == '\n':
+                    self.assertEqual(tokens.kinds[i], analyzer._KIND_NEWLINE)
+                elif word.isdigit() and int(word) <= len(instance.split()) + len(instance.splitlines()) + 3:
+                    self.assertEqual((tokens.kinds[i], tokens.values[i]), (analyzer._KIND_INT, int(word)))
+                else:
+                    self.assertEqual(tokens.kinds[i], analyzer._KIND_STRING)
+
+    def test_loop_of_single_item(self) -> None:
+        # the run-lengths give the same results as matching the body one by one
+        for instance in self.INSTANCES:
+            tokens = analyzer.tokenize_content(instance)
+            for body in (analyzer._IntNode(next=analyzer._EOFNode()), analyzer._StringNode(next=analyzer._EOFNode())):
+                for count in range(1, 6):
+                    for offset in range(len(tokens) + 1):
+                        node = analyzer._LoopNode(index=0, delta=0, body=body, next=analyzer._EOFNode())
+                        actual = analyzer.run_match(node, analyzer._MatchState(tokens=tokens, offset=offset, env=[count]))
+
+                        expected: Optional[int] = offset
+                        for _ in range(count):
+                            assert expected is not None
+                            result = analyzer.run_match(body, analyzer._MatchState(tokens=tokens, offset=expected, env=[count]))
+                            expected = None if result is None else result.offset
+                            if expected is None:
+                                break
+                        self.assertEqual(None if actual is None else actual.offset, expected)
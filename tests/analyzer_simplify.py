@@ -101,6 +101,20 @@ class TestExprEvaluation(unittest.TestCase):
         actual = simplify.evaluate(expr, env=env)
         self.assertIsNone(actual)
 
+    def test_div(self) -> None:
+        expr = Expr('n / 2 + 1')
+
+        self.assertEqual(simplify.evaluate(expr, env={VarName('n'): 4}), 3)
+        self.assertIsNone(simplify.evaluate(expr, env={VarName('n'): 3}))
+        self.assertIsNone(simplify.evaluate(Expr('n / (n - 4)'), env={VarName('n'): 4}))
+
+    def test_compiled(self) -> None:
+        f = simplify.compile_expr(Expr('a_{i + 1} - a_i'))
+
+        self.assertEqual(f({VarName('a'): [1, 3, 8], VarName('i'): 0}), 2)
+        self.assertEqual(f({VarName('a'): [1, 3, 8], VarName('i'): 1}), 5)
+        self.assertIsNone(f({VarName('a'): [1, 3, 8], VarName('i'): 2}))
+
 
 class TestExprSimplification(unittest.TestCase):
     """TestExprSimplification is a class for unit tests for the simplification of expressions.
@@ -161,3 +175,35 @@ class TestVariableUtils(unittest.TestCase):
 
         actual = simplify.format_subscripted_variable(name=name, indices=indices)
         self.assertEqual(actual, expected)
+
+    def test_parse_after_failure(self) -> None:
+        # The lexer and the parser are shared between calls, so states of a failed call must not remain.
+        self.assertRaises(ExprParserError, simplify.parse_subscripted_variable, 'a_{i, ')
+        s = 'a_{i, j}'
+        expected = ('a', ['i', 'j'])
+
+        actual = simplify.parse_subscripted_variable(s)
+        self.assertEqual(actual, expected)
+
+
+class TestExprCache(unittest.TestCase):
+    """TestExprCache is a class for unit tests for the caches of parsed and simplified exprs.
+    """
+    def test_hash(self) -> None:
+        a = add(var('a', var('i')), con(3))
+        b = add(var('a', var('i')), con(3))
+        c = add(var('a', var('j')), con(3))
+
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(len({a, b, c}), 2)
+
+    def test_cache_hit(self) -> None:
+        simplify.cache_clear()
+        expr = Expr('(n + 1) + (n - 1)')
+        expected = Expr('2 * n')
+
+        self.assertEqual(simplify.simplify(expr), expected)
+        self.assertEqual(simplify.simplify(expr), expected)
+        info = simplify.cache_info()['simplify']
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
@@ -0,0 +1,55 @@
+import unittest
+
+import onlinejudge_template.analyzer.typing as analyzer
+from onlinejudge_template.types import *
+
+
+class TestInferTypes(unittest.TestCase):
+    def test_simple(self) -> None:
+        node = SequenceNode(items=[
+            ItemNode(indices=[], name='n'),
+            NewlineNode(),
+            LoopNode(name='i', size='n', body=ItemNode(indices=['i'], name='a')),
+            NewlineNode(),
+            LoopNode(name='i', size='n', body=ItemNode(indices=['i'], name='b')),
+            NewlineNode(),
+            LoopNode(name='i', size='n', body=ItemNode(indices=['i'], name='c')),
+            NewlineNode(),
+        ])
+        variables = [
+            VarDecl(name=VarName('n'), type=None, dims=[], bases=[], depending=set()),
+            VarDecl(name=VarName('a'), type=None, dims=[Expr('n')], bases=[Expr('0')], depending={VarName('n')}),
+            VarDecl(name=VarName('b'), type=None, dims=[Expr('n')], bases=[Expr('0')], depending={VarName('n')}),
+            VarDecl(name=VarName('c'), type=None, dims=[Expr('n')], bases=[Expr('0')], depending={VarName('n')}),
+        ]
+        instances = [
+            '3\n1 2 3\nx y z\n1 2 3.5\n',
+            '2\n-9223372036854775808 18446744073709551615\nx yz\n1 2\n',
+        ]
+        expected = {
+            'n': VarType.IndexInt,
+            'a': VarType.ValueInt,
+            'b': VarType.String,
+            'c': VarType.Float,
+        }
+
+        actual = analyzer.infer_types_from_instances(node, variables={decl.name: decl for decl in variables}, instances=instances)
+        self.assertEqual(actual, expected)
+
+    def test_overflow(self) -> None:
+        node = SequenceNode(items=[
+            ItemNode(indices=[], name='a'),
+            NewlineNode(),
+        ])
+        variables = [
+            VarDecl(name=VarName('a'), type=None, dims=[], bases=[], depending=set()),
+        ]
+        instances = [
+            '18446744073709551616\n',
+        ]
+        expected = {
+            'a': VarType.String,
+        }
+
+        actual = analyzer.infer_types_from_instances(node, variables={decl.name: decl for decl in variables}, instances=instances)
+        self.assertEqual(actual, expected)
@@ -0,0 +1,79 @@
+import os
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+
+import onlinejudge_template.analyzer.combined as analyzer
+import onlinejudge_template.cache as cache
+import onlinejudge_template.network as network
+from onlinejudge_template.main import analyze
+from onlinejudge_template.types import *
+
+
+class TestCache(unittest.TestCase):
+    def test_downloaded(self) -> None:
+        url = 'https://atcoder.jp/contests/abc100/tasks/abc100_a#fragment'
+        html = b'<html></html>'
+        sample_cases = [SampleCase(input=b'5 4\n', output=b'Yay!\n')]
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            self.assertIsNone(cache.load_downloaded(url, cache_dir=tmpdir))
+            cache.store_downloaded(url, html=html, sample_cases=sample_cases, cache_dir=tmpdir)
+            self.assertEqual(cache.load_downloaded('https://AtCoder.jp/contests/abc100/tasks/abc100_a', cache_dir=tmpdir), (html, sample_cases))
+            self.assertIsNone(cache.load_downloaded(url, cache_dir=tmpdir, ttl=-1))
+
+    def test_analyzer_result(self) -> None:
+        url = 'https://atcoder.jp/contests/abc100/tasks/abc100_a'
+        resources = analyzer.prepare_from_html(b'<html></html>', url=url, sample_cases=[SampleCase(input=b'5 4\n', output=b'Yay!\n')])
+        result = analyzer.get_empty_analyzer_result(resources)
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            cache.store_analyzer_result(result, cache_dir=tmpdir)
+            self.assertEqual(cache.load_analyzer_result(resources, cache_dir=tmpdir), result)
+
+            # the key contains the sample cases
+            modified = resources._replace(sample_cases=[SampleCase(input=b'8 8\n', output=b'Yay!\n')])
+            self.assertIsNone(cache.load_analyzer_result(modified, cache_dir=tmpdir))
+
+    def test_evict(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            for i in range(3):
+                cache.store_downloaded(f"""https://example.com/{i}""", html=b'x' * 1000, sample_cases=[], cache_dir=tmpdir, max_size=2500)
+            self.assertEqual(len(list(tmpdir.glob('*/*.pickle'))), 2)
+            cache.clear(cache_dir=tmpdir)
+            self.assertEqual(len(list(tmpdir.glob('*/*.pickle'))), 0)
+
+    def test_load_evicted(self) -> None:
+        url = 'https://atcoder.jp/contests/abc100/tasks/abc100_a'
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            cache.store_downloaded(url, html=b'<html></html>', sample_cases=[], cache_dir=tmpdir)
+            with unittest.mock.patch.object(os, 'utime', side_effect=FileNotFoundError):  # another process evicted the file just after reading it
+                self.assertEqual(cache.load_downloaded(url, cache_dir=tmpdir), (b'<html></html>', []))
+
+
+class TestCacheNotWritable(unittest.TestCase):
+    """TestCacheNotWritable is a class for tests that failures to write the cache don't break the results.
+    """
+
+    url = 'https://atcoder.jp/contests/abc100/tasks/abc100_a'
+    html = b"""<div><h3>Input</h3><pre><var>A</var> <var>B</var></pre></div><div><h3>Output</h3><pre><var>ans</var></pre></div>"""
+    sample_cases = [SampleCase(input=b'5 4\n', output=b'Yay!\n')]
+
+    def test_analyze(self) -> None:
+        expected_exceptions: List[Exception] = []
+        expected = analyze(self.url, html=self.html, sample_cases=self.sample_cases, use_cache=False, exceptions=expected_exceptions)
+        self.assertEqual(expected_exceptions, [])
+        self.assertIsNotNone(expected.input_format)
+
+        with unittest.mock.patch.object(network, 'download_html_and_sample_cases', return_value=(self.html, self.sample_cases)):
+            with unittest.mock.patch.object(cache, '_store', side_effect=PermissionError):
+                exceptions: List[Exception] = []
+                actual = analyze(self.url, refresh=True, exceptions=exceptions)
+        self.assertEqual(exceptions, [])
+        self.assertEqual(actual.resources.html, self.html)
+        self.assertEqual(actual.resources.sample_cases, self.sample_cases)
+        self.assertEqual(repr(actual.input_format), repr(expected.input_format))
+        self.assertEqual(repr(actual.input_variables), repr(expected.input_variables))
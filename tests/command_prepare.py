@@ -3,10 +3,14 @@ import subprocess
 import sys
 import tempfile
 import textwrap
+import time
 import unittest
+import unittest.mock
 from typing import *
 
-from onlinejudge_prepare.main import chdir, main
+import onlinejudge_prepare.main
+from onlinejudge_prepare.main import chdir, main, prepare_contest, write_sample_cases
+from onlinejudge_template.types import *
 
 
 class TestOJPrepareCommand(unittest.TestCase):
@@ -59,3 +63,60 @@ class TestOJPrepareCommand(unittest.TestCase):
         compile = lambda tmpdir: [sys.executable, '--version']
         command = lambda tmpdir: ' '.join([sys.executable, str(tmpdir / subdir / 'main.py')])
         self._helper(url=url, subdir=subdir, template=template, placeholder=placeholder, code=code, compile=compile, command=command)
+
+
+class TestWriteSampleCases(unittest.TestCase):
+    def test_simple(self) -> None:
+        sample_cases = [
+            SampleCase(input=b'1 2\n', output=b'3\n'),
+            SampleCase(input=b'3 4\n', output=b'7\n'),
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            directory = pathlib.Path(tmpdir_) / 'test'
+            write_sample_cases(sample_cases, directory=directory)
+            self.assertEqual(sorted([path.name for path in directory.iterdir()]), ['sample-1.in', 'sample-1.out', 'sample-2.in', 'sample-2.out'])
+            self.assertEqual((directory / 'sample-2.out').read_bytes(), b'7\n')
+            with self.assertRaises(FileExistsError):
+                write_sample_cases(sample_cases, directory=directory)
+
+
+class _DummyProblem:
+    def __init__(self, url: str):
+        self.url = url
+
+    def get_url(self) -> str:
+        return self.url
+
+
+class _DummyContest:
+    def __init__(self, problems: List[_DummyProblem]):
+        self.problems = problems
+
+    def get_url(self) -> str:
+        return 'https://example.com/contest'
+
+    def list_problems(self) -> List[_DummyProblem]:
+        return self.problems
+
+
+class TestPrepareContest(unittest.TestCase):
+    def test_errors_in_problem_order(self) -> None:
+        problems = [_DummyProblem(f"""https://example.com/{name}""") for name in 'abcd']
+        called: List[str] = []
+
+        def prepare_problem(problem: _DummyProblem, **kwargs: Any) -> None:
+            called.append(problem.get_url())
+            if problem.get_url().endswith('/a'):
+                time.sleep(0.2)  # finishes after the other problems
+                raise ValueError('a')
+            if problem.get_url().endswith('/c'):
+                raise ValueError('c')
+
+        with unittest.mock.patch.object(onlinejudge_prepare.main, 'prepare_problem', side_effect=prepare_problem):
+            with self.assertLogs(onlinejudge_prepare.main.logger, level='ERROR') as logs:
+                with self.assertRaises(ValueError) as cm:
+                    prepare_contest(_DummyContest(problems), config={}, session=unittest.mock.Mock(), jobs=3)  # type: ignore
+        self.assertEqual(str(cm.exception), 'a')
+        self.assertEqual(sorted(called), [problem.get_url() for problem in problems])
+        failed = [line.splitlines()[0].split(': ')[-1] for line in logs.output]
+        self.assertEqual(failed, ['https://example.com/a', 'https://example.com/c'])
@@ -1,6 +1,7 @@
 import contextlib
 import io
 import pathlib
+import shutil
 import subprocess
 import sys
 import tempfile
@@ -8,7 +9,8 @@ import textwrap
 import unittest
 from typing import *
 
-from onlinejudge_template.main import main
+from onlinejudge_template.main import generate, main
+from onlinejudge_template.types import *
 
 
 class TestOJTemplateCommand(unittest.TestCase):
@@ -112,3 +114,98 @@ class TestOJTemplateCommandGenerator(unittest.TestCase):
                 self.assertEqual(len(c), 1)
 
         validate(self._helper(url=url, template=template, compile=compile, command=command))
+
+
+class TestBatchedGenerator(unittest.TestCase):
+    """TestBatchedGenerator checks `--count N --seed S --output-dir DIR` of the random case generators, without network access.
+    """
+
+    HTML = b'''<html><body><section><h3>Input</h3><pre><var>N</var> <var>M</var>
+<var>A_1</var> <var>\\ldots</var> <var>A_N</var>
+</pre></section></body></html>'''
+
+    def _helper(self, *, template: str, compile: Callable[[pathlib.Path], List[str]], command: Callable[[pathlib.Path], List[str]]) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            exceptions: List[Exception] = []
+            sample_cases = [SampleCase(input=b'3 5\n1 2 3\n', output=b'1\n')]
+            codes = generate('https://atcoder.jp/contests/abc999/tasks/abc999_a', template_files=[template], html=self.HTML, sample_cases=sample_cases, use_cache=False, exceptions=exceptions)
+            (tmpdir / template).write_bytes(codes[template])
+            subprocess.check_call(compile(tmpdir), stdout=sys.stdout, stderr=sys.stderr)
+
+            (tmpdir / 'test').mkdir()
+            subprocess.check_call(command(tmpdir) + ['--count', '12', '--seed', '100', '--output-dir', str(tmpdir / 'test')])
+            paths = sorted((tmpdir / 'test').iterdir())
+            self.assertEqual([path.name for path in paths], ['random-{:02}.in'.format(i) for i in range(12)])
+            for path in paths:
+                tokens = path.read_text().split()
+                self.assertEqual(len(tokens), 2 + int(tokens[0]))
+
+            # the i-th case is the same as the single case with the seed S + i
+            single = subprocess.check_output(command(tmpdir) + ['--seed', '105'])
+            self.assertEqual(single, paths[5].read_bytes())
+
+    def test_generate_py(self) -> None:
+        compile = lambda tmpdir: [sys.executable, '--version']  # nop
+        command = lambda tmpdir: [sys.executable, str(tmpdir / 'generate.py')]
+        self._helper(template='generate.py', compile=compile, command=command)
+
+    @unittest.skipIf(shutil.which('g++') is None, 'g++ is required')
+    def test_generate_cpp(self) -> None:
+        compile = lambda tmpdir: ['g++', '-std=c++14', '-Wall', '-o', str(tmpdir / 'a.out'), str(tmpdir / 'generate.cpp')]
+        command = lambda tmpdir: [str(tmpdir / 'a.out')]
+        self._helper(template='generate.cpp', compile=compile, command=command)
+
+
+class TestOJTemplateStartUp(unittest.TestCase):
+    """TestOJTemplateStartUp checks that `oj-template --help` doesn't import heavy modules.
+    """
+
+    # The threshold is loose, because CI machines are slow. The heavy modules took about 200 ms in total.
+    THRESHOLD = 0.1  # in seconds
+
+    def test_help(self) -> None:
+        code = "import sys; from onlinejudge_template.main import main; sys.argv[0] = 'oj-template'; main(['--help'])"
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=str(pathlib.Path(__file__).parent.parent))
+        self.assertEqual(proc.returncode, 0)
+
+        # sum the cumulative times of top-level imports done by `onlinejudge_template.main`
+        total = 0
+        modules = []
+        started = False
+        for line in proc.stderr.decode().splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            modules.append(name.strip())
+            if name.strip() in ('onlinejudge_template', 'onlinejudge_template.main'):
+                started = True
+            if started and name == ' ' + name.strip():  # top-level
+                total += int(cumulative)
+        for module in ('onlinejudge.dispatch', 'bs4', 'ply', 'mako', 'pkg_resources'):
+            self.assertNotIn(module, modules)
+        self.assertLess(total / 10**6, self.THRESHOLD)
+
+
+class TestGenerate(unittest.TestCase):
+    def test_many_templates(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            (tmpdir / 'a.txt').write_text("""a: ${len(data['analyzed'].resources.sample_cases)}\n""")
+            (tmpdir / 'b.txt').write_text("""b: ${data['analyzed'].resources.sample_cases[0].output.decode()}""")
+            (tmpdir / 'broken.txt').write_text("""${undefined_function()}""")
+            templates = [str(tmpdir / 'a.txt'), str(tmpdir / 'b.txt'), str(tmpdir / 'broken.txt')]
+            sample_cases = [SampleCase(input=b'1 2\n', output=b'3\n')]
+
+            exceptions: List[Exception] = []
+            codes = generate(None, template_files=templates, html=b'<html></html>', sample_cases=sample_cases, use_cache=False, exceptions=exceptions)
+            self.assertEqual(codes, {
+                templates[0]: b'a: 1\n',
+                templates[1]: b'b: 3\n',
+            })
+            self.assertTrue(exceptions)
+
+    def test_output_dir_is_required(self) -> None:
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main(['-t', 'main.cpp', '-t', 'main.py', 'https://atcoder.jp/contests/abc100/tasks/abc100_a'])
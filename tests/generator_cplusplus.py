@@ -0,0 +1,89 @@
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import unittest
+from typing import *
+
+import onlinejudge_template.generator.cplusplus as cplusplus
+from onlinejudge_template.types import *
+from tests.utils import get_analyzed, get_decl
+
+
+def _build_and_run(data: Dict[str, Any], *, input: bytes) -> bytes:
+    code = '\n'.join([
+        '#include <bits/stdc++.h>',
+        cplusplus.declare_fast_io(data) if cplusplus.uses_fast_io(data) else '',
+        'int main() {',
+        cplusplus.read_input(data),
+        cplusplus.write_input(data),
+        '}',
+    ])
+    with tempfile.TemporaryDirectory() as tmpdir_:
+        tmpdir = pathlib.Path(tmpdir_)
+        (tmpdir / 'main.cpp').write_text(code)
+        subprocess.check_call(['g++', '-std=c++14', '-Wall', '-o', str(tmpdir / 'a.out'), str(tmpdir / 'main.cpp')])
+        return subprocess.run([str(tmpdir / 'a.out')], input=input, stdout=subprocess.PIPE, check=True).stdout
+
+
+class TestFastIO(unittest.TestCase):
+    @unittest.skipIf(shutil.which('g++') is None, 'g++ is required')
+    def test_types(self) -> None:
+        format = SequenceNode(items=[
+            ItemNode(name='N'),
+            ItemNode(name='s'),
+            ItemNode(name='x'),
+            ItemNode(name='c'),
+            NewlineNode(),
+            LoopNode(size='N', name='i', body=SequenceNode(items=[ItemNode(name='a', indices=['i']), ItemNode(name='b', indices=['i']), NewlineNode()])),
+        ])
+        variables = {
+            VarName('N'): get_decl('N', VarType.IndexInt),
+            VarName('s'): get_decl('s', VarType.String),
+            VarName('x'): get_decl('x', VarType.Float),
+            VarName('c'): get_decl('c', VarType.Char),
+            VarName('a'): get_decl('a', VarType.ValueInt, ['N'], ['0']),
+            VarName('b'): get_decl('b', VarType.String, ['N'], ['0']),
+        }
+        analyzed = get_analyzed(format, variables)
+        input = b'3 hello 1.25 z\n-9223372036854775808 ab\n0 c\xff\n9223372036854775807 def\n'  # bytes out of ASCII are not EOF
+        expected = _build_and_run({'analyzed': analyzed, 'config': {}}, input=input)
+        actual = _build_and_run({'analyzed': analyzed, 'config': {'io': 'fast'}}, input=input)
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual, input)
+
+
+class TestArrayLayout(unittest.TestCase):
+    def _get_analyzed(self) -> AnalyzerResult:
+        format = SequenceNode(items=[
+            ItemNode(name='H'),
+            ItemNode(name='W'),
+            NewlineNode(),
+            LoopNode(size='H', name='j', body=SequenceNode(items=[LoopNode(size='W', name='i', body=ItemNode(name='a', indices=['j + 1', 'i + 1'])), NewlineNode()])),
+            LoopNode(size='2', name='k', body=SequenceNode(items=[LoopNode(size='H', name='j', body=SequenceNode(items=[LoopNode(size='W', name='i', body=ItemNode(name='c', indices=['k', 'j', 'i'])), NewlineNode()]))])),
+        ])
+        variables = {
+            VarName('H'): get_decl('H', VarType.IndexInt),
+            VarName('W'): get_decl('W', VarType.IndexInt),
+            VarName('a'): get_decl('a', VarType.ValueInt, ['H', 'W'], ['1', '1']),
+            VarName('c'): VarDecl(name=VarName('c'), type=VarType.Char, dims=[Expr('2'), Expr('H'), Expr('W')], bases=[Expr('0'), Expr('0'), Expr('0')], depending={VarName('H'), VarName('W')}),
+        }
+        return get_analyzed(format, variables)
+
+    def test_arguments(self) -> None:
+        data = {'analyzed': self._get_analyzed(), 'config': {'array_layout': 'flat'}}
+        self.assertEqual(cplusplus.formal_arguments(data), 'int H, int W, const std::vector<long long> &a, const std::vector<char> &c')
+        self.assertEqual(cplusplus.actual_arguments(data), 'H, W, a, c')
+        self.assertIn('std::vector<long long> a(H * W);', cplusplus.read_input(data))
+
+    @unittest.skipIf(shutil.which('g++') is None, 'g++ is required')
+    def test_flat(self) -> None:
+        analyzed = self._get_analyzed()
+        input = b'2 3\n1 2 3\n4 5 6\na b c\nd e f\ng h i\nj k l\n'
+        expected = _build_and_run({'analyzed': analyzed, 'config': {}}, input=input)
+        actual = _build_and_run({'analyzed': analyzed, 'config': {'array_layout': 'flat'}}, input=input)
+        self.assertEqual(actual, expected)
+
+    def test_invalid_config(self) -> None:
+        with self.assertRaises(GeneratorError):
+            cplusplus.read_input({'analyzed': self._get_analyzed(), 'config': {'array_layout': 'foo'}})
@@ -0,0 +1,112 @@
+import concurrent.futures
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import textwrap
+import unittest
+import unittest.mock
+from typing import *
+
+import onlinejudge_template.generator.hook as hook
+
+
+def _get_data(command: List[str]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    hook._prepare_hook(data=data)
+    if command:
+        hook.register_filter_command(command, data=data)
+    return data
+
+
+class TestExecuteHooks(unittest.TestCase):
+    def test_simple(self) -> None:
+        upper = _get_data([sys.executable, '-c', 'import sys; sys.stdout.write(sys.stdin.read().upper())'])
+        items = [
+            (b'foo\n', upper),
+            (b'bar\n', _get_data([])),
+            (b'baz\n', upper),
+        ]
+        self.assertEqual(hook._execute_hooks(items), [b'FOO\n', b'bar\n', b'BAZ\n'])
+
+    def test_cache(self) -> None:
+        command = [sys.executable, '-c', 'import sys, time; sys.stdout.write(str(time.time()))']
+        a = hook._execute_hook(b'foo\n', data=_get_data(command))
+        b = hook._execute_hook(b'foo\n', data=_get_data(command))
+        c = hook._execute_hook(b'bar\n', data=_get_data(command))
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_fallback(self) -> None:
+        command = [sys.executable, '-c', 'import sys; s = sys.stdin.read(); sys.exit(1) if "bad" in s else sys.stdout.write(s.upper())']
+        items = [
+            (b'good\n', _get_data(command)),
+            (b'bad\n', _get_data(command)),
+        ]
+        results = hook._execute_hooks(items)
+        self.assertEqual(results[0], b'GOOD\n')
+        self.assertIn(b'Generated code (before processed by the filter):\nbad\n', results[1])
+
+
+# a fake clang-format, which records its arguments and makes code upper case
+_FAKE_CLANG_FORMAT = textwrap.dedent("""\
+    import json, pathlib, sys
+    with open(pathlib.Path(__file__).parent / 'log', 'a') as fh:
+        fh.write(json.dumps(sys.argv[1:]) + '\\n')
+    if '-i' in sys.argv:
+        for arg in sys.argv[sys.argv.index('-i') + 1:]:
+            path = pathlib.Path(arg)
+            path.write_text(path.read_text().upper())
+    else:
+        sys.stdout.write(sys.stdin.read().upper())
+""")
+
+
+@unittest.skipIf(os.name == 'nt', 'the fake command is a script with a shebang')
+class TestBatch(unittest.TestCase):
+    def _run(self, command: List[str]) -> List[List[str]]:
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            path = tmpdir / 'clang-format'
+            path.write_text(f"""#!{sys.executable}\n""" + _FAKE_CLANG_FORMAT)
+            path.chmod(0o755)
+            with unittest.mock.patch.dict(os.environ, {'PATH': str(tmpdir) + os.pathsep + os.environ['PATH']}):
+                items = [(f"""{command} {i}\n""".encode(), _get_data(command)) for i in range(3)]
+                self.assertEqual(hook._execute_hooks(items), [rendered.upper() for rendered, _ in items])
+            return [json.loads(line) for line in (tmpdir / 'log').read_text().splitlines()]
+
+    def test_explicit_style(self) -> None:
+        for command in (['clang-format', '--style', '{IndentWidth: 4}'], ['clang-format', '-style=Google']):
+            logs = self._run(command)
+            self.assertEqual(len(logs), 1)
+            self.assertEqual(logs[0][:len(command)], command[1:] + ['-i'])
+
+    def test_config_file(self) -> None:
+        # the files must not be moved to temporary directories, to use the config files (e.g. `.clang-format`) of the project
+        for command in (['clang-format'], ['clang-format', '--style=file'], ['clang-format', '--style', 'file:/path/to/config']):
+            logs = self._run(command)
+            self.assertEqual(logs, [command[1:]] * 3)
+
+    def test_cache_size(self) -> None:
+        with unittest.mock.patch.object(hook, '_formatted_cache_size', 2):
+            self._run(['clang-format', '--style=LLVM'])
+            self.assertLessEqual(len(hook._formatted_cache), 2)
+
+
+class TestFormatWithYapfAPI(unittest.TestCase):
+    def test_without_style(self) -> None:
+        # `yapf` without `--style` must run as a command to read the config files of the project
+        self.assertIsNone(hook._format_with_yapf_api(['yapf'], b'x=1\n'))
+
+    def test_concurrent_styles(self) -> None:
+        try:
+            import yapf  # pylint: disable=unused-import
+        except ImportError:
+            self.skipTest('yapf is not installed')
+        code = b'def f():\n  return 1\n'
+        styles = ['{based_on_style: pep8, indent_width: 4}', '{based_on_style: pep8, indent_width: 2}']
+        expected = [b'def f():\n    return 1\n', b'def f():\n  return 1\n']
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda i: hook._format_with_yapf_api(['yapf', '--style', styles[i % 2]], code), range(32)))
+        self.assertEqual(results, [expected[i % 2] for i in range(32)])
@@ -0,0 +1,43 @@
+import os
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+
+import onlinejudge_template.analyzer.combined as analyzer
+import onlinejudge_template.generator._main as generator
+
+
+class TestModuleCache(unittest.TestCase):
+    """TestModuleCache is a class for unit tests about the templates compiled to Python modules and cached on disk.
+    """
+    def setUp(self) -> None:
+        generator._get_lookup.cache_clear()
+        self.addCleanup(generator._get_lookup.cache_clear)
+
+    def test_recompile_edited_template(self) -> None:
+        resources = analyzer.prepare_from_html(b'<html></html>', url='https://atcoder.jp/contests/abc100/tasks/abc100_a', sample_cases=[])
+        analyzed = analyzer.get_empty_analyzer_result(resources)
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            module_directory = tmpdir / 'modules'
+            module_directory.mkdir()
+            template_file = tmpdir / 'main.txt'
+            template_file.write_text('foo ${1 + 1}\n')
+
+            with unittest.mock.patch.object(generator, '_get_module_directory', return_value=module_directory):
+                # the compiled module is reused
+                self.assertEqual(generator.run(analyzed, template_file=str(template_file)), b'foo 2\n')
+                modules = sorted(module_directory.glob('*.py'))
+                self.assertEqual(len(modules), 1)
+                self.assertEqual(generator.run(analyzed, template_file=str(template_file)), b'foo 2\n')
+                self.assertEqual(sorted(module_directory.glob('*.py')), modules)
+
+                # the edited template is compiled again, even if its mtime is not changed
+                stat = template_file.stat()
+                key = generator._get_module_filename(str(template_file), str(template_file), module_directory=module_directory)
+                template_file.write_text('bar ${1 + 1}\n')
+                os.utime(str(template_file), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                self.assertNotEqual(generator._get_module_filename(str(template_file), str(template_file), module_directory=module_directory), key)
+                self.assertEqual(generator.run(analyzed, template_file=str(template_file)), b'bar 2\n')
+                self.assertEqual(len(list(module_directory.glob('*.py'))), 2)
@@ -0,0 +1,123 @@
+import contextlib
+import io
+import sys
+import unittest
+from typing import *
+
+import onlinejudge_template.generator.python as python
+from onlinejudge_template.types import *
+from tests.utils import get_analyzed, get_decl
+
+
+def _run_read_input(analyzed: AnalyzerResult, *, io_config: Optional[str], input: bytes) -> Dict[str, Any]:
+    code = python.read_input({'analyzed': analyzed, 'config': {'io': io_config}}, nest=0)
+    env: Dict[str, Any] = {}
+    stdin = sys.stdin
+    sys.stdin = io.TextIOWrapper(io.BytesIO(input))
+    try:
+        exec(code, env)
+    finally:
+        sys.stdin = stdin
+    return {name: env[name] for name in analyzed.input_variables or {}}
+
+
+def _run_write_output(analyzed: AnalyzerResult, *, io_config: Optional[str], env: Dict[str, Any]) -> str:
+    code = python.write_output({'analyzed': analyzed, 'config': {'io': io_config}}, nest=0)
+    fh = io.StringIO()
+    with contextlib.redirect_stdout(fh):
+        exec(code, dict(env))
+    return fh.getvalue()
+
+
+class TestFastIO(unittest.TestCase):
+    def _check(self, analyzed: AnalyzerResult, input: bytes) -> None:
+        expected = _run_read_input(analyzed, io_config=None, input=input)
+        actual = _run_read_input(analyzed, io_config='fast', input=input)
+        self.assertEqual(actual, expected)
+        self.assertEqual(_run_write_output(analyzed, io_config='fast', env=expected), _run_write_output(analyzed, io_config=None, env=expected))
+
+    def test_arrays(self) -> None:
+        format = SequenceNode(items=[
+            ItemNode(name='N'),
+            ItemNode(name='M'),
+            NewlineNode(),
+            LoopNode(size='N', name='i', body=ItemNode(name='A', indices=['i + 1'])),
+            NewlineNode(),
+            LoopNode(size='N', name='i', body=SequenceNode(items=[ItemNode(name='S', indices=['i + 1']), NewlineNode()])),
+            LoopNode(size='N', name='j', body=SequenceNode(items=[LoopNode(size='M', name='i', body=ItemNode(name='c', indices=['j + 1', 'i + 1'])), NewlineNode()])),
+        ])
+        variables = {
+            VarName('N'): get_decl('N', VarType.IndexInt),
+            VarName('M'): get_decl('M', VarType.IndexInt),
+            VarName('A'): get_decl('A', VarType.ValueInt, ['N'], ['1']),
+            VarName('S'): get_decl('S', VarType.String, ['N'], ['1']),
+            VarName('c'): get_decl('c', VarType.ValueInt, ['N', 'M'], ['1', '1']),
+        }
+        self._check(get_analyzed(format, variables), b'2 3\n1 -2\nab\ncd\n1 2 3\n4 5 6\n')
+
+    def test_mixed(self) -> None:
+        format = SequenceNode(items=[
+            ItemNode(name='N'),
+            ItemNode(name='s'),
+            ItemNode(name='x'),
+            NewlineNode(),
+            LoopNode(size='N', name='i', body=SequenceNode(items=[ItemNode(name='a', indices=['i']), ItemNode(name='b', indices=['i']), NewlineNode()])),
+            LoopNode(size='N', name='i', body=ItemNode(name='c', indices=['i + 1'])),
+            NewlineNode(),
+        ])
+        variables = {
+            VarName('N'): get_decl('N', VarType.IndexInt),
+            VarName('s'): get_decl('s', VarType.String),
+            VarName('x'): get_decl('x', VarType.Float),
+            VarName('a'): get_decl('a', VarType.ValueInt, ['N'], ['0']),
+            VarName('b'): get_decl('b', VarType.Char, ['N'], ['0']),
+            VarName('c'): get_decl('c', VarType.ValueInt, ['N + 1'], ['0']),
+        }
+        self._check(get_analyzed(format, variables), b'3 foo 1.5\n1 x\n2 y\n3 z\n7 8 9\n')
+
+    def test_invalid_config(self) -> None:
+        format = SequenceNode(items=[ItemNode(name='N'), NewlineNode()])
+        variables = {VarName('N'): get_decl('N', VarType.IndexInt)}
+        with self.assertRaises(GeneratorError):
+            python.read_input({'analyzed': get_analyzed(format, variables), 'config': {'io': 'foo'}})
+
+
+class TestRowInput(unittest.TestCase):
+    def test_matrix(self) -> None:
+        format = SequenceNode(items=[
+            ItemNode(name='H'),
+            ItemNode(name='W'),
+            NewlineNode(),
+            LoopNode(size='H', name='j', body=SequenceNode(items=[LoopNode(size='W', name='i', body=ItemNode(name='a', indices=['j + 1', 'i + 1'])), NewlineNode()])),
+            LoopNode(size='H', name='j', body=SequenceNode(items=[LoopNode(size='W', name='i', body=ItemNode(name='c', indices=['j', 'i'])), NewlineNode()])),
+        ])
+        variables = {
+            VarName('H'): get_decl('H', VarType.IndexInt),
+            VarName('W'): get_decl('W', VarType.IndexInt),
+            VarName('a'): get_decl('a', VarType.ValueInt, ['H', 'W'], ['1', '1']),
+            VarName('c'): get_decl('c', VarType.Char, ['H', 'W'], ['0', '0']),
+        }
+        analyzed = get_analyzed(format, variables)
+        code = python.read_input({'analyzed': analyzed, 'config': {}}, nest=0)
+        self.assertIn('a[j] = list(map(int, input().split()))', code)
+        self.assertIn('c[j] = input().split()', code)
+        self.assertNotIn('next(tokens)', code)
+        env = _run_read_input(analyzed, io_config=None, input=b'2 3\n1 2 3\n4 5 6\n# . #\n. . #\n')
+        self.assertEqual(env['a'], [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(env['c'], [['#', '.', '#'], ['.', '.', '#']])
+
+    def test_array_after_size(self) -> None:
+        # the row doesn't start a line, so it's read from tokens
+        format = SequenceNode(items=[
+            ItemNode(name='N'),
+            LoopNode(size='N', name='i', body=ItemNode(name='a', indices=['i + 1'])),
+            NewlineNode(),
+        ])
+        variables = {
+            VarName('N'): get_decl('N', VarType.IndexInt),
+            VarName('a'): get_decl('a', VarType.ValueInt, ['N'], ['1']),
+        }
+        analyzed = get_analyzed(format, variables)
+        code = python.read_input({'analyzed': analyzed, 'config': {}}, nest=0)
+        self.assertIn('a = [int(next(tokens)) for _ in range(N)]', code)
+        self.assertEqual(_run_read_input(analyzed, io_config=None, input=b'3 1 2 3\n'), {'N': 3, 'a': [1, 2, 3]})
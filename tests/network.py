@@ -0,0 +1,42 @@
+import socket
+import time
+import unittest
+import unittest.mock
+from typing import *
+
+import requests
+
+import onlinejudge_template.network as network
+
+
+class _DummyProblem:
+    def __init__(self, url: str):
+        self.url = url
+
+    def download_sample_cases(self, *, session: requests.Session) -> List[Any]:
+        session.get(self.url)  # online-judge-api-client doesn't give timeouts
+        return []
+
+
+class TestTimeout(unittest.TestCase):
+    """TestTimeout is a class for tests that requests don't wait forever (without network access).
+    """
+    def setUp(self) -> None:
+        # a server which accepts connections but never responds
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(8)
+        self.url = f"""http://127.0.0.1:{self.server.getsockname()[1]}/"""
+        self.addCleanup(self.server.close)
+
+    def test_configure_session(self) -> None:
+        session = network.configure_session(requests.Session(), timeout=0.1)
+        with self.assertRaises(requests.exceptions.Timeout):
+            session.get(self.url)
+
+    def test_download_sample_cases(self) -> None:
+        session = requests.Session()
+        start = time.perf_counter()
+        with unittest.mock.patch.object(network, 'default_timeout', 0.1):
+            self.assertIsNone(network.download_sample_cases(self.url, session=session, problem=_DummyProblem(self.url)))  # type: ignore
+        self.assertLess(time.perf_counter() - start, 5)
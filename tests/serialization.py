@@ -0,0 +1,71 @@
+import pathlib
+import tempfile
+import unittest
+
+import onlinejudge_template.serialization as serialization
+from onlinejudge_template.main import main
+from onlinejudge_template.types import *
+
+
+def _get_analyzer_result(output_type: Optional[OutputType]) -> AnalyzerResult:
+    return AnalyzerResult(
+        resources=AnalyzerResources(
+            url='https://atcoder.jp/contests/abc100/tasks/abc100_a',
+            html=b'<html>\xff</html>',
+            input_format_string='N\nA_1 ... A_N\n',
+            output_format_string=None,
+            sample_cases=[SampleCase(input=b'3\n1 2 3\n', output=b'6\n')],
+        ),
+        input_format=SequenceNode(items=[
+            ItemNode(name='N'),
+            NewlineNode(),
+            LoopNode(size='N', name='i', body=ItemNode(name='A', indices=['i'])),
+            NewlineNode(),
+        ]),
+        input_variables={
+            VarName('N'): VarDecl(name=VarName('N'), type=VarType.IndexInt, dims=[], bases=[], depending=set()),
+            VarName('A'): VarDecl(name=VarName('A'), type=VarType.ValueInt, dims=[Expr('N')], bases=[Expr('1')], depending={VarName('N')}),
+        },
+        output_format=None,
+        output_variables=None,
+        constants={VarName('MOD'): ConstantDecl(name=VarName('MOD'), value='1000000007', type=VarType.ValueInt)},
+        output_type=output_type,
+        topcoder_class_definition=TopcoderClassDefinition(class_name='Foo', method_name='bar', formal_arguments=[(TopcoderType.IntList, VarName('a'))], return_type=TopcoderType.Long),
+    )
+
+
+class TestSerialization(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        output_types = [
+            None,
+            YesNoOutputType(name=Expr('ans'), yes='Yes', no='No'),
+            OneOutputType(name=Expr('ans'), type=VarType.Float),
+            TwoOutputType(name1=Expr('a'), type1=VarType.ValueInt, name2=Expr('b'), type2=None, print_newline_after_item=True),
+            VectorOutputType(name=VarName('ans'), type=VarType.String, subscripted_name='ans[i]', counter_name=VarName('i'), print_size=True, print_newline_after_size=True, print_newline_after_item=False),
+        ]
+        for output_type in output_types:
+            result = _get_analyzer_result(output_type)
+            expected = serialization.encode_analyzer_result(result)
+            for decoded in [serialization.loads_json(serialization.dumps_json(result)), serialization.loads(serialization.dumps_binary(result))]:
+                self.assertEqual(serialization.encode_analyzer_result(decoded), expected)
+                self.assertEqual(decoded.resources, result.resources)
+                self.assertEqual(decoded.input_variables, result.input_variables)
+                self.assertEqual(decoded.constants, result.constants)
+                self.assertEqual(repr(decoded.input_format), repr(result.input_format))
+                self.assertEqual(type(decoded.output_type), type(result.output_type))
+
+    def test_schema_version(self) -> None:
+        data = serialization.encode_analyzer_result(_get_analyzer_result(None))
+        data['schema_version'] = serialization.SCHEMA_VERSION + 1
+        with self.assertRaises(ValueError):
+            serialization.decode_analyzer_result(data)
+        with self.assertRaises(ValueError):
+            serialization.loads(b'OJTA\xff')
+
+    def test_from_analysis(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            (tmpdir / 'analyzed.json').write_text(serialization.dumps_json(_get_analyzer_result(None)))
+            (tmpdir / 'template.txt').write_text("""${', '.join(data['analyzed'].input_variables.keys())}\n""")
+            main(['--no-server', '--from-analysis', str(tmpdir / 'analyzed.json'), '-t', str(tmpdir / 'template.txt'), '-o', str(tmpdir / 'out')])
+            self.assertEqual((tmpdir / 'out' / 'template.txt').read_text(), 'N, A\n')
@@ -0,0 +1,78 @@
+import concurrent.futures
+import pathlib
+import socket
+import tempfile
+import threading
+import unittest
+import unittest.mock
+from typing import *
+
+import onlinejudge_template.server as server
+
+
+class TestHandleRequest(unittest.TestCase):
+    def test_ping(self) -> None:
+        response = server.handle_request({'jsonrpc': '2.0', 'method': 'ping', 'id': 1})
+        assert response is not None
+        self.assertEqual(response['id'], 1)
+        self.assertIn('version', response['result'])
+
+    def _get_error_code(self, request: Dict[str, Any]) -> int:
+        response = server.handle_request(request)
+        assert response is not None
+        return response['error']['code']
+
+    def test_errors(self) -> None:
+        self.assertEqual(self._get_error_code({'method': 'ping', 'id': 1}), server.INVALID_REQUEST)
+        self.assertEqual(self._get_error_code({'jsonrpc': '2.0', 'method': 'foo', 'id': 1}), server.METHOD_NOT_FOUND)
+        self.assertEqual(self._get_error_code({'jsonrpc': '2.0', 'method': 'generate', 'params': {}, 'id': 1}), server.INVALID_PARAMS)
+        self.assertIsNone(server.handle_request({'jsonrpc': '2.0', 'method': 'ping'}))  # notification
+
+    def test_bytes(self) -> None:
+        data = b'\xff\xfe' + 'あ'.encode()
+        self.assertEqual(server.decode_bytes(server.encode_bytes(data)), data)
+
+
+class TestUnixSocketServer(unittest.TestCase):
+    def test_generate(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            tmpdir = pathlib.Path(tmpdir_)
+            path = tmpdir / 'server.sock'
+            template = tmpdir / 'template.txt'
+            template.write_text("""${len(data['analyzed'].resources.sample_cases)} sample cases\n""")
+
+            self.assertIsNone(server.call('ping', {}, path=path))  # not running
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                instance = server.make_unix_socket_server(path, executor=executor)
+                thread = threading.Thread(target=instance.serve_forever)
+                thread.start()
+                try:
+                    params = {
+                        'html': '<html></html>',
+                        'sample_cases': [{
+                            'input': '1\n',
+                            'output': '2\n'
+                        }],
+                        'template': str(template),
+                        'no_cache': True,
+                    }
+                    result = server.call('generate', params, path=path)
+                    assert result is not None
+                    self.assertEqual(server.decode_bytes(result['code']), b'1 sample cases\n')
+                    self.assertEqual(server.call_if_compatible('generate', params, path=path), result)
+                    with unittest.mock.patch.dict(server._methods, {'ping': lambda params: {'version': '0.0.0'}}):
+                        self.assertIsNone(server.call_if_compatible('generate', params, path=path))  # another version
+                    with self.assertRaises(RuntimeError):
+                        server.make_unix_socket_server(path, executor=executor)  # already running
+                finally:
+                    instance.shutdown()
+                    instance.server_close()
+                    thread.join()
+
+    def test_timeout(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir_:
+            path = pathlib.Path(tmpdir_) / 'server.sock'
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.bind(str(path))
+                sock.listen(1)  # accepts connections but never responds
+                self.assertIsNone(server.call('ping', {}, path=path, timeout=0.1))
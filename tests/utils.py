@@ -0,0 +1,17 @@
+"""
+the module for helpers shared by tests of generators
+"""
+
+from typing import *
+
+from onlinejudge_template.types import *
+
+
+def get_decl(name: str, type: VarType, dims: List[str] = [], bases: List[str] = []) -> VarDecl:
+    depending = {VarName(dim.split()[0]) for dim in dims}
+    return VarDecl(name=VarName(name), type=type, dims=list(map(Expr, dims)), bases=list(map(Expr, bases)), depending=depending)
+
+
+def get_analyzed(format: FormatNode, variables: Dict[VarName, VarDecl]) -> AnalyzerResult:
+    resources = AnalyzerResources(url=None, html=None, input_format_string=None, output_format_string=None, sample_cases=None)
+    return AnalyzerResult(resources=resources, input_format=format, input_variables=variables, output_format=format, output_variables=variables, constants={}, output_type=None, topcoder_class_definition=None)